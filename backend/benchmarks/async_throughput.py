@@ -0,0 +1,114 @@
+"""
+benchmarks/async_throughput.py — Sync vs async request throughput at a fixed worker count.
+
+Serves the same authenticated task-list read twice from one process — once as
+a sync route on get_db/get_current_user (runs in FastAPI's threadpool), once
+as an `async def` route on get_async_db/get_current_user_async — and drives
+both with the same number of concurrent clients.
+
+Usage:
+    cd backend
+    python benchmarks/async_throughput.py [--requests 2000] [--concurrency 100]
+
+Set DATABASE_URL to benchmark against Postgres; defaults to a throwaway SQLite file.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp.name}/bench.db")
+# Fail fast instead of stalling for 30s when the sync path exhausts the pool
+os.environ.setdefault("DB_POOL_TIMEOUT", "5")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from database import Base, SessionLocal, async_engine, engine, get_async_db, get_db  # noqa: E402
+from models import User, UserTask  # noqa: E402
+from routes.auth import create_access_token  # noqa: E402
+from routes.deps import get_current_user, get_current_user_async  # noqa: E402
+from services.user_cache import UserSnapshot  # noqa: E402
+
+app = FastAPI()
+
+
+@app.get("/sync/tasks")
+def sync_tasks(db=Depends(get_db), current_user: UserSnapshot = Depends(get_current_user)):
+    return (
+        db.query(UserTask)
+        .filter(UserTask.user_id == current_user.id)
+        .order_by(UserTask.order_index.asc(), UserTask.created_at.desc())
+        .all()
+    )
+
+
+@app.get("/async/tasks")
+async def async_tasks(db=Depends(get_async_db), current_user: UserSnapshot = Depends(get_current_user_async)):
+    result = await db.execute(
+        select(UserTask)
+        .where(UserTask.user_id == current_user.id)
+        .order_by(UserTask.order_index.asc(), UserTask.created_at.desc())
+    )
+    return result.scalars().all()
+
+
+def _seed() -> str:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(name="Bench", email=f"bench-{time.time_ns()}@xpilot.dev", password_hash="x", role="worker")
+    db.add(user)
+    db.flush()
+    db.add_all(UserTask(user_id=user.id, title=f"Task {i}", order_index=i) for i in range(20))
+    db.commit()
+    token = create_access_token({"sub": str(user.id), "role": user.role})
+    db.close()
+    return token
+
+
+async def _drive(path: str, token: str, total: int, concurrency: int) -> tuple[float, int]:
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    remaining = iter(range(total))
+    errors = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                r = await client.get(path, headers=headers)
+                if r.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    token = _seed()
+    print(f"1 worker process, {args.concurrency} concurrent clients, {args.requests} requests per route\n")
+
+    # One event loop for the whole run — pooled async connections are bound to it
+    async def run_all():
+        for path in ("/sync/tasks", "/async/tasks"):
+            await _drive(path, token, min(200, args.requests), args.concurrency)  # warm-up
+            rps, errors = await _drive(path, token, args.requests, args.concurrency)
+            print(f"{path:<14}{rps:>10.0f} req/s{errors:>8} errors")
+        await async_engine.dispose()
+
+    asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+benchmarks/session_analytics.py — Duration distribution and energy-vs-output at scale.
+
+Seeds one user with N ended sessions in a throwaway SQLite database and times
+three ways of producing the session-length buckets and per-energy averages:
+the original per-row loop over ORM objects, the SQL aggregates the dashboards
+use now, and the NumPy column path behind /analytics/distribution (which also
+computes percentiles, a rolling mean and the correlation in the same pass).
+Bucket counts and averages must agree across all three.
+
+Usage:
+    cd backend
+    python benchmarks/session_analytics.py [--sessions 10000 100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp(prefix="xpilot-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'analytics.db')}"
+
+from sqlalchemy import case, delete, func, insert  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from migrations import run_migrations  # noqa: E402
+from models import Session as SessionModel, User, UserTask  # noqa: E402
+from services.session_metrics import (  # noqa: E402
+    duration_histogram, duration_percentiles, energy_output, load_session_columns, rolling_focus,
+)
+
+
+def legacy(db, user_id: int) -> tuple[list, dict]:
+    """The original implementation: every session as an ORM object, bucketed in Python."""
+    sessions = db.query(SessionModel).filter(SessionModel.user_id == user_id, SessionModel.end_time.isnot(None)).all()
+    durations = [s.duration_minutes or 0 for s in sessions]
+    buckets = [
+        sum(1 for d in durations if d < 25),
+        sum(1 for d in durations if 25 <= d < 60),
+        sum(1 for d in durations if d >= 60),
+    ]
+    energy: dict[int, list] = {}
+    for s in sessions:
+        if s.energy_level is not None:
+            energy.setdefault(s.energy_level, []).append(s.duration_minutes or 0)
+    return buckets, {lvl: round(sum(d) / len(d), 1) for lvl, d in energy.items()}
+
+
+def sql(db, user_id: int) -> tuple[list, dict]:
+    """The current dashboards: fixed buckets and per-level averages as SQL aggregates."""
+    duration = func.coalesce(SessionModel.duration_minutes, 0)
+    ended = (SessionModel.user_id == user_id, SessionModel.end_time.isnot(None))
+    buckets = db.query(
+        func.sum(case((duration < 25, 1), else_=0)),
+        func.sum(case(((duration >= 25) & (duration < 60), 1), else_=0)),
+        func.sum(case((duration >= 60, 1), else_=0)),
+    ).filter(*ended).one()
+    energy = db.query(SessionModel.energy_level, func.avg(duration)) \
+        .filter(*ended, SessionModel.energy_level.isnot(None)).group_by(SessionModel.energy_level).all()
+    return list(buckets), {lvl: round(avg, 1) for lvl, avg in energy}
+
+
+def vectorized(db, user_id: int) -> tuple[list, dict]:
+    """load_session_columns() + the NumPy statistics, including the extras SQL can't do cheaply."""
+    cols = load_session_columns(db, user_id)
+    histogram = duration_histogram(cols, (25, 60))
+    duration_percentiles(cols)
+    today = datetime.utcnow().date()
+    rolling_focus(cols, today - timedelta(days=89), today)
+    energy = energy_output(cols)
+    return [b["sessions"] for b in histogram], {lvl["energy_level"]: lvl["avg_minutes"] for lvl in energy["levels"]}
+
+
+def seed(user_id: int, task_ids: list, count: int):
+    rng = random.Random(count)
+    now = datetime.utcnow()
+    rows = []
+    for _ in range(count):
+        start = now - timedelta(minutes=rng.randint(30, 365 * 24 * 60))
+        duration = round(rng.uniform(5, 120), 2)
+        rows.append({
+            "user_id": user_id,
+            "task_id": rng.choice([None, *task_ids]),
+            "start_time": start,
+            "end_time": start + timedelta(minutes=duration),
+            "local_date": (start + timedelta(minutes=duration)).date(),
+            "duration_minutes": duration,
+            "energy_level": rng.choice([None, *range(1, 11)]),
+            "status": "completed",
+        })
+    with SessionLocal() as db:
+        db.execute(delete(SessionModel).where(SessionModel.user_id == user_id))
+        for i in range(0, len(rows), 5000):
+            db.execute(insert(SessionModel), rows[i:i + 5000])
+        db.commit()
+
+
+def measure(fn, user_id: int, repeat: int) -> tuple[float, tuple]:
+    """Median latency (ms) and the last result."""
+    timings = []
+    with SessionLocal() as db:
+        result = fn(db, user_id)  # warm the page cache
+        for _ in range(repeat):
+            db.expunge_all()
+            start = time.perf_counter()
+            result = fn(db, user_id)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    with SessionLocal() as db:
+        user = User(name="bench", email="bench@example.com", password_hash="x", role="worker")
+        db.add(user)
+        db.flush()
+        tasks = [UserTask(user_id=user.id, title=f"task {i}") for i in range(3)]
+        db.add_all(tasks)
+        db.commit()
+        user_id, task_ids = user.id, [t.id for t in tasks]
+
+    print(f"{'sessions':>9} | {'ORM loop ms':>11} | {'SQL agg ms':>10} | {'NumPy ms':>8} | same")
+    mismatches = 0
+    for count in args.sessions:
+        seed(user_id, task_ids, count)
+        legacy_ms, legacy_result = measure(legacy, user_id, args.repeat)
+        sql_ms, sql_result = measure(sql, user_id, args.repeat)
+        numpy_ms, numpy_result = measure(vectorized, user_id, args.repeat)
+        same = legacy_result == sql_result == numpy_result
+        mismatches += not same
+        print(f"{count:>9} | {legacy_ms:>11.1f} | {sql_ms:>10.1f} | {numpy_ms:>8.1f} | {same}")
+
+    engine.dispose()
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
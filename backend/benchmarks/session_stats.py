@@ -0,0 +1,152 @@
+"""
+benchmarks/session_stats.py — /sessions/stats latency and memory vs history size.
+
+Seeds one user with N sessions (plus rollups) in a throwaway SQLite database,
+then times the endpoint against the original implementation that loaded every
+session into Python, checking that both return the same payload.
+
+Usage:
+    cd backend
+    python benchmarks/session_stats.py [--sessions 1000 10000 50000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp(prefix="xpilot-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'stats.db')}"
+
+from sqlalchemy import delete, insert  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from migrations import run_migrations  # noqa: E402
+from models import Session as SessionModel, User, UserDailyStats  # noqa: E402
+from routes.sessions import get_session_stats  # noqa: E402
+from services.daily_stats import rebuild_daily_stats  # noqa: E402
+
+
+def legacy_session_stats(db, user_id: int) -> dict:
+    """The pre-pushdown implementation: every session loaded and bucketed in Python."""
+    today = datetime.utcnow().date()
+    seven_days_ago = today - timedelta(days=6)
+    sessions = db.query(SessionModel).filter(SessionModel.user_id == user_id).all()
+
+    today_focus = sum(s.duration_minutes or 0 for s in sessions if s.end_time and s.end_time.date() == today)
+    week_sessions = [s for s in sessions if s.end_time and s.end_time.date() >= seven_days_ago]
+    week_focus = sum(s.duration_minutes or 0 for s in week_sessions)
+
+    completed = [s for s in sessions if s.status == "completed" and s.duration_minutes is not None]
+    completion_rate = round((len(completed) / len(sessions)) * 100) if sessions else 0
+    avg_session_length = round(sum(s.duration_minutes for s in completed) / len(completed)) if completed else 0
+
+    trend_dict = {(seven_days_ago + timedelta(days=i)).isoformat(): 0 for i in range(7)}
+    for s in week_sessions:
+        key = s.end_time.date().isoformat()
+        if key in trend_dict:
+            trend_dict[key] += s.duration_minutes or 0
+    trend = [{"date": k, "minutes": round(v)} for k, v in trend_dict.items()]
+
+    buckets: dict[int, list] = {}
+    for s in completed:
+        if s.energy_level is not None:
+            buckets.setdefault(s.energy_level, []).append(s.duration_minutes or 0)
+    energy_vs_output = sorted(
+        (
+            {"energy_level": lvl, "session_count": len(d), "avg_minutes": round(sum(d) / len(d))}
+            for lvl, d in buckets.items()
+        ),
+        key=lambda x: x["energy_level"],
+        reverse=True,
+    )
+    return {
+        "today_focus_minutes": round(today_focus),
+        "week_focus_minutes": round(week_focus),
+        "completion_rate": completion_rate,
+        "avg_session_length": avg_session_length,
+        "trend": trend,
+        "energy_vs_output": energy_vs_output,
+    }
+
+
+def seed(user_id: int, count: int):
+    rng = random.Random(count)
+    now = datetime.utcnow()
+    rows = []
+    for _ in range(count):
+        start = now - timedelta(minutes=rng.randint(30, 365 * 24 * 60))
+        duration = round(rng.uniform(5, 120), 2)
+        ended = rng.random() > 0.05
+        rows.append({
+            "user_id": user_id,
+            "start_time": start,
+            "end_time": start + timedelta(minutes=duration) if ended else None,
+            "local_date": (start + timedelta(minutes=duration)).date() if ended else None,
+            "duration_minutes": duration if ended else None,
+            "energy_level": rng.randint(1, 10),
+            "status": "completed" if ended else "active",
+        })
+    with SessionLocal() as db:
+        db.execute(delete(SessionModel).where(SessionModel.user_id == user_id))
+        db.execute(delete(UserDailyStats).where(UserDailyStats.user_id == user_id))
+        for i in range(0, len(rows), 5000):
+            db.execute(insert(SessionModel), rows[i:i + 5000])
+        rebuild_daily_stats(db, user_id=user_id)
+        db.commit()
+
+
+def measure(fn, user, repeat: int) -> tuple[float, float, dict]:
+    """Median latency (ms), peak traced memory (KiB) and the last payload."""
+    timings = []
+    with SessionLocal() as db:
+        fn(db, user)  # warm the page cache
+        for _ in range(repeat):
+            db.expunge_all()
+            start = time.perf_counter()
+            fn(db, user)
+            timings.append((time.perf_counter() - start) * 1000)
+        db.expunge_all()
+        tracemalloc.start()
+        payload = fn(db, user)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    timings.sort()
+    return timings[len(timings) // 2], peak / 1024, payload
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    with SessionLocal() as db:
+        user = User(name="bench", email="bench@example.com", password_hash="x", role="worker")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    print(f"{'sessions':>9} | {'legacy ms':>9} {'legacy KiB':>10} | {'pushdown ms':>11} {'pushdown KiB':>12} | same")
+    mismatches = 0
+    for count in args.sessions:
+        seed(user_id, count)
+        with SessionLocal() as db:
+            user = db.get(User, user_id)
+        legacy_ms, legacy_kib, legacy = measure(lambda db, u: legacy_session_stats(db, u.id), user, args.repeat)
+        new_ms, new_kib, new = measure(lambda db, u: get_session_stats(db=db, current_user=u), user, args.repeat)
+        same = legacy == new
+        mismatches += not same
+        print(f"{count:>9} | {legacy_ms:>9.1f} {legacy_kib:>10.0f} | {new_ms:>11.1f} {new_kib:>12.0f} | {same}")
+
+    engine.dispose()
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
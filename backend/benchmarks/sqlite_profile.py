@@ -0,0 +1,143 @@
+"""
+benchmarks/sqlite_profile.py — Concurrent read/write throughput per SQLite profile.
+
+Runs the same mixed workload (writers inserting + ending sessions, readers
+aggregating a user's history) against a fresh database for each
+SQLITE_PROFILE and prints operations per second.
+
+Usage:
+    cd backend
+    python benchmarks/sqlite_profile.py [--seconds 5] [--readers 4] [--writers 2]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import apply_sqlite_pragmas  # noqa: E402
+
+USERS = 50
+SEED_ROWS = 20_000
+
+SCHEMA = """
+CREATE TABLE sessions (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT,
+    duration_minutes REAL,
+    status TEXT
+);
+CREATE INDEX ix_sessions_user ON sessions (user_id, end_time);
+"""
+
+
+def _connect(path: str, profile: str) -> sqlite3.Connection:
+    # timeout mirrors the driver default so the "default" profile still waits on locks
+    conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+    apply_sqlite_pragmas(conn, profile)
+    return conn
+
+
+def _seed(path: str, profile: str):
+    conn = _connect(path, profile)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO sessions (user_id, start_time, end_time, duration_minutes, status) "
+        "VALUES (?, datetime('now', ?), datetime('now', ?), ?, 'completed')",
+        [
+            (random.randint(1, USERS), f"-{i} minutes", f"-{i - 25} minutes", 25.0)
+            for i in range(SEED_ROWS)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _writer(path, profile, stop, counts, errors):
+    conn = _connect(path, profile)
+    while not stop.is_set():
+        try:
+            user_id = random.randint(1, USERS)
+            cur = conn.execute(
+                "INSERT INTO sessions (user_id, start_time, status) VALUES (?, datetime('now'), 'active')",
+                (user_id,),
+            )
+            conn.commit()
+            conn.execute(
+                "UPDATE sessions SET end_time = datetime('now'), duration_minutes = 25, status = 'completed' "
+                "WHERE id = ?",
+                (cur.lastrowid,),
+            )
+            conn.commit()
+            counts["writes"] += 2
+        except sqlite3.OperationalError:
+            conn.rollback()
+            errors["writes"] += 1
+    conn.close()
+
+
+def _reader(path, profile, stop, counts, errors):
+    conn = _connect(path, profile)
+    while not stop.is_set():
+        try:
+            conn.execute(
+                "SELECT COUNT(*), SUM(duration_minutes) FROM sessions "
+                "WHERE user_id = ? AND end_time IS NOT NULL",
+                (random.randint(1, USERS),),
+            ).fetchone()
+            counts["reads"] += 1
+        except sqlite3.OperationalError:
+            errors["reads"] += 1
+    conn.close()
+
+
+def run(profile: str, seconds: float, readers: int, writers: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        _seed(path, profile)
+
+        stop = threading.Event()
+        counts = {"reads": 0, "writes": 0}
+        errors = {"reads": 0, "writes": 0}
+        threads = (
+            [threading.Thread(target=_writer, args=(path, profile, stop, counts, errors)) for _ in range(writers)]
+            + [threading.Thread(target=_reader, args=(path, profile, stop, counts, errors)) for _ in range(readers)]
+        )
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+
+    return {
+        "profile":        profile,
+        "reads_per_s":    round(counts["reads"] / seconds),
+        "writes_per_s":   round(counts["writes"] / seconds),
+        "lock_errors":    errors["reads"] + errors["writes"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers / {args.writers} writers, {args.seconds:g}s per profile\n")
+    print(f"{'profile':<10}{'reads/s':>12}{'writes/s':>12}{'lock errors':>14}")
+    for profile in ("default", "tuned"):
+        r = run(profile, args.seconds, args.readers, args.writers)
+        print(f"{r['profile']:<10}{r['reads_per_s']:>12}{r['writes_per_s']:>12}{r['lock_errors']:>14}")
+
+
+if __name__ == "__main__":
+    main()
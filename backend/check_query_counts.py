@@ -0,0 +1,113 @@
+"""
+check_query_counts.py — Fail if a dashboard endpoint regresses to N+1 queries.
+
+Builds a throwaway SQLite database from the current models, seeds a small
+and a large worker history, calls each endpoint below for both and counts
+the SQL statements it executes. Exits non-zero if a call exceeds its budget
+or if the count grows with the amount of data (a per-row query).
+
+Usage:
+    cd backend
+    python check_query_counts.py
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}/counts.db"
+os.environ.pop("READ_DATABASE_URL", None)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+from main import app  # noqa: E402
+from models import Project, Session as SessionModel, User, UserTask  # noqa: E402
+from routes.auth import create_access_token  # noqa: E402
+from services.daily_stats import rebuild_daily_stats  # noqa: E402
+
+# (label, path, statement budget) — the budget covers auth as well as the handler
+ENDPOINTS = [
+    ("worker analytics", "/worker/analytics", 6),
+]
+
+# (projects, tasks per project) for the small and large history
+SIZES = ((1, 1), (20, 5))
+SESSIONS_PER_TASK = 2
+
+
+def seed(email: str, projects: int, tasks_per_project: int) -> int:
+    """A worker with `projects` × `tasks_per_project` tasks, each with ended sessions this week."""
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        user = User(name=email, email=email, password_hash="x", role="worker")
+        db.add(user)
+        db.flush()
+        for p in range(projects):
+            project = Project(user_id=user.id, name=f"Project {p}")
+            db.add(project)
+            db.flush()
+            for t in range(tasks_per_project):
+                task = UserTask(user_id=user.id, title=f"Task {p}.{t}", project_id=project.id)
+                db.add(task)
+                db.flush()
+                for s in range(SESSIONS_PER_TASK):
+                    end = now - timedelta(days=(p + t + s) % 7, minutes=5)
+                    db.add(SessionModel(
+                        user_id=user.id, task_id=task.id, start_time=end - timedelta(minutes=25),
+                        end_time=end, duration_minutes=25, energy_level=1 + (p + s) % 10,
+                        status="completed", local_date=end.date(),
+                    ))
+        db.flush()
+        rebuild_daily_stats(db, user_id=user.id)
+        db.commit()
+        return user.id
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def count_statements(client: TestClient, path: str, user_id: int) -> int:
+    token = create_access_token({"sub": str(user_id), "role": "worker"})
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        response = client.get(path, headers={"Authorization": f"Bearer {token}"})
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    response.raise_for_status()
+    return counter.count
+
+
+def main() -> int:
+    Base.metadata.create_all(bind=engine)
+    client = TestClient(app)
+    failures = 0
+    for label, path, budget in ENDPOINTS:
+        counts = [
+            count_statements(client, path, seed(f"{label}-{i}@check.local", *size))
+            for i, size in enumerate(SIZES)
+        ]
+        over = max(counts) > budget
+        grows = len(set(counts)) > 1
+        status = "OVER" if over else "N+1" if grows else "ok"
+        failures += over or grows
+        sizes = ", ".join(f"{p}×{t} tasks: {n}" for (p, t), n in zip(SIZES, counts))
+        print(f"[{status:>4}] {label}: {sizes} statements (budget {budget})")
+
+    if failures:
+        print(f"\n{failures} endpoint{'s' if failures != 1 else ''} over budget or scaling with data.")
+        return 1
+    print("\nAll endpoints within their query budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
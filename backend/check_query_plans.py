@@ -0,0 +1,180 @@
+"""
+check_query_plans.py — Fail if a hot query regresses to a full table scan.
+
+Builds a throwaway SQLite database from the current models, runs
+EXPLAIN QUERY PLAN for every filter the API executes on a hot path and
+exits non-zero if any of them reads a table without an index, sorts an
+ORDERED query in a temporary B-tree instead of reading an index in order,
+or doesn't use the indexes it is expected to seek.
+
+Usage:
+    cd backend
+    python check_query_plans.py
+"""
+import os
+import re
+import sys
+import tempfile
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}/plans.db"
+
+from sqlalchemy import and_, or_, select, func  # noqa: E402
+from database import Base, engine  # noqa: E402
+from models import (  # noqa: E402
+    Session as SessionModel, XPLog, EnergyLog, UserTask,
+    ChatHistory, FocusTrack, Challenge, MatchResult, UserDailyStats,
+    User, ArenaStanding, XPCheckpoint,
+)
+
+NOW = datetime.utcnow()
+
+# (label, statement) — one entry per hot filter
+HOT_QUERIES = [
+    ("sessions by user, ended",
+     select(SessionModel).where(SessionModel.user_id == 1, SessionModel.end_time.isnot(None))),
+    ("sessions by user since start",
+     select(func.count()).select_from(SessionModel).where(SessionModel.user_id == 1, SessionModel.start_time >= NOW)),
+    ("xp_logs by user since",
+     select(func.sum(XPLog.xp_awarded)).where(XPLog.user_id == 1, XPLog.created_at >= NOW)),
+    ("energy_logs by user + date",
+     select(EnergyLog).where(EnergyLog.user_id == 1, EnergyLog.date == date.today())),
+    ("user_tasks by user ordered",
+     select(UserTask).where(UserTask.user_id == 1)
+     .order_by(UserTask.order_index.asc(), UserTask.created_at.desc())),
+    ("user_tasks by user + status",
+     select(UserTask).where(UserTask.user_id == 1, UserTask.status == "active")),
+    ("chat_history by track",
+     select(ChatHistory).where(ChatHistory.focus_id == 1).order_by(ChatHistory.timestamp.asc())),
+    ("focus_tracks active for user",
+     select(FocusTrack).where(FocusTrack.user_id == 1, FocusTrack.status == "active")),
+    ("challenges open for user",
+     select(Challenge).where(or_(
+         and_(Challenge.status.in_(["pending", "active"]), Challenge.challenger_id == 1),
+         and_(Challenge.status.in_(["pending", "active"]), Challenge.opponent_id == 1),
+     ))),
+    ("open challenge between pair",
+     select(Challenge).where(or_(
+         and_(Challenge.status.in_(["pending", "active"]), Challenge.challenger_id == 1, Challenge.opponent_id == 2),
+         and_(Challenge.status.in_(["pending", "active"]), Challenge.challenger_id == 2, Challenge.opponent_id == 1),
+     ))),
+    ("match_results wins",
+     select(func.count()).select_from(MatchResult).where(MatchResult.winner_id == 1)),
+    ("match result by challenge",
+     select(MatchResult).where(MatchResult.challenge_id == 1)),
+    ("session stats by energy level",
+     select(SessionModel.energy_level, func.count(), func.sum(SessionModel.duration_minutes))
+     .where(SessionModel.user_id == 1, SessionModel.status == "completed", SessionModel.energy_level.isnot(None))
+     .group_by(SessionModel.energy_level)),
+    ("leaderboard page",
+     select(User.id, ArenaStanding.wins).outerjoin(ArenaStanding, ArenaStanding.user_id == User.id)
+     .where(User.role == "worker", User.elo_rating < 1200)
+     .order_by(User.elo_rating.desc(), User.id.desc()).limit(51)),
+    ("leaderboard rank offset",
+     select(func.count(), func.count(func.distinct(User.elo_rating)))
+     .where(User.role == "worker", User.elo_rating > 1200)),
+    ("user_daily_stats window",
+     select(UserDailyStats).where(UserDailyStats.user_id == 1, UserDailyStats.date >= date.today())),
+    ("sessions by user + local day",
+     select(func.count()).select_from(SessionModel)
+     .where(SessionModel.user_id == 1, SessionModel.local_date >= date.today())),
+    ("xp_logs by user + local day",
+     select(func.sum(XPLog.xp_awarded)).where(XPLog.user_id == 1, XPLog.local_date == date.today())),
+    ("tasks completed on local day",
+     select(func.count()).select_from(UserTask)
+     .where(UserTask.user_id == 1, UserTask.completed_local_date == date.today())),
+    ("xp award by source",
+     select(XPLog.id).where(XPLog.user_id == 1, XPLog.source_type == "session", XPLog.source_id == 1)),
+    ("xp checkpoint at or before day",
+     select(XPCheckpoint.balance).where(XPCheckpoint.user_id == 1, XPCheckpoint.date <= date.today())
+     .order_by(XPCheckpoint.date.desc()).limit(1)),
+    ("xp tail after checkpoint",
+     select(func.sum(XPLog.xp_awarded)).where(
+         XPLog.user_id == 1, XPLog.local_date > date.today(), XPLog.local_date <= date.today())),
+    ("team members",
+     select(User.id, User.elo_rating).where(User.team_id == 1)),
+    ("export sessions after cursor",
+     select(SessionModel.id).where(
+         SessionModel.user_id == 1, SessionModel.end_time.isnot(None),
+         (SessionModel.end_time > NOW) | ((SessionModel.end_time == NOW) & (SessionModel.id > 1)),
+     ).order_by(SessionModel.end_time, SessionModel.id)),
+    ("export xp after cursor",
+     select(XPLog.id).where(
+         XPLog.user_id == 1, (XPLog.created_at > NOW) | ((XPLog.created_at == NOW) & (XPLog.id > 1)),
+     ).order_by(XPLog.created_at, XPLog.id)),
+    ("export tasks after cursor",
+     select(UserTask.id).where(
+         UserTask.user_id == 1, (UserTask.updated_at > NOW) | ((UserTask.updated_at == NOW) & (UserTask.id > 1)),
+     ).order_by(UserTask.updated_at, UserTask.id)),
+    ("export energy after cursor",
+     select(EnergyLog.id).where(
+         EnergyLog.user_id == 1, (EnergyLog.updated_at > NOW) | ((EnergyLog.updated_at == NOW) & (EnergyLog.id > 1)),
+     ).order_by(EnergyLog.updated_at, EnergyLog.id)),
+]
+
+# Queries whose ORDER BY must come from an index, not a temporary B-tree sort
+ORDERED = {
+    "user_tasks by user ordered",
+    "chat_history by track",
+    "leaderboard page",
+    "xp checkpoint at or before day",
+    "export sessions after cursor",
+    "export xp after cursor",
+    "export tasks after cursor",
+    "export energy after cursor",
+}
+
+# Indexes a query must seek (each side of an OR needs its own)
+EXPECTED_INDEXES = {
+    "user_tasks by user ordered":  ("ix_user_tasks_user_order",),
+    "challenges open for user":    ("ix_challenges_status_challenger", "ix_challenges_status_opponent"),
+}
+
+# "SCAN sessions" is a full table read; "SCAN sessions USING INDEX ..." is not
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+# Also "USE TEMP B-TREE FOR RIGHT PART OF ORDER BY" (a partial sort)
+_TEMP_SORT = re.compile(r"^USE TEMP B-TREE FOR .*ORDER BY$")
+_INDEX_USED = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+
+def explain(conn, stmt) -> list[str]:
+    compiled = stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").fetchall()
+    return [row[-1] for row in rows]
+
+
+def problem(label: str, plan: list[str]) -> str:
+    """Why the plan fails the gate, or "" when it passes."""
+    if any(_FULL_SCAN.match(step) for step in plan):
+        return "FULL SCAN"
+    if label in ORDERED and any(_TEMP_SORT.match(step) for step in plan):
+        return "TEMP SORT"
+    used = {m.group(1) for step in plan for m in _INDEX_USED.finditer(step)}
+    if not set(EXPECTED_INDEXES.get(label, ())) <= used:
+        return "NO INDEX"
+    return ""
+
+
+def main() -> int:
+    Base.metadata.create_all(bind=engine)
+    failures = 0
+    with engine.connect() as conn:
+        for label, stmt in HOT_QUERIES:
+            plan = explain(conn, stmt)
+            status = problem(label, plan)
+            failures += bool(status)
+            print(f"[{status or 'ok':>9}] {label}: {' | '.join(plan)}")
+            if status == "NO INDEX":
+                print(f"{'':12}expected {', '.join(EXPECTED_INDEXES[label])}")
+
+    if failures:
+        print(f"\n{failures} hot quer{'y' if failures == 1 else 'ies'} failed: full scan, sort outside an index or missing index.")
+        return 1
+    print("\nAll hot queries use their indexes.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,35 +1,219 @@
 """
 database.py — SQLAlchemy engine + session setup
 Supports SQLite (local dev) and PostgreSQL (production) via DATABASE_URL env var.
+
+Connection pool sizing is env-driven (DB_POOL_SIZE, DB_MAX_OVERFLOW,
+DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_POOL_TIMEOUT). Postgres and SQLite use
+different defaults; see _pool_settings().
+
+An async engine (asyncpg / aiosqlite) runs alongside the sync one for
+`async def` routes — use get_async_db instead of get_db there.
+
+READ_DATABASE_URL optionally points read-heavy routes at a replica; see
+routes/deps.get_read_db for how a request picks primary vs replica.
 """
 import os
-from sqlalchemy import create_engine, event
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from sqlalchemy import Date, cast, create_engine, event, func, inspect
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 # Fallback to SQLite for local development
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./xpilot.db")
 
+# Optional read replica for analytics / dashboards; unset → everything reads the primary
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL") or None
+
 # Render provides postgres:// URLs — SQLAlchemy requires postgresql://
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+if READ_DATABASE_URL and READ_DATABASE_URL.startswith("postgres://"):
+    READ_DATABASE_URL = READ_DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
 _is_sqlite = DATABASE_URL.startswith("sqlite")
+_is_sqlite_memory = _is_sqlite and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite:")
+
+
+def _async_url(url: str) -> str:
+    """Same database, async driver: sqlite → aiosqlite, postgresql → asyncpg."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+
+# ── Pool settings ─────────────────────────────────────────────────────────────
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _pool_settings() -> dict:
+    """
+    Pool profile for the configured backend.
+
+    Postgres: connections are expensive and Render idles them, so recycle
+    stale ones and pre-ping before handing them out.
+    SQLite: connections are cheap file handles — no recycling or pings, but
+    keep the pool bounded so writers don't pile up behind the file lock.
+    """
+    if _is_sqlite:
+        return {
+            "pool_size":     _env_int("DB_POOL_SIZE", 5),
+            "max_overflow":  _env_int("DB_MAX_OVERFLOW", 5),
+            "pool_recycle":  _env_int("DB_POOL_RECYCLE", -1),
+            "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", False),
+            "pool_timeout":  _env_int("DB_POOL_TIMEOUT", 30),
+        }
+    return {
+        "pool_size":     _env_int("DB_POOL_SIZE", 5),
+        "max_overflow":  _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_recycle":  _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+        "pool_timeout":  _env_int("DB_POOL_TIMEOUT", 30),
+    }
+
+
+# ── Pool telemetry ────────────────────────────────────────────────────────────
+
+class PoolStats:
+    """Process-wide counters for connection checkouts and time spent waiting on the pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts":   self.checkouts,
+                "timeouts":    self.timeouts,
+                "wait_ms_total": round(self.wait_total * 1000, 2),
+                "wait_ms_avg":   round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_ms_max":   round(self.wait_max * 1000, 2),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Records how long each checkout waited for a connection into cls.stats."""
+    stats: PoolStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_wait(time.perf_counter() - started)
+        return conn
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    stats = PoolStats()
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    stats = PoolStats()
+
+
+class InstrumentedReadQueuePool(_InstrumentedPoolMixin, QueuePool):
+    stats = PoolStats()
+
+
+# ── Engine ────────────────────────────────────────────────────────────────────
+
+# In-memory SQLite keeps SQLAlchemy's default single-connection pool
+_engine_kwargs = {} if _is_sqlite_memory else {"poolclass": InstrumentedQueuePool, **_pool_settings()}
 
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False} if _is_sqlite else {},
+    **_engine_kwargs,
+)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **({} if _is_sqlite_memory else {"poolclass": InstrumentedAsyncQueuePool, **_pool_settings()}),
 )
 
-# Enable FK enforcement on every SQLite connection (not needed for Postgres)
+read_engine = create_engine(
+    READ_DATABASE_URL,
+    connect_args={"check_same_thread": False} if READ_DATABASE_URL.startswith("sqlite") else {},
+    poolclass=InstrumentedReadQueuePool,
+    **_pool_settings(),
+) if READ_DATABASE_URL else engine
+
+
+# ── SQLite connection profile ─────────────────────────────────────────────────
+# SQLITE_PROFILE=tuned (default) switches to WAL so readers no longer block on
+# writers; SQLITE_PROFILE=default keeps SQLite's rollback journal. Individual
+# PRAGMAs can be overridden with the SQLITE_* env vars below.
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "tuned").strip().lower()
+
+
+def sqlite_pragmas(profile: str = SQLITE_PROFILE) -> list[str]:
+    """PRAGMA statements run on every new SQLite connection for the given profile."""
+    pragmas = ["PRAGMA foreign_keys=ON"]
+    if profile != "tuned":
+        return pragmas
+    return pragmas + [
+        f"PRAGMA journal_mode={os.getenv('SQLITE_JOURNAL_MODE', 'WAL')}",
+        f"PRAGMA synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+        f"PRAGMA busy_timeout={_env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)}",
+        f"PRAGMA mmap_size={_env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)}",
+        # Negative cache_size is in KiB: -65536 → 64 MiB page cache per connection
+        f"PRAGMA cache_size={_env_int('SQLITE_CACHE_SIZE', -65536)}",
+        f"PRAGMA temp_store={os.getenv('SQLITE_TEMP_STORE', 'MEMORY')}",
+    ]
+
+
+def apply_sqlite_pragmas(dbapi_connection, profile: str = SQLITE_PROFILE):
+    cursor = dbapi_connection.cursor()
+    for pragma in sqlite_pragmas(profile):
+        cursor.execute(pragma)
+    cursor.close()
+
+
+# Enable FK enforcement (and the tuned profile) on every SQLite connection — not needed for Postgres
 if _is_sqlite:
     @event.listens_for(engine, "connect")
+    @event.listens_for(async_engine.sync_engine, "connect")
     def enable_sqlite_fk(dbapi_connection, connection_record):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
+        apply_sqlite_pragmas(dbapi_connection)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# expire_on_commit=False: async routes read attributes after commit without another round trip
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
@@ -41,3 +225,143 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """FastAPI dependency for `async def` routes: yields an AsyncSession per request."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def has_read_replica() -> bool:
+    return read_engine is not engine
+
+
+def dialect_name(db) -> str:
+    """Backend name ("sqlite", "postgresql") for a Session, AsyncSession or Connection."""
+    dialect = getattr(db, "dialect", None) or db.bind.dialect
+    return dialect.name
+
+
+def sql_date(column, dialect: str):
+    """Calendar date of a DATETIME column, as a SQL expression."""
+    # CAST(... AS DATE) on SQLite yields a number, so use date() there
+    return func.date(column) if dialect == "sqlite" else cast(column, Date)
+
+
+def upsert_insert(db, model):
+    """Dialect INSERT construct for `model` that supports .on_conflict_do_update()."""
+    if dialect_name(db) == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+
+# ── Write tracking ────────────────────────────────────────────────────────────
+# Every committed ORM session reports which users' data it changed. Rows are
+# attributed through their user_id / challenger_id / opponent_id columns (or
+# their own id for users), plus the request's authenticated user, which
+# get_current_user stores in session.info["user_id"]. Caches and read routing
+# subscribe with @on_user_write; bulk UPDATE/DELETE statements that bypass the
+# unit of work should call touch_user() explicitly.
+
+_USER_ID_COLUMNS = ("user_id", "challenger_id", "opponent_id")
+_write_listeners = []
+
+
+def on_user_write(fn):
+    """Register fn(user_ids: set[int]) to run after every commit that changed those users' rows."""
+    _write_listeners.append(fn)
+    return fn
+
+
+def touch_user(db, *user_ids: int):
+    """Mark users as written by this session's next commit (for writes the ORM can't see)."""
+    db.info.setdefault("touched_users", set()).update(uid for uid in user_ids if uid is not None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_touched_users(session, flush_context):
+    touched = session.info.setdefault("touched_users", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        state = inspect(obj).dict  # loaded values only — never triggers a lazy load mid-flush
+        if getattr(obj, "__tablename__", None) == "users":
+            touched.add(state.get("id"))
+        touched.update(state.get(col) for col in _USER_ID_COLUMNS)
+    touched.add(session.info.get("user_id"))
+    touched.discard(None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        touch_user(orm_execute_state.session, orm_execute_state.session.info.get("user_id"))
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_write_listeners(session):
+    touched = session.info.pop("touched_users", None)
+    if touched:
+        for listener in _write_listeners:
+            listener(touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_touched_users(session):
+    session.info.pop("touched_users", None)
+
+
+# ── Read-your-writes ──────────────────────────────────────────────────────────
+# After a user writes, their reads go to the primary for READ_STALENESS_SECONDS
+# so a replica that is still catching up never hides their own change. The map
+# is per process; clients can always force the primary with X-Read-Consistency.
+
+READ_STALENESS_SECONDS = float(os.getenv("READ_STALENESS_SECONDS", "5"))
+_RECENT_WRITERS_MAX = 10_000
+_recent_writers: "OrderedDict[int, float]" = OrderedDict()
+_recent_writers_lock = threading.Lock()
+
+
+@on_user_write
+def _remember_writers(user_ids: set):
+    now = time.monotonic()
+    with _recent_writers_lock:
+        for uid in user_ids:
+            _recent_writers[uid] = now
+            _recent_writers.move_to_end(uid)
+        while len(_recent_writers) > _RECENT_WRITERS_MAX:
+            _recent_writers.popitem(last=False)
+
+
+def wrote_recently(user_id: int) -> bool:
+    with _recent_writers_lock:
+        written_at = _recent_writers.get(user_id)
+    return written_at is not None and time.monotonic() - written_at < READ_STALENESS_SECONDS
+
+
+def _pool_status(pool) -> dict:
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "pool_size":    pool.size(),
+            "checked_out":  pool.checkedout(),
+            "checked_in":   pool.checkedin(),
+            "overflow":     max(0, pool.overflow()),
+            "max_overflow": pool._max_overflow,
+            "timeout_s":    pool.timeout(),
+        })
+    if isinstance(pool, _InstrumentedPoolMixin):
+        status.update(pool.stats.snapshot())
+    return status
+
+
+def get_pool_status() -> dict:
+    """Current pool occupancy plus cumulative wait-time counters, per engine."""
+    status = {
+        "sync":  _pool_status(engine.pool),
+        "async": _pool_status(async_engine.sync_engine.pool),
+    }
+    if has_read_replica():
+        status["read"] = _pool_status(read_engine.pool)
+    return status
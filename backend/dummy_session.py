@@ -5,6 +5,9 @@ sys.path.insert(0, os.path.dirname(__file__))
 from database import SessionLocal
 from models import Session, User
 from datetime import datetime, timedelta
+from services.daily_stats import rebuild_daily_stats
+from services.local_time import local_date
+from services.streaks import rebuild_streaks
 
 db = SessionLocal()
 user = db.query(User).filter(User.role == "worker").first()
@@ -15,14 +18,20 @@ else:
     # insert dummy sessions
     now = datetime.utcnow()
     for i in range(5):
+        end_time = now - timedelta(days=i, hours=1)
         s = Session(
             user_id=user.id,
             start_time=now - timedelta(days=i, hours=2),
-            end_time=now - timedelta(days=i, hours=1),
+            end_time=end_time,
             duration_minutes=60,
             energy_level=8,
-            status="completed"
+            status="completed",
+            local_date=local_date(user, end_time),
         )
         db.add(s)
+    db.flush()
+    # Stats, trends and streaks read the rollups and streak columns, not raw sessions
+    rebuild_daily_stats(db, user_id=user.id)
+    rebuild_streaks(db, user_id=user.id)
     db.commit()
     print("Added dummy sessions for analytics.")
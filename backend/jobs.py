@@ -0,0 +1,130 @@
+"""
+jobs.py — Maintenance jobs run outside of request handling.
+
+Usage:
+    cd backend
+    python jobs.py backfill-daily-stats [--user ID]
+    python jobs.py backfill-arena-standings
+    python jobs.py repair-streaks [--user ID]
+    python jobs.py refresh-team-stats [--team ID]
+    python jobs.py checkpoint-xp [--user ID]
+    python jobs.py compact-xp-logs [--user ID]
+"""
+import argparse
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from database import SessionLocal  # noqa: E402
+from services.arena_standings import rebuild_arena_standings  # noqa: E402
+from services.daily_stats import rebuild_daily_stats  # noqa: E402
+from services.leaderboard_cache import version_bump  # noqa: E402
+from services.streaks import rebuild_streaks  # noqa: E402
+from services.team_stats import refresh_team_stats  # noqa: E402
+from services.xp_ledger import XP_LOG_RETENTION_DAYS, checkpoint_xp, compact_xp_logs  # noqa: E402
+
+
+def backfill_daily_stats(args) -> int:
+    db = SessionLocal()
+    try:
+        written = rebuild_daily_stats(db, user_id=args.user)
+        db.commit()
+    finally:
+        db.close()
+    scope = f"user {args.user}" if args.user is not None else "all users"
+    print(f"Rebuilt {written} user_daily_stats rows for {scope}.")
+    return 0
+
+
+def backfill_arena_standings(args) -> int:
+    db = SessionLocal()
+    try:
+        written = rebuild_arena_standings(db)
+        db.execute(version_bump(db))
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt {written} arena_standings rows.")
+    return 0
+
+
+def repair_streaks(args) -> int:
+    db = SessionLocal()
+    try:
+        written = rebuild_streaks(db, user_id=args.user)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Recomputed streaks for {written} users.")
+    return 0
+
+
+def refresh_team_dashboards(args) -> int:
+    db = SessionLocal()
+    try:
+        written = refresh_team_stats(db, team_id=args.team)
+        db.commit()
+    finally:
+        db.close()
+    scope = f"team {args.team}" if args.team is not None else "all teams"
+    print(f"Refreshed {written} team_stats rows for {scope}.")
+    return 0
+
+
+def checkpoint_xp_balances(args) -> int:
+    db = SessionLocal()
+    try:
+        written = checkpoint_xp(db, user_id=args.user)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Wrote {written} xp_checkpoints rows.")
+    return 0
+
+
+def compact_xp(args) -> int:
+    db = SessionLocal()
+    try:
+        deleted = compact_xp_logs(db, user_id=args.user)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Folded {deleted} xp_logs rows older than {XP_LOG_RETENTION_DAYS} days into checkpoints.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python jobs.py", description="XPilot maintenance jobs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    backfill = sub.add_parser("backfill-daily-stats", help="recompute user_daily_stats from source tables")
+    backfill.add_argument("--user", type=int, default=None, help="only this user id (default: everyone)")
+    backfill.set_defaults(func=backfill_daily_stats)
+
+    standings = sub.add_parser("backfill-arena-standings", help="recompute arena_standings from finished matches")
+    standings.set_defaults(func=backfill_arena_standings)
+
+    repair = sub.add_parser("repair-streaks", help="recompute user streaks and 7-day activity from user_daily_stats")
+    repair.add_argument("--user", type=int, default=None, help="only this user id (default: everyone)")
+    repair.set_defaults(func=repair_streaks)
+
+    teams = sub.add_parser("refresh-team-stats", help="recompute the precomputed team dashboards (run on a schedule)")
+    teams.add_argument("--team", type=int, default=None, help="only this team id (default: every team)")
+    teams.set_defaults(func=refresh_team_dashboards)
+
+    checkpoint = sub.add_parser("checkpoint-xp", help="write XP balance checkpoints for closed days")
+    checkpoint.add_argument("--user", type=int, default=None, help="only this user id (default: everyone)")
+    checkpoint.set_defaults(func=checkpoint_xp_balances)
+
+    compact = sub.add_parser("compact-xp-logs", help="checkpoint, then delete xp_logs rows past XP_LOG_RETENTION_DAYS")
+    compact.add_argument("--user", type=int, default=None, help="only this user id (default: everyone)")
+    compact.set_defaults(func=compact_xp)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
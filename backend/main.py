@@ -13,12 +13,12 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
+from database import async_engine
 
-# Import ALL models before create_all so SQLAlchemy registers every table
+# Import ALL models before migrating so SQLAlchemy registers every table
 import models  # noqa: F401
 
-from routes import auth, sessions, reflections, xp, energy, analytics, chat, resume, coach, topics, tracks, tasks, projects, schedule, day_summary, worker_analytics, arena
+from routes import auth, sessions, reflections, xp, energy, analytics, chat, resume, coach, topics, tracks, tasks, projects, schedule, day_summary, worker_analytics, arena, health, export, teams
 
 # ── App ───────────────────────────────────────────────────────────────────────
 app = FastAPI(
@@ -55,19 +55,30 @@ app.include_router(day_summary.router)
 app.include_router(worker_analytics.router)
 app.include_router(arena.router)
 app.include_router(arena.leaderboard_router)
+app.include_router(health.router)
+app.include_router(export.router)
+app.include_router(teams.router)
 
 
-# ── Create all tables on startup ─────────────────────────────────────────────
+# ── Migrate schema on startup ────────────────────────────────────────────────
 @app.on_event("startup")
 def startup():
     """
     Runs once when the server starts.
-    Applies safe column migrations, then creates any missing tables.
+    A single schema_version check; pending migrations are applied only when the schema is behind.
     """
-    from routes.migrate import run_migrations
-    run_migrations()
-    Base.metadata.create_all(bind=engine)
-    print("Database tables verified / created.")
+    from migrations import run_migrations
+    applied = run_migrations()
+    if applied:
+        print(f"Database migrated to version {applied[-1]}.")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Write buffered arena pauses, then close pooled async connections so aiosqlite worker threads don't block exit."""
+    from services.pause_buffer import stop_pause_flusher
+    await stop_pause_flusher()
+    await async_engine.dispose()
 
 
 @app.get("/")
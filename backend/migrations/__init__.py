@@ -0,0 +1,9 @@
+"""
+migrations — Versioned, dialect-aware schema migrations.
+
+Each migration in versions.py has a version number; the highest applied
+version is recorded in the schema_version table. On startup run_migrations()
+does a single version check and only takes the slow path when something is
+pending. Run `python -m migrations --help` to migrate outside of app boot.
+"""
+from migrations.runner import run_migrations, current_version, pending_migrations  # noqa: F401
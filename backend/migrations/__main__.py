@@ -0,0 +1,43 @@
+"""
+migrations/__main__.py — Run migrations outside of app boot.
+
+Usage:
+    cd backend
+    python -m migrations status
+    python -m migrations upgrade [--target N]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+from migrations.runner import current_version, pending_migrations, run_migrations  # noqa: E402
+from migrations.versions import LATEST_VERSION  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m migrations", description="XPilot schema migrations")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="show the applied version and pending migrations")
+    up = sub.add_parser("upgrade", help="apply pending migrations")
+    up.add_argument("--target", type=int, default=None, help=f"stop at this version (default: {LATEST_VERSION})")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        print(f"Current version: {current_version()} (latest: {LATEST_VERSION})")
+        for m in pending_migrations():
+            print(f"  pending  {m.version:04d}_{m.name}{'' if m.transactional else '  [online]'}")
+        return 0
+
+    applied = run_migrations(target=args.target)
+    print(f"Applied {len(applied)} migration(s). Now at version {current_version()}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
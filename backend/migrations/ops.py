@@ -0,0 +1,52 @@
+"""
+migrations/ops.py — Idempotent schema operations shared by migration scripts.
+Every helper checks the live schema first, so a migration can safely re-run
+against a database that already has (part of) the change.
+"""
+from sqlalchemy import Index, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex
+
+
+def is_postgres(conn: Connection) -> bool:
+    return conn.dialect.name == "postgresql"
+
+
+def has_table(conn: Connection, table: str) -> bool:
+    return inspect(conn).has_table(table)
+
+
+def add_column(conn: Connection, table: str, column: str, ddl: str) -> bool:
+    """ALTER TABLE … ADD COLUMN unless the column already exists. Returns True if added."""
+    if not has_table(conn, table):
+        return False
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column in existing:
+        return False
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    print(f"[migrate] Added {column} to {table}")
+    return True
+
+
+def create_index(conn: Connection, index: Index, concurrently: bool = True):
+    """
+    CREATE INDEX IF NOT EXISTS for an index declared on a model.
+    On Postgres the build runs CONCURRENTLY (writes keep flowing), which
+    requires the migration to be non-transactional.
+    """
+    table = index.table.name
+    if not has_table(conn, table):
+        return
+    online = "CONCURRENTLY " if concurrently and is_postgres(conn) else ""
+    unique = "UNIQUE " if index.unique else ""
+    # Rendered by the dialect so desc() columns keep their DESC
+    compiler = conn.dialect.ddl_compiler(conn.dialect, CreateIndex(index))
+    columns = ", ".join(
+        compiler.sql_compiler.process(expr, include_table=False, literal_binds=True) for expr in index.expressions
+    )
+    conn.execute(text(f"CREATE {unique}INDEX {online}IF NOT EXISTS {index.name} ON {table} ({columns})"))
+
+
+def create_table(conn: Connection, model):
+    """Create a model's table (and its declared indexes) if it does not exist yet."""
+    model.__table__.create(bind=conn, checkfirst=True)
@@ -0,0 +1,110 @@
+"""
+migrations/runner.py — Applies pending migrations and records them in schema_version.
+
+Fast path (every worker boot): one SELECT MAX(version). Slow path: take a
+migration lock (pg_advisory_lock on Postgres), re-check, then apply each
+pending migration and record its version.
+"""
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, String, Table, func, insert, select, text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from database import engine as default_engine
+from migrations.versions import MIGRATIONS, LATEST_VERSION, Migration
+
+# Kept out of Base.metadata so create_all never touches it
+_meta = MetaData()
+schema_version = Table(
+    "schema_version", _meta,
+    Column("version",    Integer, primary_key=True, autoincrement=False),
+    Column("name",       String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Arbitrary app-wide key for pg_advisory_lock
+_PG_LOCK_KEY = 580_110_001
+
+
+def current_version(engine: Engine = default_engine) -> int:
+    """Highest applied migration version (0 for a database that has never been migrated)."""
+    with engine.connect() as conn:
+        return _read_version(conn)
+
+
+def pending_migrations(engine: Engine = default_engine) -> list[Migration]:
+    version = current_version(engine)
+    return [m for m in MIGRATIONS if m.version > version]
+
+
+def run_migrations(engine: Engine = default_engine, target: int | None = None) -> list[int]:
+    """Apply every pending migration up to target (default: latest). Returns the versions applied."""
+    target = LATEST_VERSION if target is None else target
+    if current_version(engine) >= target:
+        return []
+
+    applied = []
+    with _migration_lock(engine):
+        _meta.create_all(bind=engine, checkfirst=True)
+        with engine.connect() as conn:
+            version = _read_version(conn)
+
+        for migration in MIGRATIONS:
+            if version < migration.version <= target:
+                started = time.perf_counter()
+                _apply(engine, migration)
+                applied.append(migration.version)
+                print(f"[migrate] {migration.version:04d}_{migration.name} "
+                      f"applied in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return applied
+
+
+# ── Internals ─────────────────────────────────────────────────────────────────
+
+def _read_version(conn: Connection) -> int:
+    try:
+        return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        conn.rollback()  # schema_version does not exist yet
+        return 0
+
+
+def _apply(engine: Engine, migration: Migration):
+    if migration.transactional:
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            _record(conn, migration)
+        return
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        migration.upgrade(conn)
+    with engine.begin() as conn:
+        _record(conn, migration)
+
+
+def _record(conn: Connection, migration: Migration):
+    exists = conn.execute(
+        select(schema_version.c.version).where(schema_version.c.version == migration.version)
+    ).first()
+    if not exists:  # another worker may have applied it first — migrations are idempotent
+        conn.execute(insert(schema_version).values(
+            version=migration.version, name=migration.name, applied_at=datetime.utcnow(),
+        ))
+
+
+@contextmanager
+def _migration_lock(engine: Engine):
+    """Serialise migrations across workers. SQLite relies on its file lock plus idempotent scripts."""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _PG_LOCK_KEY})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _PG_LOCK_KEY})
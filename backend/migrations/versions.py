@@ -0,0 +1,290 @@
+"""
+migrations/versions.py — Ordered migration scripts.
+
+Append new migrations to MIGRATIONS with the next version number; never
+edit or reorder one that has shipped. Every upgrade must be idempotent:
+version 1 creates the full current schema on a fresh database, so later
+migrations may find their change already applied.
+
+Data statements are written against lightweight table()/column() constructs
+naming only the columns that exist at that version, never against the
+models: a model's defaults and onupdate hooks follow the live schema and
+would reference columns an older database does not have yet.
+"""
+from datetime import datetime
+from typing import Callable, NamedTuple
+from sqlalchemy import case, delete, func, or_, select, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import column, table
+
+from database import Base, sql_date
+import models
+from migrations.ops import add_column, create_index, create_table, has_table
+from services.arena_standings import rebuild_arena_standings
+from services.daily_stats import rebuild_daily_stats
+from services.streaks import rebuild_streaks
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+    transactional: bool = True  # False → runs in autocommit (e.g. CREATE INDEX CONCURRENTLY)
+
+
+# ── 1: baseline ──────────────────────────────────────────────────────────────
+
+def _baseline(conn: Connection):
+    """Columns added before versioned migrations existed, then any missing tables."""
+    add_column(conn, "user_tasks", "order_index", "INTEGER DEFAULT 0")
+    add_column(conn, "users", "last_active_task_id", "INTEGER")
+    add_column(conn, "users", "elo_rating", "INTEGER DEFAULT 1200")
+    add_column(conn, "users", "rank_points", "INTEGER DEFAULT 0")
+    Base.metadata.create_all(bind=conn)
+
+
+# ── 2: hot-path composite indexes ────────────────────────────────────────────
+
+_HOT_PATH_INDEXES = [
+    ("sessions",      "ix_sessions_user_end"),
+    ("sessions",      "ix_sessions_user_start"),
+    ("xp_logs",       "ix_xp_logs_user_created"),
+    ("energy_logs",   "ux_energy_logs_user_date"),
+    ("user_tasks",    "ix_user_tasks_user_status_order"),
+    ("focus_tracks",  "ix_focus_tracks_user_status"),
+    ("chat_history",  "ix_chat_history_focus_ts"),
+    ("challenges",    "ix_challenges_status_challenger"),
+    ("challenges",    "ix_challenges_status_opponent"),
+    ("match_results", "ix_match_results_winner"),
+]
+
+
+def _hot_path_indexes(conn: Connection):
+    # Collapse duplicate energy days first so the unique index can be built
+    if has_table(conn, "energy_logs"):
+        removed = conn.execute(text(
+            "DELETE FROM energy_logs WHERE id NOT IN ("
+            "SELECT MAX(id) FROM energy_logs GROUP BY user_id, date)"
+        )).rowcount
+        if removed:
+            print(f"[migrate] Removed {removed} duplicate energy_logs rows")
+
+    for table_name, index_name in _HOT_PATH_INDEXES:
+        table = Base.metadata.tables[table_name]
+        index = next(i for i in table.indexes if i.name == index_name)
+        create_index(conn, index)
+
+
+# ── 3: per-user daily rollups ────────────────────────────────────────────────
+
+def _user_daily_stats(conn: Connection):
+    # Backfilled by migration 9, once the local_date columns it reads exist
+    create_table(conn, models.UserDailyStats)
+
+
+# ── 4: covering index for session stats aggregates ──────────────────────────
+
+def _session_stats_index(conn: Connection):
+    index = next(i for i in models.Session.__table__.indexes if i.name == "ix_sessions_user_status_energy")
+    create_index(conn, index)
+
+
+# ── 5–6: arena standings + leaderboard index ─────────────────────────────────
+
+def _arena_standings(conn: Connection):
+    create_table(conn, models.ArenaStanding)
+    written = rebuild_arena_standings(conn)
+    if written:
+        print(f"[migrate] Backfilled {written} arena_standings rows")
+
+
+def _leaderboard_index(conn: Connection):
+    index = next(i for i in models.User.__table__.indexes if i.name == "ix_users_role_elo")
+    create_index(conn, index)
+
+
+# ── 7: snapshot versions ─────────────────────────────────────────────────────
+
+def _cache_versions(conn: Connection):
+    create_table(conn, models.CacheVersion)
+
+
+# ── 8: streak columns on users ───────────────────────────────────────────────
+
+def _user_streaks(conn: Connection):
+    add_column(conn, "users", "current_streak", "INTEGER DEFAULT 0")
+    add_column(conn, "users", "longest_streak", "INTEGER DEFAULT 0")
+    add_column(conn, "users", "last_active_date", "DATE")
+    add_column(conn, "users", "activity_bitmap", "INTEGER DEFAULT 0")
+    written = rebuild_streaks(conn)
+    if written:
+        print(f"[migrate] Backfilled streaks for {written} users")
+
+
+# ── 9–10: per-user timezone + local dates ────────────────────────────────────
+
+_LOCAL_DATES = [
+    ("sessions",   "local_date",           "end_time"),
+    ("xp_logs",    "local_date",           "created_at"),
+    ("user_tasks", "completed_local_date", "completed_at"),
+]
+
+
+def _local_dates(conn: Connection):
+    add_column(conn, "users", "timezone", "VARCHAR(64) DEFAULT 'UTC'")
+    for table_name, local_date, timestamp in _LOCAL_DATES:
+        add_column(conn, table_name, local_date, "DATE")
+        # Every existing user is on UTC, so the local date is the UTC date
+        rows = table(table_name, column(local_date), column(timestamp))
+        conn.execute(
+            update(rows)
+            .where(rows.c[local_date].is_(None), rows.c[timestamp].isnot(None))
+            .values({local_date: sql_date(rows.c[timestamp], conn.dialect.name)})
+        )
+    written = rebuild_daily_stats(conn)
+    if written:
+        print(f"[migrate] Rebuilt {written} user_daily_stats rows on local dates")
+    rebuild_streaks(conn)
+
+
+def _local_date_indexes(conn: Connection):
+    for model, name in (
+        (models.Session,  "ix_sessions_user_local_date"),
+        (models.XPLog,    "ix_xp_logs_user_local_date"),
+        (models.UserTask, "ix_user_tasks_user_completed_local"),
+    ):
+        create_index(conn, next(i for i in model.__table__.indexes if i.name == name))
+
+
+# ── 11–12: teams + precomputed team dashboards ───────────────────────────────
+
+def _teams(conn: Connection):
+    create_table(conn, models.Team)
+    create_table(conn, models.TeamStats)
+    add_column(conn, "users", "team_id", "INTEGER REFERENCES teams(id) ON DELETE SET NULL")
+
+
+def _team_index(conn: Connection):
+    index = next(i for i in models.User.__table__.indexes if i.name == "ix_users_team")
+    create_index(conn, index)
+
+
+# ── 13–14: XP award sources ──────────────────────────────────────────────────
+
+def _xp_sources(conn: Connection):
+    # Existing rows keep NULL sources; NULLs never collide in the unique key
+    add_column(conn, "xp_logs", "source_type", "VARCHAR(20)")
+    add_column(conn, "xp_logs", "source_id", "INTEGER")
+
+
+def _xp_source_index(conn: Connection):
+    index = next(i for i in models.XPLog.__table__.indexes if i.name == "ux_xp_logs_source")
+    create_index(conn, index)
+
+
+# ── 15: XP balance checkpoints ───────────────────────────────────────────────
+
+def _xp_checkpoints(conn: Connection):
+    create_table(conn, models.XPCheckpoint)
+
+
+# ── 16–17: one match result per challenge ────────────────────────────────────
+
+def _dedupe_match_results(conn: Connection):
+    # Double-completed challenges (the race complete_challenge now prevents) keep their first result
+    results = table("match_results", column("id"), column("challenge_id"))
+    first = select(func.min(results.c.id)).group_by(results.c.challenge_id)
+    removed = conn.execute(delete(results).where(results.c.id.not_in(first))).rowcount
+    if removed:
+        print(f"[migrate] Removed {removed} duplicate match_results rows")
+        rebuild_arena_standings(conn)
+
+
+def _match_result_index(conn: Connection):
+    index = next(i for i in models.MatchResult.__table__.indexes if i.name == "ux_match_results_challenge")
+    create_index(conn, index)
+
+
+# ── 18–19: updated_at export cursors for tasks and energy logs ───────────────
+
+_UPDATED_AT = (
+    (models.UserTask,  "ix_user_tasks_user_updated"),
+    (models.EnergyLog, "ix_energy_logs_user_updated"),
+)
+
+
+def _updated_at(conn: Connection):
+    # Existing rows count as updated now: the next incremental export re-sends them once
+    now = datetime.utcnow()
+    for model, _ in _UPDATED_AT:
+        rows = table(model.__tablename__, column("updated_at"))
+        add_column(conn, rows.name, "updated_at", "TIMESTAMP")
+        conn.execute(update(rows).where(rows.c.updated_at.is_(None)).values(updated_at=now))
+
+
+def _updated_at_indexes(conn: Connection):
+    for model, name in _UPDATED_AT:
+        create_index(conn, next(i for i in model.__table__.indexes if i.name == name))
+
+
+# ── 20: task list order ──────────────────────────────────────────────────────
+
+def _task_order_index(conn: Connection):
+    index = next(i for i in models.UserTask.__table__.indexes if i.name == "ix_user_tasks_user_order")
+    create_index(conn, index)
+
+
+# ── 21: stored XP award breakdown ────────────────────────────────────────────
+
+def _xp_bonuses(conn: Connection):
+    added = add_column(conn, "xp_logs", "reflection_bonus", "INTEGER DEFAULT 0")
+    add_column(conn, "xp_logs", "consistency_bonus", "INTEGER DEFAULT 0")
+    if not added:
+        return
+    # Existing session awards only name their bonuses in the reason, as fixed
+    # phrases with fixed amounts at the time; read them once here
+    logs = table(
+        "xp_logs", column("source_type"), column("reason"), column("reflection_bonus"), column("consistency_bonus"),
+    )
+    conn.execute(
+        update(logs)
+        .where(or_(logs.c.source_type == "session", logs.c.source_type.is_(None)))
+        .values(
+            reflection_bonus=case((logs.c.reason.like("%reflection bonus%"), 20), else_=0),
+            consistency_bonus=case((logs.c.reason.like("%consistency bonus%"), 10), else_=0),
+        )
+    )
+
+
+# ── 22: team invitations ─────────────────────────────────────────────────────
+
+def _team_invites(conn: Connection):
+    create_table(conn, models.TeamInvite)
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline", _baseline),
+    Migration(2, "hot_path_indexes", _hot_path_indexes, transactional=False),
+    Migration(3, "user_daily_stats", _user_daily_stats),
+    Migration(4, "session_stats_index", _session_stats_index, transactional=False),
+    Migration(5, "arena_standings", _arena_standings),
+    Migration(6, "leaderboard_index", _leaderboard_index, transactional=False),
+    Migration(7, "cache_versions", _cache_versions),
+    Migration(8, "user_streaks", _user_streaks),
+    Migration(9, "local_dates", _local_dates),
+    Migration(10, "local_date_indexes", _local_date_indexes, transactional=False),
+    Migration(11, "teams", _teams),
+    Migration(12, "team_index", _team_index, transactional=False),
+    Migration(13, "xp_sources", _xp_sources),
+    Migration(14, "xp_source_index", _xp_source_index, transactional=False),
+    Migration(15, "xp_checkpoints", _xp_checkpoints),
+    Migration(16, "dedupe_match_results", _dedupe_match_results),
+    Migration(17, "match_result_index", _match_result_index, transactional=False),
+    Migration(18, "updated_at", _updated_at),
+    Migration(19, "updated_at_indexes", _updated_at_indexes, transactional=False),
+    Migration(20, "task_order_index", _task_order_index, transactional=False),
+    Migration(21, "xp_bonuses", _xp_bonuses),
+    Migration(22, "team_invites", _team_invites),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
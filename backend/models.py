@@ -2,9 +2,12 @@
 models.py — All SQLAlchemy ORM models for XPilot.
 Relationships use cascade="all, delete-orphan" so child rows are removed
 automatically when a parent is deleted, even with SQLite FK enforcement.
+
+Composite indexes in __table_args__ mirror the hot query filters; existing
+databases pick them up through migrations/versions.py.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Date, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Date, Boolean, Index, desc
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -13,6 +16,10 @@ from database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_role_elo", "role", "elo_rating"),  # leaderboard order
+        Index("ix_users_team", "team_id"),
+    )
 
     id                 = Column(Integer, primary_key=True, index=True)
     name               = Column(String(100), nullable=False)
@@ -24,6 +31,12 @@ class User(Base):
     rank_points        = Column(Integer, default=0)     # cumulative arena points
     created_at         = Column(DateTime, default=datetime.utcnow)
     last_active_task_id = Column(Integer, nullable=True)  # work continuity
+    current_streak     = Column(Integer, default=0)       # services/streaks.py
+    longest_streak     = Column(Integer, default=0)
+    last_active_date   = Column(Date, nullable=True)
+    activity_bitmap    = Column(Integer, default=0)       # bit 0 = last_active_date, bit i = i days before
+    timezone           = Column(String(64), default="UTC")  # IANA name; defines the user's calendar days
+    team_id            = Column(Integer, ForeignKey("teams.id", ondelete="SET NULL"), nullable=True)
 
     sessions     = relationship("Session",     back_populates="user", cascade="all, delete-orphan")
     xp_logs      = relationship("XPLog",       back_populates="user", cascade="all, delete-orphan")
@@ -31,12 +44,20 @@ class User(Base):
     focus_tracks = relationship("FocusTrack",  back_populates="user", cascade="all, delete-orphan")
     tasks        = relationship("UserTask",    back_populates="user", cascade="all, delete-orphan")
     projects     = relationship("Project",     back_populates="user", cascade="all, delete-orphan")
+    daily_stats  = relationship("UserDailyStats", back_populates="user", cascade="all, delete-orphan")
 
 
 # ── Sessions + Reflections ───────────────────────────────────────────────────
 
 class Session(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        Index("ix_sessions_user_end", "user_id", "end_time"),
+        Index("ix_sessions_user_start", "user_id", "start_time"),
+        # Covers the /sessions/stats aggregates so they never touch the table
+        Index("ix_sessions_user_status_energy", "user_id", "status", "energy_level", "duration_minutes"),
+        Index("ix_sessions_user_local_date", "user_id", "local_date"),
+    )
 
     id               = Column(Integer, primary_key=True, index=True)
     task_id          = Column(Integer, ForeignKey("user_tasks.id", ondelete="SET NULL"), nullable=True)
@@ -46,6 +67,7 @@ class Session(Base):
     duration_minutes = Column(Float, nullable=True)
     energy_level     = Column(Integer, nullable=True)
     status           = Column(String(20), default="completed") # completed | abandoned
+    local_date       = Column(Date, nullable=True)  # user's calendar day at end_time
 
     user       = relationship("User",       back_populates="sessions")
     reflection = relationship("Reflection", back_populates="session", uselist=False,
@@ -67,27 +89,90 @@ class Reflection(Base):
 
 class XPLog(Base):
     __tablename__ = "xp_logs"
+    __table_args__ = (
+        Index("ix_xp_logs_user_created", "user_id", "created_at"),
+        Index("ix_xp_logs_user_local_date", "user_id", "local_date"),
+        # One award per source: retried credits hit this key and become no-ops
+        Index("ux_xp_logs_source", "user_id", "source_type", "source_id", unique=True),
+    )
 
     id         = Column(Integer, primary_key=True, index=True)
     user_id    = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     xp_awarded = Column(Integer, nullable=False)
     reason     = Column(String(255), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    local_date = Column(Date, nullable=True)  # user's calendar day at created_at
+    source_type = Column(String(20), nullable=True)  # session | challenge; NULL on legacy rows
+    source_id   = Column(Integer, nullable=True)
+    # Parts of a session award (base = xp_awarded minus both); 0 for other sources
+    reflection_bonus  = Column(Integer, default=0)
+    consistency_bonus = Column(Integer, default=0)
 
     user = relationship("User", back_populates="xp_logs")
 
 
+class XPCheckpoint(Base):
+    """
+    One closed local day of a user's XP ledger (services/xp_ledger.py): the
+    day's total, how many xp_logs rows it covers and the running balance at
+    the end of the day. Once `compacted`, the day's detail rows are gone and
+    this row stands in for them.
+    """
+    __tablename__ = "xp_checkpoints"
+    __table_args__ = (
+        Index("ux_xp_checkpoints_user_date", "user_id", "date", unique=True),
+    )
+
+    id          = Column(Integer, primary_key=True, index=True)
+    user_id     = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    date        = Column(Date, nullable=False)
+    xp_total    = Column(Integer, nullable=False, default=0)
+    entry_count = Column(Integer, nullable=False, default=0)
+    balance     = Column(Integer, nullable=False, default=0)  # sum of every award through this day
+    compacted   = Column(Boolean, nullable=False, default=False)
+    created_at  = Column(DateTime, default=datetime.utcnow)
+
+
 class EnergyLog(Base):
     __tablename__ = "energy_logs"
+    __table_args__ = (
+        Index("ux_energy_logs_user_date", "user_id", "date", unique=True),  # one log per user per day
+        Index("ix_energy_logs_user_updated", "user_id", "updated_at"),
+    )
 
-    id      = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    level   = Column(Integer, nullable=False)  # 1–10
-    date    = Column(Date, nullable=False)
+    id         = Column(Integer, primary_key=True, index=True)
+    user_id    = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    level      = Column(Integer, nullable=False)  # 1–10
+    date       = Column(Date, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # export cursor
 
     user = relationship("User", back_populates="energy_logs")
 
 
+class UserDailyStats(Base):
+    """
+    Per-user, per-local-day rollup maintained in the same transaction as the
+    writes it summarises (services/daily_stats.py). Sessions count on the day
+    they end, XP on the day it is logged, tasks on the day they are completed,
+    each in the user's timezone (the local_date columns).
+    """
+    __tablename__ = "user_daily_stats"
+    __table_args__ = (
+        Index("ux_user_daily_stats_user_date", "user_id", "date", unique=True),
+    )
+
+    id              = Column(Integer, primary_key=True, index=True)
+    user_id         = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    date            = Column(Date, nullable=False)
+    focus_minutes   = Column(Float, nullable=False, default=0.0)
+    session_count   = Column(Integer, nullable=False, default=0)
+    xp_earned       = Column(Integer, nullable=False, default=0)
+    tasks_completed = Column(Integer, nullable=False, default=0)
+    energy_level    = Column(Integer, nullable=True)  # last level logged that day
+
+    user = relationship("User", back_populates="daily_stats")
+
+
 # ── Projects + Tasks ─────────────────────────────────────────────────────────
 
 class Project(Base):
@@ -111,6 +196,12 @@ class Project(Base):
 
 class UserTask(Base):
     __tablename__ = "user_tasks"
+    __table_args__ = (
+        Index("ix_user_tasks_user_status_order", "user_id", "status", "order_index"),
+        Index("ix_user_tasks_user_completed_local", "user_id", "completed_local_date"),
+        Index("ix_user_tasks_user_updated", "user_id", "updated_at"),
+        Index("ix_user_tasks_user_order", "user_id", "order_index", desc("created_at")),  # GET /tasks/ order
+    )
 
     id                = Column(Integer, primary_key=True, index=True)
     user_id           = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -123,6 +214,8 @@ class UserTask(Base):
     order_index       = Column(Integer, default=0)             # manual sort
     created_at        = Column(DateTime, default=datetime.utcnow)
     completed_at      = Column(DateTime, nullable=True)
+    completed_local_date = Column(Date, nullable=True)         # user's calendar day at completed_at
+    updated_at        = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # export cursor
 
     user        = relationship("User",    back_populates="tasks")
     project_ref = relationship("Project", back_populates="tasks")
@@ -133,6 +226,9 @@ class UserTask(Base):
 class FocusTrack(Base):
     """One row per subject a user is studying. Only one track per user is active at a time."""
     __tablename__ = "focus_tracks"
+    __table_args__ = (
+        Index("ix_focus_tracks_user_status", "user_id", "status"),
+    )
 
     id         = Column(Integer, primary_key=True, index=True)
     user_id    = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -149,6 +245,9 @@ class FocusTrack(Base):
 class ChatHistory(Base):
     """Per-message chat log, isolated to a FocusTrack."""
     __tablename__ = "chat_history"
+    __table_args__ = (
+        Index("ix_chat_history_focus_ts", "focus_id", "timestamp"),
+    )
 
     id        = Column(Integer, primary_key=True, index=True)
     user_id   = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -180,6 +279,10 @@ class TopicMemory(Base):
 class Challenge(Base):
     """1-vs-1 deep-work challenge between two workers."""
     __tablename__ = "challenges"
+    __table_args__ = (
+        Index("ix_challenges_status_challenger", "status", "challenger_id"),
+        Index("ix_challenges_status_opponent", "status", "opponent_id"),
+    )
 
     id                  = Column(Integer, primary_key=True, index=True)
     challenger_id       = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -201,6 +304,10 @@ class Challenge(Base):
 class MatchResult(Base):
     """Outcome of a completed challenge."""
     __tablename__ = "match_results"
+    __table_args__ = (
+        Index("ix_match_results_winner", "winner_id"),
+        Index("ux_match_results_challenge", "challenge_id", unique=True),  # one result per challenge
+    )
 
     id              = Column(Integer, primary_key=True, index=True)
     challenge_id    = Column(Integer, ForeignKey("challenges.id", ondelete="CASCADE"), nullable=False)
@@ -214,3 +321,91 @@ class MatchResult(Base):
 
     challenge = relationship("Challenge", back_populates="result")
     winner    = relationship("User", foreign_keys=[winner_id])
+
+
+class ArenaStanding(Base):
+    """
+    Per-worker arena record, updated in the same transaction as each finished
+    challenge (services/arena_standings.py). streak > 0 counts consecutive
+    wins, < 0 consecutive losses; a draw resets it to 0.
+    """
+    __tablename__ = "arena_standings"
+
+    id         = Column(Integer, primary_key=True, index=True)
+    user_id    = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True)
+    wins       = Column(Integer, nullable=False, default=0)
+    losses     = Column(Integer, nullable=False, default=0)
+    draws      = Column(Integer, nullable=False, default=0)
+    total      = Column(Integer, nullable=False, default=0)
+    streak     = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    user = relationship("User")
+
+
+class CacheVersion(Base):
+    """
+    Version counters for shared read snapshots (services/leaderboard_cache.py).
+    Writers bump a row in the transaction that changes the underlying data, so
+    every worker process and replica agrees on the current version.
+    """
+    __tablename__ = "cache_versions"
+
+    name       = Column(String(64), primary_key=True)
+    version    = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+# ── Teams ────────────────────────────────────────────────────────────────────
+
+class Team(Base):
+    """A group of users whose activity is reported together (services/team_stats.py)."""
+    __tablename__ = "teams"
+
+    id         = Column(Integer, primary_key=True, index=True)
+    name       = Column(String(100), nullable=False)
+    owner_id   = Column(Integer, nullable=False)  # users.id of the manager; no FK, users.team_id points here
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    members = relationship("User", foreign_keys="User.team_id")
+    stats   = relationship("TeamStats", back_populates="team", cascade="all, delete-orphan")
+    invites = relationship("TeamInvite", back_populates="team", cascade="all, delete-orphan")
+
+
+class TeamStats(Base):
+    """
+    Precomputed team dashboard for one trailing window (7 or 30 days).
+    Written by `python jobs.py refresh-team-stats`; GET /teams/{id}/analytics
+    only reads these rows.
+    """
+    __tablename__ = "team_stats"
+    __table_args__ = (
+        Index("ux_team_stats_team_window", "team_id", "window_days", unique=True),
+    )
+
+    id                  = Column(Integer, primary_key=True, index=True)
+    team_id             = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+    window_days         = Column(Integer, nullable=False)
+    member_count        = Column(Integer, nullable=False, default=0)
+    total_focus_minutes = Column(Float, nullable=False, default=0.0)
+    session_count       = Column(Integer, nullable=False, default=0)
+    payload             = Column(Text, nullable=False)  # JSON: members, distribution, projects, elo
+    computed_at         = Column(DateTime, default=datetime.utcnow)
+
+    team = relationship("Team", back_populates="stats")
+
+
+class TeamInvite(Base):
+    """A pending invitation; the invitee joins the team only by accepting it."""
+    __tablename__ = "team_invites"
+    __table_args__ = (
+        Index("ux_team_invites_team_user", "team_id", "user_id", unique=True),
+        Index("ix_team_invites_user", "user_id"),
+    )
+
+    id         = Column(Integer, primary_key=True, index=True)
+    team_id    = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+    user_id    = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    team = relationship("Team", back_populates="invites")
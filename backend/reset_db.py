@@ -1,8 +1,8 @@
 """
 reset_db.py — DEVELOPMENT ONLY database reset script.
 
-Deletes the existing SQLite database file and recreates all tables
-from the current SQLAlchemy models. Run this whenever you change models.
+Deletes the existing SQLite database file (plus its WAL/SHM side files) and
+recreates the schema by running every migration from scratch.
 
 Usage:
     cd backend
@@ -18,14 +18,19 @@ if os.path.exists(DB_PATH):
 else:
     print(f"ℹ  No existing database found at: {DB_PATH}")
 
+for side_file in (f"{DB_PATH}-wal", f"{DB_PATH}-shm"):
+    if os.path.exists(side_file):
+        os.remove(side_file)
+
 # Import Base and engine AFTER potential deletion
-from database import Base, engine  # noqa: E402
+from database import Base  # noqa: E402
 
 # Import ALL models so their tables are registered with Base
 import models  # noqa: F401, E402
+from migrations import run_migrations  # noqa: E402
 
-Base.metadata.create_all(bind=engine)
-print("✅ Database recreated with latest schema.")
+applied = run_migrations()
+print(f"✅ Database recreated with latest schema (version {applied[-1]}).")
 print("\nTables created:")
 for table in Base.metadata.sorted_tables:
     print(f"  - {table.name}")
@@ -1,20 +1,112 @@
 """
 routes/analytics.py — Rule-based analytics for the current user
 """
-from fastapi import APIRouter, Depends
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from database import get_db
-from models import User
-from routes.deps import get_current_user
-from services.analytics_service import get_analytics
+from routes.deps import get_current_user, get_read_db
+from services.user_cache import UserSnapshot
+from services.analytics_service import (
+    GRANULARITIES, MAX_RANGE_DAYS, RANGE_METRICS, get_analytics, get_range_analytics,
+)
+from services.local_time import local_today
+from services.session_metrics import (
+    DEFAULT_BINS, DEFAULT_PERCENTILES, duration_histogram, duration_percentiles,
+    energy_output, load_session_columns, rolling_focus,
+)
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 
 @router.get("/me")
 def get_my_analytics(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Return all analytics metrics for the current user."""
-    return get_analytics(db=db, user_id=current_user.id)
+    return get_analytics(db=db, user=current_user)
+
+
+@router.get("/range")
+def get_range(
+    response: Response,
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    granularity: str = Query("day", pattern=f"^({'|'.join(GRANULARITIES)})$"),
+    metrics: Optional[str] = Query(None, description="Comma-separated; default all of " + ", ".join(RANGE_METRICS)),
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """
+    Focus, session, XP, task, active-day and energy metrics between two dates
+    (inclusive), bucketed by day, ISO week or month. Periods that ended before
+    today can no longer change and are served as immutable.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'.")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_RANGE_DAYS} days.")
+
+    selected = tuple(m.strip() for m in metrics.split(",") if m.strip()) if metrics else RANGE_METRICS
+    unknown = [m for m in selected if m not in RANGE_METRICS]
+    if unknown or not selected:
+        raise HTTPException(status_code=400, detail=f"Unknown metrics: {', '.join(unknown) or '(none)'}. "
+                                                    f"Choose from {', '.join(RANGE_METRICS)}.")
+
+    closed = end < local_today(current_user)
+    response.headers["Cache-Control"] = "private, max-age=31536000, immutable" if closed else "private, no-cache"
+
+    return {
+        "from":        start.isoformat(),
+        "to":          end.isoformat(),
+        "granularity": granularity,
+        "closed":      closed,
+        "buckets":     get_range_analytics(db, current_user.id, start, end, granularity, selected),
+    }
+
+
+def _number_list(raw: Optional[str], default: tuple, name: str, upper: Optional[float] = None) -> tuple:
+    if raw is None:
+        return default
+    try:
+        values = tuple(float(v) for v in raw.split(",") if v.strip())
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"'{name}' must be comma-separated numbers.")
+    if not values or len(values) > 50 or any(b <= a for a, b in zip(values, values[1:])) \
+            or values[0] <= 0 or (upper is not None and values[-1] > upper):
+        raise HTTPException(status_code=400, detail=f"'{name}' must be 1–50 increasing positive numbers.")
+    return values
+
+
+@router.get("/distribution")
+def get_distribution(
+    days: int = Query(90, ge=1, le=MAX_RANGE_DAYS),
+    bins: Optional[str] = Query(None, description="Ascending minute edges, e.g. 15,30,60,90"),
+    percentiles: Optional[str] = Query(None, description="e.g. 50,90,99"),
+    window: int = Query(7, ge=1, le=90),
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """
+    Session-length histogram (custom bin edges), percentiles, daily focus with
+    a trailing rolling mean, and energy vs output for the last `days` days.
+    """
+    edges = _number_list(bins, DEFAULT_BINS, "bins")
+    points = _number_list(percentiles, DEFAULT_PERCENTILES, "percentiles", upper=100)
+
+    today = local_today(current_user)
+    start = today - timedelta(days=days - 1)
+    # Load window - 1 extra days so the first rolling means are complete
+    loaded = load_session_columns(db, current_user.id, start - timedelta(days=window - 1))
+    cols = loaded.ended_since(start)
+
+    return {
+        "from":             start.isoformat(),
+        "to":               today.isoformat(),
+        "sessions":         len(cols),
+        "histogram":        duration_histogram(cols, edges),
+        "percentiles":      duration_percentiles(cols, points),
+        "daily_focus":      rolling_focus(loaded, start, today, window),
+        "energy_vs_output": energy_output(cols),
+    }
@@ -3,15 +3,24 @@ routes/arena.py — Focus Arena API
 Competitive 1-vs-1 deep-work challenge system with ELO ranking.
 """
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from pydantic import BaseModel
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from database import get_db
-from models import User, Challenge, MatchResult
-from routes.deps import get_current_user
+from database import get_db, get_async_db
+from models import User, Challenge, MatchResult, ArenaStanding
+from routes.deps import get_current_user, get_current_user_async, get_read_db
+from services.user_cache import UserSnapshot
+from services.arena_standings import outcome_for, standing_upsert
 from services.elo_engine import compute_focus_score, compute_elo, compute_xp
+from services.leaderboard_cache import cached_page, current_version, etag, version_bump
+from services.pause_buffer import (
+    ARENA_PAUSE_FLUSH_MS, apply_pauses, buffer_pause, pause_update, requeue_pauses, take_pauses,
+)
+from services.xp_engine import CHALLENGE_SOURCE, credit_xp
 
 router = APIRouter(prefix="/challenge", tags=["Focus Arena"])
 
@@ -30,6 +39,18 @@ class PauseBody(BaseModel):
 
 # ── Helper ────────────────────────────────────────────────────────────────────
 
+_OUTCOME_LABEL = {1.0: "win", 0.5: "draw", 0.0: "loss"}  # compute_elo's actual score → XP log reason
+
+def _open_challenges(*sides):
+    """
+    Pending or active challenges matching any of `sides`. The status test is
+    repeated in each branch so every side seeks its own (status, challenger_id)
+    or (status, opponent_id) index instead of reading all open challenges.
+    """
+    is_open = Challenge.status.in_(["pending", "active"])
+    return or_(*(and_(is_open, side) for side in sides))
+
+
 def _serialize_challenge(c: Challenge, current_id: int):
     return {
         "id":               c.id,
@@ -52,7 +73,7 @@ def _serialize_challenge(c: Challenge, current_id: int):
 def create_challenge(
     body: ChallengeCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Create a pending challenge (challenger → opponent)."""
     if body.opponent_id == current_user.id:
@@ -63,13 +84,10 @@ def create_challenge(
         raise HTTPException(status_code=404, detail="Opponent worker not found.")
 
     # Only one active or pending challenge per pair allowed
-    existing = db.query(Challenge).filter(
-        Challenge.status.in_(["pending", "active"]),
-        (
-            (Challenge.challenger_id == current_user.id) & (Challenge.opponent_id == body.opponent_id) |
-            (Challenge.challenger_id == body.opponent_id) & (Challenge.opponent_id == current_user.id)
-        ),
-    ).first()
+    existing = db.query(Challenge).filter(_open_challenges(
+        (Challenge.challenger_id == current_user.id) & (Challenge.opponent_id == body.opponent_id),
+        (Challenge.challenger_id == body.opponent_id) & (Challenge.opponent_id == current_user.id),
+    )).first()
     if existing:
         raise HTTPException(status_code=409, detail="An open challenge already exists between you two.")
 
@@ -89,7 +107,7 @@ def create_challenge(
 def accept_challenge(
     challenge_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Accept a pending challenge — starts synchronized timer."""
     challenge = db.query(Challenge).filter(Challenge.id == challenge_id).first()
@@ -108,52 +126,122 @@ def accept_challenge(
 
 
 @router.post("/pause/{challenge_id}")
-def record_pause(
+async def record_pause(
     challenge_id: int,
     body: PauseBody,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user_async),
 ):
-    """Increment pause/blur counter for anti-cheat tracking."""
-    challenge = db.query(Challenge).filter(
-        Challenge.id == challenge_id,
-        Challenge.status == "active",
-    ).first()
-    if not challenge:
-        raise HTTPException(status_code=404, detail="Active challenge not found.")
-
-    if challenge.challenger_id == current_user.id:
-        challenge.challenger_pauses += 1
-    elif challenge.opponent_id == current_user.id:
-        challenge.opponent_pauses += 1
-    else:
+    """
+    Increment pause/blur counter for anti-cheat tracking. One atomic UPDATE …
+    RETURNING, or a buffered increment when ARENA_PAUSE_FLUSH_MS is set.
+    """
+    if ARENA_PAUSE_FLUSH_MS:
+        challenge = (await db.execute(
+            select(Challenge.challenger_id, Challenge.opponent_id, Challenge.challenger_pauses, Challenge.opponent_pauses)
+            .where(Challenge.id == challenge_id, Challenge.status == "active")
+        )).first()
+        if not challenge:
+            raise HTTPException(status_code=404, detail="Active challenge not found.")
+        if current_user.id not in (challenge.challenger_id, challenge.opponent_id):
+            raise HTTPException(status_code=403, detail="Not a participant.")
+        challenger, opponent = buffer_pause(challenge_id, challenge.challenger_id == current_user.id)
+        return {
+            "ok": True,
+            "challenger_pauses": challenge.challenger_pauses + challenger,
+            "opponent_pauses":   challenge.opponent_pauses + opponent,
+        }
+
+    counts = (await db.execute(pause_update(challenge_id, current_user.id))).first()
+    if counts is None:
+        await db.rollback()
+        active = (await db.execute(
+            select(Challenge.id).where(Challenge.id == challenge_id, Challenge.status == "active")
+        )).first()
+        if not active:
+            raise HTTPException(status_code=404, detail="Active challenge not found.")
         raise HTTPException(status_code=403, detail="Not a participant.")
+    await db.commit()
+    return {"ok": True, "challenger_pauses": counts.challenger_pauses, "opponent_pauses": counts.opponent_pauses}
 
-    db.commit()
-    return {"ok": True, "challenger_pauses": challenge.challenger_pauses, "opponent_pauses": challenge.opponent_pauses}
+
+def _match_response(match: MatchResult, challenge: Challenge, user_id: int, new_elo: int, xp: int) -> dict:
+    winner_id = match.winner_id
+    return {
+        "verdict":       "draw" if winner_id is None else ("win" if winner_id == user_id else "loss"),
+        "winner_id":     winner_id,
+        "focus_score_a": match.focus_score_a,
+        "focus_score_b": match.focus_score_b,
+        "elo_change_a":  match.elo_change_a,
+        "elo_change_b":  match.elo_change_b,
+        "new_elo":       new_elo,
+        "xp_awarded":    xp,
+    }
+
+
+def _recorded_result(db: Session, challenge: Challenge, user_id: int) -> dict:
+    """The stored outcome of a finished challenge, as the caller's complete response."""
+    match = db.query(MatchResult).filter(MatchResult.challenge_id == challenge.id).first()
+    if match is None:
+        raise HTTPException(status_code=400, detail="Challenge is not active.")
+    actual = 0.5 if match.winner_id is None else float(match.winner_id == user_id)
+    xp, _ = compute_xp(actual, 1 - actual)
+    new_elo = db.query(User.elo_rating).filter(User.id == user_id).scalar()
+    return _match_response(match, challenge, user_id, new_elo, xp)
 
 
 @router.post("/complete/{challenge_id}")
 def complete_challenge(
     challenge_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """
     End session, compute focus scores, update ELO + XP.
-    Either participant can call this to trigger scoring.
+    Either participant can call this to trigger scoring. The match is scored
+    exactly once: the first call claims the challenge with a conditional
+    UPDATE; later or concurrent calls get the recorded result back.
     """
     challenge = db.query(Challenge).filter(Challenge.id == challenge_id).first()
     if not challenge:
         raise HTTPException(status_code=404, detail="Challenge not found.")
-    if challenge.status != "active":
-        raise HTTPException(status_code=400, detail="Challenge is not active.")
     if current_user.id not in (challenge.challenger_id, challenge.opponent_id):
         raise HTTPException(status_code=403, detail="Not a participant.")
+    if challenge.status == "finished":
+        return _recorded_result(db, challenge, current_user.id)
+    if challenge.status != "active":
+        raise HTTPException(status_code=400, detail="Challenge is not active.")
 
+    # Claim: only one caller flips active → finished. On Postgres the UPDATE
+    # row-locks the challenge, so a concurrent caller waits for this
+    # transaction and then matches nothing; SQLite serializes the writers.
     now = datetime.utcnow()
-    challenge.end_time = now
-    challenge.status   = "finished"
+    claimed = db.execute(
+        update(Challenge)
+        .where(Challenge.id == challenge_id, Challenge.status == "active")
+        .values(status="finished", end_time=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        db.refresh(challenge)
+        if challenge.status == "finished":
+            return _recorded_result(db, challenge, current_user.id)
+        raise HTTPException(status_code=400, detail="Challenge is not active.")
+
+    # Buffered pauses count towards this match; they go back to the buffer if scoring fails
+    pauses = take_pauses(challenge_id)
+    try:
+        apply_pauses(db, challenge_id, pauses)
+        return _score_match(db, challenge, current_user.id, now)
+    except Exception:
+        requeue_pauses({challenge_id: pauses})
+        raise
+
+
+def _score_match(db: Session, challenge: Challenge, user_id: int, now: datetime) -> dict:
+    """Score a challenge this request has claimed and commit the result."""
+    db.refresh(challenge)  # pause counts as of the claim
 
     # Actual elapsed minutes (capped at duration)
     elapsed = (now - challenge.start_time).total_seconds() / 60
@@ -181,13 +269,13 @@ def complete_challenge(
         winner_id = user_b.id
     # None = draw
 
-    # Persist
-    user_a.elo_rating  = new_elo_a
-    user_b.elo_rating  = new_elo_b
-    user_a.rank_points += max(0, delta_a)
-    user_b.rank_points += max(0, delta_b)
-    user_a.xp          += xp_a
-    user_b.xp          += xp_b
+    # Persist (deltas as SQL expressions, so another match finishing for the same user isn't overwritten)
+    user_a.elo_rating  = User.elo_rating + delta_a
+    user_b.elo_rating  = User.elo_rating + delta_b
+    user_a.rank_points = User.rank_points + max(0, delta_a)
+    user_b.rank_points = User.rank_points + max(0, delta_b)
+    for user, xp, actual in ((user_a, xp_a, actual_a), (user_b, xp_b, actual_b)):
+        credit_xp(db, user, xp, f"Focus Arena {_OUTCOME_LABEL[actual]}", CHALLENGE_SOURCE, challenge.id, now)
 
     result = MatchResult(
         challenge_id=challenge.id,
@@ -199,30 +287,29 @@ def complete_challenge(
         elo_change_b=delta_b,
     )
     db.add(result)
+    db.execute(standing_upsert(db, user_a.id, outcome_for(user_a.id, winner_id)))
+    db.execute(standing_upsert(db, user_b.id, outcome_for(user_b.id, winner_id)))
+    db.execute(version_bump(db))
     db.commit()
 
-    return {
-        "verdict":       "draw" if winner_id is None else ("win" if winner_id == current_user.id else "loss"),
-        "winner_id":     winner_id,
-        "focus_score_a": score_a,
-        "focus_score_b": score_b,
-        "elo_change_a":  delta_a,
-        "elo_change_b":  delta_b,
-        "new_elo":       new_elo_a if current_user.id == challenge.challenger_id else new_elo_b,
-        "xp_awarded":    xp_a if current_user.id == challenge.challenger_id else xp_b,
-    }
+    is_challenger = user_id == challenge.challenger_id
+    return _match_response(
+        result, challenge, user_id,
+        new_elo_a if is_challenger else new_elo_b,
+        xp_a if is_challenger else xp_b,
+    )
 
 
 @router.get("/my")
 def my_challenges(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Return all open challenges for the current user."""
-    challenges = db.query(Challenge).filter(
-        Challenge.status.in_(["pending", "active"]),
-        (Challenge.challenger_id == current_user.id) | (Challenge.opponent_id == current_user.id),
-    ).order_by(Challenge.created_at.desc()).all()
+    challenges = db.query(Challenge).filter(_open_challenges(
+        Challenge.challenger_id == current_user.id,
+        Challenge.opponent_id == current_user.id,
+    )).order_by(Challenge.created_at.desc()).all()
     return [_serialize_challenge(c, current_user.id) for c in challenges]
 
 
@@ -230,41 +317,179 @@ def my_challenges(
 
 leaderboard_router = APIRouter(prefix="/leaderboard", tags=["Focus Arena"])
 
+LEADERBOARD_PAGE_SIZE = 50
+LEADERBOARD_MAX_PAGE  = 200
+
+# Board order: ELO descending, newer accounts first on ties. Both directions
+# match a backward scan of ix_users_role_elo, so no sort step is needed.
+_BOARD_ORDER = (User.elo_rating.desc(), User.id.desc())
+
+
+def _rank_tier(elo: int) -> str:
+    if elo >= 1800: return "Grandmaster"
+    if elo >= 1600: return "Platinum"
+    if elo >= 1400: return "Gold"
+    if elo >= 1200: return "Silver"
+    return "Bronze"
+
+
+def _workers():
+    return (
+        select(
+            User.id, User.name, User.elo_rating,
+            func.coalesce(ArenaStanding.wins, 0).label("wins"),
+            func.coalesce(ArenaStanding.losses, 0).label("losses"),
+            func.coalesce(ArenaStanding.draws, 0).label("draws"),
+            func.coalesce(ArenaStanding.total, 0).label("total"),
+            func.coalesce(ArenaStanding.streak, 0).label("streak"),
+        )
+        .outerjoin(ArenaStanding, ArenaStanding.user_id == User.id)
+        .where(User.role == "worker")
+    )
+
+
+def _ahead_of(elo: int, user_id: int):
+    """Workers listed before (elo, user_id) in board order."""
+    return or_(User.elo_rating > elo, and_(User.elo_rating == elo, User.id > user_id))
+
+
+def _behind(elo: int, user_id: int):
+    return or_(User.elo_rating < elo, and_(User.elo_rating == elo, User.id < user_id))
+
+
+def _ranked(db: Session, board_slice) -> list:
+    """
+    Rank a contiguous slice of the board without reading the rest of it.
+    RANK()/DENSE_RANK() run over the slice only and are shifted by range counts
+    over ix_users_role_elo for everything listed before the slice. Rows tied
+    with the slice's first rating share that rating's global rank even when
+    some of the tie falls on the previous page.
+    """
+    sub = board_slice.subquery()
+    by_elo = sub.c.elo_rating.desc()
+    rows = db.execute(
+        select(
+            sub,
+            func.rank().over(order_by=by_elo).label("local_rank"),
+            func.dense_rank().over(order_by=by_elo).label("local_dense_rank"),
+        ).order_by(by_elo, sub.c.id.desc())
+    ).all()
+    if not rows:
+        return []
+
+    top = rows[0]
+    higher = User.elo_rating > top.elo_rating
+    listed_before, strictly_above, ratings_above = db.execute(
+        select(
+            func.count(),
+            func.count(case((higher, 1))),
+            func.count(func.distinct(case((higher, User.elo_rating)))),
+        ).where(User.role == "worker", _ahead_of(top.elo_rating, top.id))
+    ).one()
+
+    ranked = []
+    for row in rows:
+        if row.elo_rating == top.elo_rating:
+            rank = strictly_above + 1
+        else:
+            rank = listed_before + row.local_rank
+        ranked.append((row, rank, ratings_above + row.local_dense_rank))
+    return ranked
+
+
+def _parse_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        elo, user_id = cursor.split(":")
+        return int(elo), int(user_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def _serialize_ranked(ranked) -> list[dict]:
+    return [
+        {
+            "rank":       rank,
+            "dense_rank": dense_rank,
+            "id":         row.id,
+            "name":       row.name,
+            "elo_rating": row.elo_rating,
+            "rank_tier":  _rank_tier(row.elo_rating),
+            "wins":       row.wins,
+            "losses":     row.losses,
+            "draws":      row.draws,
+            "total":      row.total,
+            "streak":     row.streak,
+        }
+        for row, rank, dense_rank in ranked
+    ]
+
+
+def _board_page(db: Session, limit: int, offset: int, after: Optional[tuple[int, int]]):
+    """(rows, next cursor or None) for one page in board order."""
+    page = _workers().order_by(*_BOARD_ORDER)
+    page = page.where(_behind(*after)) if after is not None else page.offset(offset)
+    ranked = _ranked(db, page.limit(limit + 1))
+    next_cursor = None
+    if len(ranked) > limit:
+        ranked = ranked[:limit]
+        last = ranked[-1][0]
+        next_cursor = f"{last.elo_rating}:{last.id}"
+    return _serialize_ranked(ranked), next_cursor
+
+
+def _board_around(db: Session, user_id: int, radius: int):
+    me = db.execute(
+        select(User.elo_rating).where(User.id == user_id, User.role == "worker")
+    ).scalar_one_or_none()
+    if me is None:
+        raise HTTPException(status_code=404, detail="You are not on the leaderboard.")
+    above_ids = select(User.id).where(User.role == "worker", _ahead_of(me, user_id)) \
+        .order_by(User.elo_rating.asc(), User.id.asc()).limit(radius)
+    below_ids = select(User.id).where(User.role == "worker", _behind(me, user_id)) \
+        .order_by(*_BOARD_ORDER).limit(radius)
+    ids = [user_id, *db.scalars(above_ids), *db.scalars(below_ids)]
+    return _serialize_ranked(_ranked(db, _workers().where(User.id.in_(ids)))), None
+
 
 @leaderboard_router.get("/")
 def get_leaderboard(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    limit: int = Query(LEADERBOARD_PAGE_SIZE, ge=1, le=LEADERBOARD_MAX_PAGE),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    around: Optional[str] = Query(None, pattern="^me$"),
+    radius: int = Query(5, ge=0, le=50),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    """Returns all workers sorted by ELO rating descending."""
-    workers = db.query(User).filter(User.role == "worker").order_by(User.elo_rating.desc()).all()
-
-    def _rank_tier(elo: int) -> str:
-        if elo >= 1800: return "Grandmaster"
-        if elo >= 1600: return "Platinum"
-        if elo >= 1400: return "Gold"
-        if elo >= 1200: return "Silver"
-        return "Bronze"
-
-    board = []
-    for i, w in enumerate(workers):
-        # Count wins/losses from match results
-        wins   = db.query(MatchResult).filter(MatchResult.winner_id == w.id).count()
-        total  = db.query(Challenge).filter(
-            Challenge.status == "finished",
-            (Challenge.challenger_id == w.id) | (Challenge.opponent_id == w.id),
-        ).count()
-        losses  = total - wins
-
-        board.append({
-            "rank":       i + 1,
-            "id":         w.id,
-            "name":       w.name,
-            "elo_rating": w.elo_rating,
-            "rank_tier":  _rank_tier(w.elo_rating),
-            "wins":       wins,
-            "losses":     losses,
-            "total":      total,
-            "is_me":      w.id == current_user.id,
-        })
-    return board
+    """
+    Workers by ELO rating, one page at a time.
+    rank uses RANK() (ties share a rank, the next rank skips), dense_rank uses
+    DENSE_RANK(). Page with ?limit&offset or ?cursor (from the X-Next-Cursor
+    header). ?around=me&radius=k returns the caller plus k workers either side.
+    Responses carry an ETag that changes only when the board does; send it
+    back in If-None-Match to get 304 Not Modified.
+    """
+    after = _parse_cursor(cursor) if cursor is not None else None
+    version = current_version(db)
+    tag = etag(version, current_user.id)
+    headers = {"ETag": tag, "Cache-Control": "private, no-cache"}
+    if if_none_match is not None and tag in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    if around == "me":
+        rows, next_cursor = cached_page(
+            version, ("around", current_user.id, radius),
+            lambda: _board_around(db, current_user.id, radius),
+        )
+    else:
+        rows, next_cursor = cached_page(
+            version, ("page", limit, offset if after is None else None, after),
+            lambda: _board_page(db, limit, offset, after),
+        )
+
+    response.headers.update(headers)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [{**row, "is_me": row["id"] == current_user.id} for row in rows]
@@ -3,6 +3,7 @@ routes/auth.py — User registration and login
 """
 import os
 from datetime import datetime, timedelta
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
@@ -10,6 +11,9 @@ from jose import jwt
 from passlib.context import CryptContext
 from database import get_db
 from models import User
+from routes.deps import get_current_user_for_update
+from services.leaderboard_cache import version_bump
+from services.local_time import DEFAULT_TIMEZONE, is_valid_timezone
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -28,6 +32,11 @@ class RegisterRequest(BaseModel):
     email: str
     password: str
     role: str = "student"  # student | worker
+    timezone: Optional[str] = None  # IANA name, e.g. "Europe/Berlin"; defaults to UTC
+
+
+class TimezoneRequest(BaseModel):
+    timezone: str
 
 
 class LoginRequest(BaseModel):
@@ -42,6 +51,7 @@ class TokenResponse(BaseModel):
     name: str
     role: str
     xp: int
+    timezone: str
 
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
@@ -70,13 +80,19 @@ def register(body: RegisterRequest, db: Session = Depends(get_db)):
     if body.role not in ("student", "worker"):
         raise HTTPException(status_code=400, detail="Role must be 'student' or 'worker'")
 
+    if body.timezone is not None and not is_valid_timezone(body.timezone):
+        raise HTTPException(status_code=400, detail="Unknown timezone")
+
     user = User(
         name=body.name,
         email=body.email,
         password_hash=hash_password(body.password),
         role=body.role,
+        timezone=body.timezone or DEFAULT_TIMEZONE,
     )
     db.add(user)
+    if user.role == "worker":
+        db.execute(version_bump(db))
     db.commit()
     db.refresh(user)
 
@@ -102,4 +118,22 @@ def login(body: LoginRequest, db: Session = Depends(get_db)):
         name=user.name,
         role=user.role,
         xp=user.xp,
+        timezone=user.timezone or DEFAULT_TIMEZONE,
     )
+
+
+@router.put("/timezone")
+def set_timezone(
+    body: TimezoneRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_for_update),
+):
+    """
+    Set the IANA timezone that defines the user's calendar days. Days already
+    recorded keep their dates; activity from now on is dated in the new zone.
+    """
+    if not is_valid_timezone(body.timezone):
+        raise HTTPException(status_code=400, detail="Unknown timezone")
+    current_user.timezone = body.timezone
+    db.commit()
+    return {"timezone": current_user.timezone}
@@ -5,9 +5,8 @@ Accepts a user message, reads live DB context, returns a role-aware reply.
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from database import get_db
-from models import User
-from routes.deps import get_current_user
+from routes.deps import get_current_user, get_read_db
+from services.user_cache import UserSnapshot
 from services.chat_engine import get_chat_response
 
 router = APIRouter(prefix="/chat", tags=["chat"])
@@ -20,8 +19,8 @@ class ChatRequest(BaseModel):
 @router.post("/")
 def chat(
     body: ChatRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """
     Accepts a plain-text message, resolves intent from user context,
@@ -3,13 +3,15 @@ routes/coach.py — POST /coach/query + POST /coach/advise
 Both now powered by Groq AI with full user context.
 """
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from database import get_db
-from models import User, UserTask, Session as SessionModel
+from models import User
 from routes.deps import get_current_user
+from services.user_cache import UserSnapshot
+from services.user_context import get_user_context
 
 router = APIRouter(prefix="/coach", tags=["coach"])
 
@@ -42,36 +44,21 @@ def _groq(system: str, user_msg: str, max_tokens: int = 200) -> str:
 def coach_query(
     body: CoachRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    now      = datetime.utcnow()
-    week_ago = now - timedelta(days=7)
-
-    recent_tasks = (
-        db.query(UserTask)
-        .filter(UserTask.user_id == current_user.id)
-        .order_by(UserTask.created_at.desc())
-        .limit(10)
-        .all()
-    )
-    pending_tasks   = [t.title for t in recent_tasks if t.status == "pending"]
-    completed_tasks = [t.title for t in recent_tasks if t.status == "completed"]
-
-    recent_sessions = (
-        db.query(SessionModel)
-        .filter(
-            SessionModel.user_id == current_user.id,
-            SessionModel.start_time >= week_ago,
-        )
-        .all()
-    )
-    total_duration = sum(s.duration_minutes for s in recent_sessions if s.duration_minutes)
+    snap = get_user_context(db, current_user)
+
+    pending_tasks   = [t.title for t in snap.recent_tasks if t.status == "pending"]
+    completed_tasks = [t.title for t in snap.recent_tasks if t.status == "completed"]
+
+    total_duration = round(snap.week_focus_minutes)
+    session_count  = snap.week_session_count
 
     system = f"""You are XPilot Coach — a direct, data-driven productivity coach. One reply, max 2 sentences.
 User: {current_user.name} | Role: {current_user.role.upper()}
 Completed (recent): {', '.join(completed_tasks) or 'None'}
 Pending: {', '.join(pending_tasks) or 'None'}
-Focus time this week: {total_duration} minutes across {len(recent_sessions)} sessions.
+Focus time this week: {total_duration} minutes across {session_count} sessions.
 Give one sharp, actionable response referencing their actual data."""
 
     try:
@@ -92,37 +79,19 @@ Give one sharp, actionable response referencing their actual data."""
 @router.post("/advise")
 def coach_advise(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """One-sentence proactive nudge based on tasks and session data."""
-    now      = datetime.utcnow()
-    week_ago = now - timedelta(days=7)
-
-    pending_tasks = (
-        db.query(UserTask)
-        .filter(
-            UserTask.user_id == current_user.id,
-            UserTask.status.in_(["pending", "active"]),
-        )
-        .order_by(UserTask.order_index.asc(), UserTask.created_at.asc())
-        .limit(5)
-        .all()
-    )
+    now  = datetime.utcnow()
+    snap = get_user_context(db, current_user)
 
-    recent_sessions = (
-        db.query(SessionModel)
-        .filter(
-            SessionModel.user_id == current_user.id,
-            SessionModel.start_time >= week_ago,
-        )
-        .all()
-    )
+    pending_tasks = snap.open_tasks[:5]
 
-    total_min     = sum(s.duration_minutes or 0 for s in recent_sessions)
-    session_count = len(recent_sessions)
+    total_min     = snap.week_focus_minutes
+    session_count = snap.week_session_count
     avg_min       = round(total_min / session_count) if session_count else 0
 
-    last = max((s.end_time for s in recent_sessions if s.end_time), default=None)
+    last = snap.last_end_time if session_count else None
     idle_hours = round((now - last).total_seconds() / 3600, 1) if last else None
 
     task_lines = "\n".join(
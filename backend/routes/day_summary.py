@@ -2,13 +2,14 @@
 routes/day_summary.py — GET /day-summary
 Returns planned vs completed workload minutes for today.
 """
-from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from database import get_db
 from models import UserTask
 from routes.deps import get_current_user
-from models import User
+from services.user_cache import UserSnapshot
+from services.local_time import local_today
 
 router = APIRouter(prefix="/day-summary", tags=["day-summary"])
 
@@ -16,34 +17,38 @@ router = APIRouter(prefix="/day-summary", tags=["day-summary"])
 @router.get("/")
 def get_day_summary(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    """Planned vs completed workload for today."""
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_end   = today_start + timedelta(days=1)
-
-    all_tasks = (
-        db.query(UserTask)
-        .filter(UserTask.user_id == current_user.id)
-        .all()
-    )
+    """Planned vs completed workload for today (the user's local day)."""
+    today = local_today(current_user)
+    estimate = func.coalesce(UserTask.estimated_minutes, 0)
 
     # Planned = all non-completed tasks (what the user intends to work on)
-    pending_tasks   = [t for t in all_tasks if t.status in ("pending", "active")]
-    completed_tasks = [
-        t for t in all_tasks
-        if t.status == "completed" and t.completed_at and
-           today_start <= t.completed_at < today_end
-    ]
+    open_rows = {
+        status: (count, minutes)
+        for status, count, minutes in db.query(UserTask.status, func.count(), func.sum(estimate))
+        .filter(UserTask.user_id == current_user.id, UserTask.status.in_(["pending", "active"]))
+        .group_by(UserTask.status)
+    }
+    pending_count = sum(count for count, _ in open_rows.values())
+    total_planned_minutes = sum(minutes or 0 for _, minutes in open_rows.values())
+    active_tasks_count = open_rows.get("active", (0, 0))[0]
 
-    total_planned_minutes   = sum(t.estimated_minutes or 0 for t in pending_tasks)
-    total_completed_minutes = sum(t.estimated_minutes or 0 for t in completed_tasks)
-    active_tasks_count      = sum(1 for t in all_tasks if t.status == "active")
+    # Completed today: a range on ix_user_tasks_user_completed_local
+    completed_today, total_completed_minutes = (
+        db.query(func.count(), func.sum(estimate))
+        .filter(
+            UserTask.user_id == current_user.id,
+            UserTask.completed_local_date == today,
+            UserTask.status == "completed",
+        )
+        .one()
+    )
 
     return {
         "total_planned_minutes":   total_planned_minutes,
-        "total_completed_minutes": total_completed_minutes,
+        "total_completed_minutes": total_completed_minutes or 0,
         "active_tasks_count":      active_tasks_count,
-        "pending_count":           len(pending_tasks),
-        "completed_today":         len(completed_tasks),
+        "pending_count":           pending_count,
+        "completed_today":         completed_today,
     }
@@ -1,13 +1,21 @@
 """
-routes/deps.py — Shared dependency: get the current authenticated user
+routes/deps.py — Shared dependencies: the current authenticated user and the read session
+get_current_user serves sync routes; get_current_user_async serves `async def`
+routes and shares their AsyncSession. Both return a cached, read-only
+UserSnapshot — routes that modify the user depend on the *_for_update variants
+to get the ORM instance. get_read_db routes read-only handlers to the replica
+when one is configured.
 """
 import os
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, get_async_db, has_read_replica, wrote_recently, ReadSessionLocal
 from models import User
+from services.user_cache import UserSnapshot, user_cache
 
 SECRET_KEY = os.getenv("SECRET_KEY", "xpilot-secret-key-change-in-production")
 ALGORITHM = "HS256"
@@ -15,21 +23,93 @@ ALGORITHM = "HS256"
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
+def _user_id_from_token(credentials: HTTPAuthorizationCredentials) -> int:
     try:
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = int(payload.get("sub"))
+        return int(payload.get("sub"))
     except (JWTError, TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
 
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> UserSnapshot:
+    user_id = _user_id_from_token(credentials)
+    db.info["user_id"] = user_id  # attributes this request's commits to the user
+
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        return snapshot
+
+    generation = user_cache.generation(user_id)
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    return user_cache.put(user_id, UserSnapshot.from_orm(user), generation)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> UserSnapshot:
+    user_id = _user_id_from_token(credentials)
+    db.info["user_id"] = user_id
+
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        return snapshot
+
+    generation = user_cache.generation(user_id)
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return user_cache.put(user_id, UserSnapshot.from_orm(user), generation)
+
+
+def get_current_user_for_update(
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> User:
+    """The authenticated user as an ORM instance in the request session, for routes that write to it."""
+    user = db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
     return user
+
+
+async def get_current_user_for_update_async(
+    current_user: UserSnapshot = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    user = await db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+def get_read_db(
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    read_consistency: Optional[str] = Header(None, alias="X-Read-Consistency"),
+):
+    """
+    Session for read-only routes.
+    Uses the replica (READ_DATABASE_URL) unless there is none, the user wrote
+    within READ_STALENESS_SECONDS, or the request sends
+    `X-Read-Consistency: strong` — then it reuses the request's primary session.
+    """
+    if not has_read_replica() or read_consistency == "strong" or wrote_recently(current_user.id):
+        yield db
+        return
+
+    read_db = ReadSessionLocal()
+    try:
+        yield read_db
+    finally:
+        read_db.close()
@@ -1,14 +1,16 @@
 """
 routes/energy.py — Log energy level + get rule-based schedule
 """
-from datetime import date
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from database import get_db
-from models import EnergyLog, User
+from models import EnergyLog
 from routes.deps import get_current_user
+from services.user_cache import UserSnapshot
+from services.daily_stats import daily_stats_upsert
 from services.energy_scheduler import generate_schedule
+from services.local_time import local_today
 
 router = APIRouter(prefix="/energy", tags=["energy"])
 
@@ -21,13 +23,13 @@ class EnergyRequest(BaseModel):
 def log_energy(
     body: EnergyRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Log today's energy level and receive a tailored schedule."""
     if not 1 <= body.level <= 10:
         raise HTTPException(status_code=400, detail="Energy level must be between 1 and 10")
 
-    today = date.today()
+    today = local_today(current_user)
 
     # Upsert: update if already logged today
     existing = (
@@ -40,6 +42,7 @@ def log_energy(
     else:
         log = EnergyLog(user_id=current_user.id, level=body.level, date=today)
         db.add(log)
+    db.execute(daily_stats_upsert(db, current_user.id, today, energy_level=body.level))
 
     db.commit()
 
@@ -50,10 +53,10 @@ def log_energy(
 @router.get("/today")
 def get_today_schedule(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Get today's schedule based on logged energy level."""
-    today = date.today()
+    today = local_today(current_user)
     log = (
         db.query(EnergyLog)
         .filter(EnergyLog.user_id == current_user.id, EnergyLog.date == today)
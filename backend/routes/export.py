@@ -0,0 +1,66 @@
+"""
+routes/export.py — Streaming bulk export (GET /export/{sessions|xp|tasks|energy})
+
+Streams the user's full history as NDJSON or CSV for warehouse pulls. Each
+response carries X-Next-Cursor; pass it back as ?since= to fetch only what
+was added (or, for tasks and energy logs, changed) after this export.
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from database import ReadSessionLocal
+from routes.deps import get_current_user
+from services.user_cache import UserSnapshot
+from services.export import (
+    DATASETS, EXPORT_FORMATS, SERIALIZERS, export_bound, format_cursor, parse_cursor, stream_rows,
+)
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: str,
+    format: str = Query("ndjson", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+    since: Optional[str] = Query(None, description="X-Next-Cursor from a previous export"),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """
+    Stream every row of one dataset after `since`, oldest first. The export
+    runs on its own read session (the replica when one is configured) that
+    stays open while the body streams and is closed once it has been sent.
+    """
+    spec = DATASETS.get(dataset)
+    if spec is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export. Choose from {', '.join(DATASETS)}.")
+    try:
+        after = parse_cursor(spec, since) if since is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    db = ReadSessionLocal()
+    try:
+        bound = export_bound(db, spec, current_user.id)
+    except Exception:
+        db.close()
+        raise
+
+    headers = {
+        "Cache-Control": "private, no-store",
+        "Content-Disposition": f'attachment; filename="{dataset}.{format}"',
+    }
+    if bound is not None and (after is None or tuple(bound) > after):
+        headers["X-Next-Cursor"] = format_cursor(*bound)
+        batches = stream_rows(db, spec, current_user.id, after, tuple(bound))
+    else:
+        if since is not None:
+            headers["X-Next-Cursor"] = since
+        batches = iter(())
+
+    return StreamingResponse(
+        SERIALIZERS[format](spec.columns, batches),
+        media_type=EXPORT_FORMATS[format],
+        headers=headers,
+        background=BackgroundTask(db.close),
+    )
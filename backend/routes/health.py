@@ -0,0 +1,31 @@
+"""
+routes/health.py — Operational telemetry
+GET /health/db    → connection pool occupancy and checkout wait times.
+GET /health/cache → hit/miss counters for the in-process caches.
+"""
+from fastapi import APIRouter
+from database import get_pool_status
+from services.leaderboard_cache import leaderboard_cache
+from services.user_cache import user_cache
+from services.user_context import context_cache
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/db")
+def db_health():
+    """
+    Pool statistics for sizing workers against the database:
+    checked-out connections, overflow in use, and time spent waiting for a connection.
+    """
+    return get_pool_status()
+
+
+@router.get("/cache")
+def cache_health():
+    """Per-process cache counters (each worker reports its own)."""
+    return {
+        "users":       user_cache.stats(),
+        "context":     context_cache.stats(),
+        "leaderboard": leaderboard_cache.stats(),
+    }
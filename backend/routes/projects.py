@@ -10,6 +10,7 @@ from typing import Optional
 from database import get_db
 import models
 from .deps import get_current_user
+from services.user_cache import UserSnapshot
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
@@ -23,7 +24,7 @@ class ProjectCreate(BaseModel):
 def create_project(
     project: ProjectCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     db_project = models.Project(
         user_id=current_user.id,
@@ -39,7 +40,7 @@ def create_project(
 @router.get("/")
 def get_user_projects(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     return (
         db.query(models.Project)
@@ -53,7 +54,7 @@ def get_user_projects(
 def delete_project(
     project_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     db_project = db.query(models.Project).filter(
         models.Project.id == project_id,
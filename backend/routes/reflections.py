@@ -5,8 +5,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from database import get_db
-from models import Reflection, Session as SessionModel, User
+from models import Reflection, Session as SessionModel
 from routes.deps import get_current_user
+from services.user_cache import UserSnapshot
 
 router = APIRouter(prefix="/reflections", tags=["reflections"])
 
@@ -20,7 +21,7 @@ class ReflectionRequest(BaseModel):
 def add_reflection(
     body: ReflectionRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Submit a reflection for a completed session."""
     session = db.query(SessionModel).filter(SessionModel.id == body.session_id).first()
@@ -5,8 +5,8 @@ Returns an automatic session-continuation recommendation based on last activity.
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from database import get_db
-from models import User
 from routes.deps import get_current_user
+from services.user_cache import UserSnapshot
 from services.resume_engine import generate_resume
 
 router = APIRouter(prefix="/resume", tags=["resume"])
@@ -16,7 +16,7 @@ router = APIRouter(prefix="/resume", tags=["resume"])
 def get_resume(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """
     Returns a resume recommendation for the authenticated user.
@@ -3,10 +3,18 @@ routes/sessions.py — Session start / end / list
 """
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import case, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, get_async_db
 from models import Session as SessionModel, User
-from routes.deps import get_current_user
+from routes.deps import (
+    get_current_user, get_current_user_for_update, get_current_user_for_update_async, get_read_db,
+)
+from services.user_cache import UserSnapshot
+from services.daily_stats import daily_stats_upsert, focus_trend, load_daily_stats
+from services.local_time import local_date, local_today
+from services.streaks import record_active_day
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
@@ -19,10 +27,10 @@ class SessionStartInput(BaseModel):
     energy_level: Optional[int] = 5
 
 @router.post("/start", status_code=201)
-def start_session(
+async def start_session(
     data: SessionStartInput,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_for_update_async),
 ):
     """Start a new work session. Records start_time."""
     session = SessionModel(
@@ -37,8 +45,7 @@ def start_session(
     if data.task_id:
         current_user.last_active_task_id = data.task_id
 
-    db.commit()
-    db.refresh(session)
+    await db.commit()
 
     return {
         "session_id": session.id,
@@ -48,13 +55,13 @@ def start_session(
 
 
 @router.post("/{session_id}/end")
-def end_session(
+async def end_session(
     session_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_for_update_async),
 ):
     """End a session, compute duration in minutes."""
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    session = await db.get(SessionModel, session_id)
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -67,13 +74,18 @@ def end_session(
     delta = session.end_time - session.start_time
     session.duration_minutes = round(delta.total_seconds() / 60, 2)
     session.status = "completed"
+    session.local_date = local_date(current_user, session.end_time)
+    await db.execute(daily_stats_upsert(
+        db, current_user.id, session.local_date,
+        focus_minutes=session.duration_minutes, session_count=1,
+    ))
+    record_active_day(current_user, session.local_date)
 
     # Clear work continuity when session ends
     if current_user.last_active_task_id == session.task_id:
         current_user.last_active_task_id = None
 
-    db.commit()
-    db.refresh(session)
+    await db.commit()
 
     return {
         "session_id": session.id,
@@ -87,7 +99,7 @@ from models import UserTask
 @router.get("/last-active")
 def get_last_active(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_for_update),
 ):
     """Returns the last active task for work continuity banner."""
     task_id = current_user.last_active_task_id
@@ -113,63 +125,61 @@ def get_last_active(
 
 @router.get("/stats")
 def get_session_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Returns analytics payload for the logged-in user."""
-    today = datetime.utcnow().date()
+    today = local_today(current_user)
     seven_days_ago = today - timedelta(days=6)
     
-    sessions = db.query(SessionModel).filter(
-        SessionModel.user_id == current_user.id
-    ).all()
-    
-    # 1. Total Focus Time (Today and Week)
-    today_focus = sum(s.duration_minutes or 0 for s in sessions if s.end_time and s.end_time.date() == today)
-    
-    week_sessions = [s for s in sessions if s.end_time and s.end_time.date() >= seven_days_ago]
-    week_focus = sum(s.duration_minutes or 0 for s in week_sessions)
-    
-    # 2. Completion Rate
-    completed_sessions = [s for s in sessions if s.status == "completed" and s.duration_minutes is not None]
+    # 1. Total Focus Time (Today and Week) — from the daily rollups
+    days = load_daily_stats(db, current_user.id, seven_days_ago)
+    today_focus = days[today].focus_minutes if today in days else 0
+    week_focus = sum(d.focus_minutes for d in days.values())
+
+    # 2. Completion Rate + 3. Avg Session Length — one aggregate over the user's sessions
+    is_completed = (SessionModel.status == "completed") & SessionModel.duration_minutes.isnot(None)
+    total_count, completed_count, completed_minutes = db.query(
+        func.count(SessionModel.id),
+        func.sum(case((is_completed, 1), else_=0)),
+        func.sum(case((is_completed, SessionModel.duration_minutes), else_=0)),
+    ).filter(SessionModel.user_id == current_user.id).one()
+
     completion_rate = 0
-    if len(sessions) > 0:
-        completion_rate = round((len(completed_sessions) / len(sessions)) * 100)
-        
-    # 3. Avg Session Length
+    if total_count > 0:
+        completion_rate = round((completed_count / total_count) * 100)
+
     avg_session_length = 0
-    if len(completed_sessions) > 0:
-        avg_session_length = round(sum(s.duration_minutes for s in completed_sessions) / len(completed_sessions))
-        
+    if completed_count:
+        avg_session_length = round(completed_minutes / completed_count)
+
     # 4. Productivity Trend (Last 7 Days)
-    # Initialize 7 days trend to 0
-    trend_dict = {(seven_days_ago + timedelta(days=i)).isoformat(): 0 for i in range(7)}
-    for s in week_sessions:
-        if s.end_time:
-            key = s.end_time.date().isoformat()
-            if key in trend_dict:
-                trend_dict[key] += s.duration_minutes or 0
-                
-    trend = [{"date": k, "minutes": round(v)} for k, v in trend_dict.items()]
-    
-    # 5. Energy vs Output
-    energy_buckets = {}
-    for s in completed_sessions:
-        if s.energy_level is not None:
-            if s.energy_level not in energy_buckets:
-                energy_buckets[s.energy_level] = []
-            energy_buckets[s.energy_level].append(s.duration_minutes or 0)
-            
-    energy_vs_output = []
-    for level, durations in energy_buckets.items():
-        energy_vs_output.append({
+    trend = focus_trend(days, seven_days_ago)
+
+    # 5. Energy vs Output — grouped by energy level, highest first
+    energy_rows = (
+        db.query(
+            SessionModel.energy_level,
+            func.count(SessionModel.id),
+            func.sum(SessionModel.duration_minutes),
+        )
+        .filter(
+            SessionModel.user_id == current_user.id,
+            SessionModel.energy_level.isnot(None),
+            is_completed,
+        )
+        .group_by(SessionModel.energy_level)
+        .order_by(SessionModel.energy_level.desc())
+        .all()
+    )
+    energy_vs_output = [
+        {
             "energy_level": level,
-            "session_count": len(durations),
-            "avg_minutes": round(sum(durations) / len(durations))
-        })
-        
-    # Sort by energy level descending
-    energy_vs_output.sort(key=lambda x: x["energy_level"], reverse=True)
+            "session_count": count,
+            "avg_minutes": round(minutes / count),
+        }
+        for level, count, minutes in energy_rows
+    ]
 
     return {
         "today_focus_minutes": round(today_focus),
@@ -184,7 +194,7 @@ def get_session_stats(
 @router.get("/me")
 def list_sessions(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """List all completed sessions for the current user."""
     sessions = (
@@ -5,11 +5,16 @@ user_id is always inferred from the JWT token — never trusted from the request
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
-from database import get_db
+from database import get_db, get_async_db
 import models
-from .deps import get_current_user
+from .deps import get_current_user, get_current_user_async, get_current_user_for_update
+from services.user_cache import UserSnapshot
+from services.daily_stats import daily_stats_upsert
+from services.local_time import local_date
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
@@ -34,7 +39,7 @@ class TaskReorder(BaseModel):
 def create_task(
     task: TaskCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     if task.project_id is not None:
         project = db.query(models.Project).filter(
@@ -66,16 +71,16 @@ def create_task(
 
 
 @router.get("/")
-def get_user_tasks(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+async def get_user_tasks(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user_async),
 ):
-    return (
-        db.query(models.UserTask)
-        .filter(models.UserTask.user_id == current_user.id)
+    result = await db.execute(
+        select(models.UserTask)
+        .where(models.UserTask.user_id == current_user.id)
         .order_by(models.UserTask.order_index.asc(), models.UserTask.created_at.desc())
-        .all()
     )
+    return result.scalars().all()
 
 
 @router.patch("/{task_id}")
@@ -83,7 +88,7 @@ def update_task_status(
     task_id: int,
     task_update: TaskUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     db_task = db.query(models.UserTask).filter(
         models.UserTask.id == task_id,
@@ -103,7 +108,7 @@ def reorder_task(
     task_id: int,
     body: TaskReorder,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Update a task's order_index for drag-to-reorder."""
     db_task = db.query(models.UserTask).filter(
@@ -123,7 +128,7 @@ def reorder_task(
 def start_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: models.User = Depends(get_current_user_for_update),
 ):
     # Enforce: only ONE active task at a time
     active = db.query(models.UserTask).filter(
@@ -154,7 +159,7 @@ def start_task(
 def complete_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: models.User = Depends(get_current_user_for_update),
 ):
     db_task = db.query(models.UserTask).filter(
         models.UserTask.id == task_id,
@@ -163,8 +168,13 @@ def complete_task(
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
 
+    now = datetime.utcnow()
+    today = local_date(current_user, now)
+    if db_task.status != "completed":
+        db.execute(daily_stats_upsert(db, current_user.id, today, tasks_completed=1))
     db_task.status = "completed"
-    db_task.completed_at = datetime.utcnow()
+    db_task.completed_at = now
+    db_task.completed_local_date = today
 
     # Clear work continuity if this was the last active task
     if current_user.last_active_task_id == task_id:
@@ -179,7 +189,7 @@ def complete_task(
 def delete_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     db_task = db.query(models.UserTask).filter(
         models.UserTask.id == task_id,
@@ -0,0 +1,237 @@
+"""
+routes/teams.py — Teams and team dashboards
+
+A team has one owner (its manager) who invites and removes members, and can
+hand the team to another member or delete it. Invitees join only by
+accepting; inviting answers the same whether or not the email is registered,
+so it can't be used to probe for accounts. Dashboards are precomputed by `python jobs.py refresh-team-stats`; the analytics route
+only reads the stored team_stats row.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from database import get_db
+from models import Team, TeamInvite, User
+from routes.deps import get_current_user, get_current_user_for_update, get_read_db
+from services.user_cache import UserSnapshot
+from services.team_stats import WINDOWS, load_team_stats, refresh_team_stats
+
+router = APIRouter(prefix="/teams", tags=["teams"])
+
+
+class TeamCreate(BaseModel):
+    name: str
+
+
+class MemberAdd(BaseModel):
+    email: str
+
+
+class OwnerTransfer(BaseModel):
+    user_id: int
+
+
+_INVITED = {"ok": True, "detail": "If that email belongs to an account outside the team, it has been invited."}
+
+
+def _owned_team(db: Session, team_id: int, user_id: int) -> Team:
+    team = db.get(Team, team_id)
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found.")
+    if team.owner_id != user_id:
+        raise HTTPException(status_code=403, detail="Only the team owner can manage members.")
+    return team
+
+
+def _member(user: User) -> dict:
+    return {"user_id": user.id, "name": user.name, "email": user.email, "role": user.role}
+
+
+def _team(team: Team) -> dict:
+    return {"id": team.id, "name": team.name, "owner_id": team.owner_id}
+
+
+@router.post("/")
+def create_team(
+    body: TeamCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_for_update),
+):
+    """Create a team owned by the caller, who joins it as its first member."""
+    name = body.name.strip()
+    if not name:
+        raise HTTPException(status_code=400, detail="Team name is required.")
+    if current_user.team_id is not None:
+        raise HTTPException(status_code=409, detail="You already belong to a team.")
+    team = Team(name=name, owner_id=current_user.id)
+    db.add(team)
+    db.flush()
+    current_user.team_id = team.id
+    db.flush()
+    refresh_team_stats(db, team_id=team.id)  # one member, no history yet: the dashboard exists from the start
+    db.commit()
+    return _team(team)
+
+
+@router.delete("/{team_id}")
+def delete_team(
+    team_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """Delete the team (owner only). Members are released; stats and pending invites go with it."""
+    team = _owned_team(db, team_id, current_user.id)
+    for member in team.members:
+        member.team_id = None
+    db.delete(team)
+    db.commit()
+    return {"ok": True}
+
+
+@router.post("/{team_id}/owner")
+def transfer_ownership(
+    team_id: int,
+    body: OwnerTransfer,
+    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """Hand the team to another member (owner only). The old owner stays on as a member."""
+    team = _owned_team(db, team_id, current_user.id)
+    user = db.get(User, body.user_id)
+    if not user or user.team_id != team_id:
+        raise HTTPException(status_code=404, detail="User is not a member of this team.")
+    team.owner_id = user.id
+    db.commit()
+    return _team(team)
+
+
+@router.post("/{team_id}/members")
+def invite_member(
+    team_id: int,
+    body: MemberAdd,
+    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """
+    Invite a user by email; they join once they accept (POST /teams/invites/{id}/accept).
+    The response is the same whether or not the email is registered or already invited.
+    """
+    _owned_team(db, team_id, current_user.id)
+    user = db.query(User).filter(User.email == body.email.strip()).first()
+    if user and user.team_id != team_id:
+        invited = db.query(TeamInvite.id).filter(TeamInvite.team_id == team_id, TeamInvite.user_id == user.id)
+        if invited.first() is None:
+            db.add(TeamInvite(team_id=team_id, user_id=user.id))
+            db.commit()
+    return _INVITED
+
+
+@router.get("/invites")
+def list_invites(
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """Pending invitations addressed to the caller."""
+    rows = db.query(TeamInvite, Team) \
+        .join(Team, Team.id == TeamInvite.team_id) \
+        .filter(TeamInvite.user_id == current_user.id) \
+        .order_by(TeamInvite.created_at.desc()) \
+        .all()
+    return {"invites": [
+        {"id": invite.id, "team_id": team.id, "team_name": team.name, "created_at": invite.created_at}
+        for invite, team in rows
+    ]}
+
+
+def _own_invite(db: Session, invite_id: int, user_id: int) -> TeamInvite:
+    invite = db.get(TeamInvite, invite_id)
+    if not invite or invite.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Invite not found.")
+    return invite
+
+
+@router.post("/invites/{invite_id}/accept")
+def accept_invite(
+    invite_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_for_update),
+):
+    """Join the inviting team. A user belongs to at most one team."""
+    invite = _own_invite(db, invite_id, current_user.id)
+    if current_user.team_id is not None:
+        raise HTTPException(status_code=409, detail="Leave your current team before joining another.")
+    team = invite.team
+    current_user.team_id = team.id
+    db.delete(invite)
+    db.commit()
+    return _team(team)
+
+
+@router.delete("/invites/{invite_id}")
+def decline_invite(
+    invite_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    db.delete(_own_invite(db, invite_id, current_user.id))
+    db.commit()
+    return {"ok": True}
+
+
+@router.delete("/{team_id}/members/{user_id}")
+def remove_member(
+    team_id: int,
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """Remove a member (the owner can remove anyone but themselves; members can leave)."""
+    team = db.get(Team, team_id)
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found.")
+    if current_user.id not in (team.owner_id, user_id):
+        raise HTTPException(status_code=403, detail="Only the team owner can remove other members.")
+    if user_id == team.owner_id:
+        raise HTTPException(status_code=400, detail="The owner can't leave; transfer ownership or delete the team.")
+    user = db.get(User, user_id)
+    if not user or user.team_id != team_id:
+        raise HTTPException(status_code=404, detail="User is not a member of this team.")
+    user.team_id = None
+    db.commit()
+    return {"ok": True}
+
+
+@router.get("/{team_id}/members")
+def list_members(
+    team_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    team = db.get(Team, team_id)
+    if not team or current_user.id != team.owner_id and current_user.team_id != team_id:
+        raise HTTPException(status_code=404, detail="Team not found.")
+    members = db.query(User).filter(User.team_id == team_id).order_by(User.name).all()
+    return {"id": team.id, "name": team.name, "owner_id": team.owner_id, "members": [_member(u) for u in members]}
+
+
+@router.get("/{team_id}/analytics")
+def get_team_analytics(
+    team_id: int,
+    window: int = Query(WINDOWS[0], description=f"Trailing days, one of {', '.join(map(str, WINDOWS))}"),
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """
+    Team focus totals, per-member ranking, session-length distribution, top
+    projects and ELO spread, as of the last scheduled refresh (computed_at).
+    """
+    if window not in WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of {', '.join(map(str, WINDOWS))}.")
+    team = db.get(Team, team_id)
+    if not team or current_user.id != team.owner_id and current_user.team_id != team_id:
+        raise HTTPException(status_code=404, detail="Team not found.")
+
+    stats = load_team_stats(db, team_id, window)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Team analytics haven't been computed yet.")
+    return {"team_id": team.id, "name": team.name, **stats}
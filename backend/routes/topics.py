@@ -6,8 +6,8 @@ from fastapi import APIRouter, Depends
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from database import get_db
-from models import User
 from routes.deps import get_current_user
+from services.user_cache import UserSnapshot
 from services.topic_mapper import generate_topic_map
 
 router = APIRouter(prefix="/topic-map", tags=["topics"])
@@ -21,7 +21,7 @@ class TopicRequest(BaseModel):
 def topic_map(
     body: TopicRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """
     Returns 4–6 structured study areas for the given focus subject.
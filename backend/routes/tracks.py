@@ -12,8 +12,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from database import get_db
-from models import User, FocusTrack, ChatHistory
+from models import FocusTrack, ChatHistory
 from routes.deps import get_current_user
+from services.user_cache import UserSnapshot
 
 router = APIRouter(prefix="/tracks", tags=["tracks"])
 
@@ -27,7 +28,7 @@ class TrackRequest(BaseModel):
 @router.get("/")
 def list_tracks(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     tracks = (
         db.query(FocusTrack)
@@ -43,7 +44,7 @@ def list_tracks(
 @router.get("/active")
 def get_active_track(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     track = _get_active(db, current_user.id)
     if track is None:
@@ -57,7 +58,7 @@ def get_active_track(
 def switch_or_create_track(
     body: TrackRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """
     If a track with this topic already exists → activate it (pause others).
@@ -105,7 +106,7 @@ def switch_or_create_track(
 def clear_chat(
     focus_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """
     Deletes ChatHistory rows for this focus_id only.
@@ -133,7 +134,7 @@ def clear_chat(
 def get_chat_history(
     focus_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     track = db.query(FocusTrack).filter(
         FocusTrack.id == focus_id,
@@ -2,99 +2,88 @@
 routes/worker_analytics.py — GET /worker/analytics
 Worker-specific performance metrics.
 """
-from datetime import datetime, timedelta
+from datetime import timedelta
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database import get_db
+from sqlalchemy import case, func
 from models import UserTask, Session as SessionModel, Project
-from routes.deps import get_current_user
-from models import User
+from routes.deps import get_current_user, get_read_db
+from services.user_cache import UserSnapshot
+from services.daily_stats import focus_trend, load_daily_stats
+from services.local_time import local_today
 
 router = APIRouter(prefix="/worker", tags=["worker-analytics"])
 
 
 @router.get("/analytics")
 def get_worker_analytics(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    today       = datetime.utcnow().date()
+    today       = local_today(current_user)
     week_start  = today - timedelta(days=6)
 
-    # ── All sessions ─────────────────────────────────────────────────
-    all_sessions = (
-        db.query(SessionModel)
-        .filter(SessionModel.user_id == current_user.id)
-        .all()
-    )
-    completed_sessions = [s for s in all_sessions if s.duration_minutes]
+    # Sessions that logged time (duration > 0)
+    logged = (SessionModel.user_id == current_user.id, SessionModel.duration_minutes > 0)
 
-    today_sessions = [
-        s for s in completed_sessions
-        if s.end_time and s.end_time.date() == today
-    ]
-    week_sessions = [
-        s for s in completed_sessions
-        if s.end_time and s.end_time.date() >= week_start
-    ]
+    # Today / week from the daily rollups
+    days = load_daily_stats(db, current_user.id, week_start)
+    today_minutes = round(days[today].focus_minutes) if today in days else 0
+    week_minutes  = round(sum(d.focus_minutes for d in days.values()))
 
-    today_minutes = round(sum(s.duration_minutes for s in today_sessions))
-    week_minutes  = round(sum(s.duration_minutes for s in week_sessions))
-    avg_session   = round(
-        sum(s.duration_minutes for s in completed_sessions) / len(completed_sessions)
-    ) if completed_sessions else 0
+    session_count, session_minutes = db.query(
+        func.count(SessionModel.id), func.sum(SessionModel.duration_minutes),
+    ).filter(*logged).one()
+    avg_session = round(session_minutes / session_count) if session_count else 0
 
-    # ── All tasks ────────────────────────────────────────────────────
-    all_tasks = db.query(UserTask).filter(UserTask.user_id == current_user.id).all()
-    done_tasks  = [t for t in all_tasks if t.status == "completed"]
+    # ── Task counts ──────────────────────────────────────────────────
+    total_tasks, done_tasks = db.query(
+        func.count(UserTask.id),
+        func.sum(case((UserTask.status == "completed", 1), else_=0)),
+    ).filter(UserTask.user_id == current_user.id).one()
+    done_tasks = done_tasks or 0
     completion_ratio = round(
-        (len(done_tasks) / len(all_tasks)) * 100
-    ) if all_tasks else 0
+        (done_tasks / total_tasks) * 100
+    ) if total_tasks else 0
 
     # ── 7-Day trend ──────────────────────────────────────────────────
-    trend_dict = {
-        (week_start + timedelta(days=i)).isoformat(): 0
-        for i in range(7)
-    }
-    for s in week_sessions:
-        if s.end_time:
-            key = s.end_time.date().isoformat()
-            if key in trend_dict:
-                trend_dict[key] += s.duration_minutes or 0
-    trend = [{"date": k, "minutes": round(v)} for k, v in trend_dict.items()]
+    trend = focus_trend(days, week_start)
 
     # ── Time per project ─────────────────────────────────────────────
-    project_time: dict[str, float] = {}
-    for s in completed_sessions:
-        if not s.task_id:
-            continue
-        task = db.query(UserTask).filter(UserTask.id == s.task_id).first()
-        if task:
-            label = task.project or "Uncategorized"
-            if task.project_id:
-                proj = db.query(Project).filter(Project.id == task.project_id).first()
-                if proj:
-                    label = proj.name
-            project_time[label] = project_time.get(label, 0) + (s.duration_minutes or 0)
-
+    # One sessions ⋈ user_tasks ⟕ projects aggregate. Label: project name,
+    # else the task's legacy project string, else "Uncategorized".
+    label = func.coalesce(Project.name, func.nullif(UserTask.project, ""), "Uncategorized")
+    minutes = func.sum(SessionModel.duration_minutes)
+    project_rows = (
+        db.query(label, minutes)
+        .select_from(SessionModel)
+        .join(UserTask, UserTask.id == SessionModel.task_id)
+        .outerjoin(Project, Project.id == UserTask.project_id)
+        .filter(*logged)
+        .group_by(label)
+        .order_by(minutes.desc())
+        .all()
+    )
     time_per_project = [
-        {"project": k, "minutes": round(v)}
-        for k, v in sorted(project_time.items(), key=lambda x: -x[1])
+        {"project": name, "minutes": round(total)}
+        for name, total in project_rows
     ]
 
     # ── Energy vs output ─────────────────────────────────────────────
-    energy_buckets: dict[int, list] = {}
-    for s in completed_sessions:
-        if s.energy_level is not None:
-            energy_buckets.setdefault(s.energy_level, []).append(s.duration_minutes or 0)
+    energy_rows = (
+        db.query(SessionModel.energy_level, func.count(SessionModel.id), func.sum(SessionModel.duration_minutes))
+        .filter(*logged, SessionModel.energy_level.isnot(None))
+        .group_by(SessionModel.energy_level)
+        .order_by(SessionModel.energy_level.desc())
+        .all()
+    )
     energy_vs_output = [
         {
             "energy_level": level,
-            "session_count": len(durations),
-            "avg_minutes": round(sum(durations) / len(durations)),
+            "session_count": count,
+            "avg_minutes": round(total / count),
         }
-        for level, durations in sorted(energy_buckets.items(), reverse=True)
+        for level, count, total in energy_rows
     ]
 
     return {
@@ -105,6 +94,6 @@ def get_worker_analytics(
         "trend":                trend,
         "time_per_project":     time_per_project,
         "energy_vs_output":     energy_vs_output,
-        "total_tasks":          len(all_tasks),
-        "completed_tasks":      len(done_tasks),
+        "total_tasks":          total_tasks,
+        "completed_tasks":      done_tasks,
     }
@@ -1,29 +1,37 @@
 """
 routes/xp.py — Award XP + view XP log
 """
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from database import get_db
-from models import User, XPLog
-from routes.deps import get_current_user
-from services.xp_engine import award_xp
+from routes.deps import get_current_user, get_read_db
+from services.user_cache import UserSnapshot
+from services.xp_engine import MAX_BATCH_SESSIONS, award_xp, award_xp_batch
+from services.xp_ledger import xp_between, xp_history
 
 router = APIRouter(prefix="/xp", tags=["xp"])
 
+XP_LOG_LIMIT = 50
+
 
 class AwardXPRequest(BaseModel):
     session_id: int
 
 
+class AwardXPBatchRequest(BaseModel):
+    session_ids: list[int] = Field(..., min_length=1, max_length=MAX_BATCH_SESSIONS)
+
+
 @router.post("/award")
 def award_xp_endpoint(
     body: AwardXPRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    """Calculate and award XP for a completed session (with reflection check)."""
-    result = award_xp(db=db, user_id=current_user.id, session_id=body.session_id)
+    """Calculate and award XP for a completed session (with reflection check). Safe to retry."""
+    result = award_xp(db=db, user=current_user, session_id=body.session_id)
 
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -31,29 +39,40 @@ def award_xp_endpoint(
     return result
 
 
-@router.get("/log")
-def get_xp_log(
+@router.post("/award-batch")
+def award_xp_batch_endpoint(
+    body: AwardXPBatchRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    """Return the user's full XP history."""
-    logs = (
-        db.query(XPLog)
-        .filter(XPLog.user_id == current_user.id)
-        .order_by(XPLog.created_at.desc())
-        .limit(50)
-        .all()
-    )
+    """
+    Award XP for many ended sessions at once (offline sync) in one transaction.
+    Each result is the session's breakdown, or an "error" for sessions that
+    can't be awarded; those don't fail the batch. Safe to retry.
+    """
+    return award_xp_batch(db=db, user=current_user, session_ids=body.session_ids)
+
 
+@router.get("/log")
+def get_xp_log(
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """Return the user's latest XP awards; days past retention appear as one compacted entry each."""
     return {
         "total_xp": current_user.xp,
-        "history": [
-            {
-                "id": log.id,
-                "xp_awarded": log.xp_awarded,
-                "reason": log.reason,
-                "created_at": log.created_at.isoformat(),
-            }
-            for log in logs
-        ],
+        "history": xp_history(db, current_user.id, XP_LOG_LIMIT),
     }
+
+
+@router.get("/earned")
+def get_xp_earned(
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """XP earned between two local dates (inclusive), from balance checkpoints plus the recent tail."""
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'.")
+    return {"from": start.isoformat(), "to": end.isoformat(), "xp": xp_between(db, current_user.id, start, end)}
@@ -1,82 +1,124 @@
 """
 services/analytics_service.py — Rule-based analytics from session data
-No machine learning — pure computation.
+No machine learning — pure computation. Day-level figures come from the
+user_daily_stats rollups; all-time figures are aggregated in SQL.
 """
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session as DBSession
-from models import Session as SessionModel, XPLog
+from models import Session as SessionModel
+from services import streaks
+from services.daily_stats import load_daily_stats
+from services.local_time import local_today
 
+GRANULARITIES = ("day", "week", "month")
+RANGE_METRICS = ("focus_minutes", "session_count", "xp_earned", "tasks_completed", "active_days", "avg_energy")
+MAX_RANGE_DAYS = 366 * 5
 
-def get_analytics(db: DBSession, user_id: int) -> dict:
-    """Compute all analytics metrics for a user."""
-    now = datetime.utcnow()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_start = now - timedelta(days=now.weekday())
-    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
 
-    all_sessions = (
-        db.query(SessionModel)
-        .filter(
-            SessionModel.user_id == user_id,
-            SessionModel.end_time.isnot(None),
-        )
-        .all()
-    )
+def get_analytics(db: DBSession, user) -> dict:
+    """Compute all analytics metrics for a user (ORM User or UserSnapshot)."""
+    user_id = user.id
+    today = local_today(user)
+    week_start = today - timedelta(days=today.weekday())
 
-    # Today's sessions
-    today_sessions = [
-        s for s in all_sessions if s.start_time >= today_start
-    ]
+    # Today / this week — at most 7 rollup rows
+    days = load_daily_stats(db, user_id, week_start)
+    today_stats = days.get(today)
+    total_focus_today = today_stats.focus_minutes if today_stats else 0
+    xp_today = today_stats.xp_earned if today_stats else 0
+    sessions_today = today_stats.session_count if today_stats else 0
+    sessions_this_week = sum(d.session_count for d in days.values() if d.date >= week_start)
 
-    # This week's sessions
-    week_sessions = [
-        s for s in all_sessions if s.start_time >= week_start
-    ]
+    # Consistency and streaks from the activity bitmap on the user row
+    active_days = streaks.active_days(user, today)
 
-    # Metrics
-    total_focus_today = sum(
-        s.duration_minutes or 0 for s in today_sessions
-    )
-    avg_session_length = (
-        sum(s.duration_minutes or 0 for s in all_sessions) / len(all_sessions)
-        if all_sessions
-        else 0
-    )
-
-    # Consistency score: days with at least one session / last 7 days
-    session_dates = set(s.start_time.date() for s in all_sessions)
-    last_7_days = {(now - timedelta(days=i)).date() for i in range(7)}
-    active_days = session_dates & last_7_days
-    consistency_score = round(len(active_days) / 7 * 100)
-
-    # XP earned today
-    today_xp = (
-        db.query(XPLog)
-        .filter(
-            XPLog.user_id == user_id,
-            XPLog.created_at >= today_start,
-        )
-        .all()
-    )
-    xp_today = sum(x.xp_awarded for x in today_xp)
-
-    # Session duration distribution (short/medium/long)
-    short = sum(1 for s in all_sessions if (s.duration_minutes or 0) < 25)
-    medium = sum(1 for s in all_sessions if 25 <= (s.duration_minutes or 0) < 60)
-    long_ = sum(1 for s in all_sessions if (s.duration_minutes or 0) >= 60)
+    # All-time totals and duration distribution (short/medium/long) in one aggregate
+    duration = func.coalesce(SessionModel.duration_minutes, 0)
+    total_sessions, total_minutes, short, medium, long_ = db.query(
+        func.count(SessionModel.id),
+        func.sum(duration),
+        func.sum(case((duration < 25, 1), else_=0)),
+        func.sum(case(((duration >= 25) & (duration < 60), 1), else_=0)),
+        func.sum(case((duration >= 60, 1), else_=0)),
+    ).filter(
+        SessionModel.user_id == user_id,
+        SessionModel.end_time.isnot(None),
+    ).one()
+    avg_session_length = (total_minutes or 0) / total_sessions if total_sessions else 0
 
     return {
         "total_focus_time_today": round(total_focus_today, 1),
         "avg_session_length": round(avg_session_length, 1),
-        "sessions_today": len(today_sessions),
-        "sessions_this_week": len(week_sessions),
-        "total_sessions": len(all_sessions),
-        "consistency_score": consistency_score,
+        "sessions_today": sessions_today,
+        "sessions_this_week": sessions_this_week,
+        "total_sessions": total_sessions,
+        "consistency_score": streaks.consistency_pct(user, today),
+        "current_streak": streaks.current_streak(user, today),
+        "longest_streak": user.longest_streak or 0,
         "xp_today": xp_today,
         "session_distribution": {
-            "short_under_25m": short,
-            "medium_25_60m": medium,
-            "long_over_60m": long_,
+            "short_under_25m": short or 0,
+            "medium_25_60m": medium or 0,
+            "long_over_60m": long_ or 0,
         },
-        "active_days_last_7": len(active_days),
+        "active_days_last_7": active_days,
     }
+
+
+# ── Arbitrary ranges ─────────────────────────────────────────────────────────
+
+def _bucket_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start: date, granularity: str) -> date:
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def get_range_analytics(
+    db: DBSession,
+    user_id: int,
+    start: date,
+    end: date,
+    granularity: str = "day",
+    metrics: tuple[str, ...] = RANGE_METRICS,
+) -> list[dict]:
+    """
+    Metrics for start..end (inclusive) bucketed by day, ISO week or calendar
+    month, zero-filled. Reads one user_daily_stats row per active day, so a
+    year is at most 366 rows whatever the session history. The first and last
+    buckets are clipped to the range.
+    """
+    rows = load_daily_stats(db, user_id, start, end)
+
+    buckets = []
+    bucket = _bucket_start(start, granularity)
+    while bucket <= end:
+        following = _next_bucket(bucket, granularity)
+        first, last = max(bucket, start), min(following - timedelta(days=1), end)
+        days = [r for r in (rows.get(first + timedelta(days=i)) for i in range((last - first).days + 1)) if r]
+        energies = [r.energy_level for r in days if r.energy_level is not None]
+        values = {
+            "focus_minutes":   round(sum((r.focus_minutes for r in days), 0.0), 1),
+            "session_count":   sum(r.session_count for r in days),
+            "xp_earned":       sum(r.xp_earned for r in days),
+            "tasks_completed": sum(r.tasks_completed for r in days),
+            "active_days":     sum(1 for r in days if r.session_count),
+            "avg_energy":      round(sum(energies) / len(energies), 1) if energies else None,
+        }
+        buckets.append({
+            "start": first.isoformat(),
+            "end":   last.isoformat(),
+            **{m: values[m] for m in metrics},
+        })
+        bucket = following
+    return buckets
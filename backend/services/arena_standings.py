@@ -0,0 +1,90 @@
+"""
+services/arena_standings.py — Precomputed Focus Arena records
+
+complete_challenge executes standing_upsert() for both participants in the
+match transaction, so the leaderboard reads one row per worker instead of
+counting match_results and challenges. rebuild_arena_standings() replays
+finished matches (migration backfill and `python jobs.py`).
+"""
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import case, delete, insert, select
+
+from database import upsert_insert
+from models import ArenaStanding, Challenge, MatchResult
+
+OUTCOMES = ("win", "loss", "draw")
+
+
+def outcome_for(user_id: int, winner_id) -> str:
+    if winner_id is None:
+        return "draw"
+    return "win" if winner_id == user_id else "loss"
+
+
+def standing_upsert(db, user_id: int, outcome: str):
+    """INSERT … ON CONFLICT (user_id) DO UPDATE statement recording one finished match."""
+    if outcome not in OUTCOMES:
+        raise ValueError(f"Unknown outcome {outcome!r}")
+
+    win, loss, draw = (int(outcome == o) for o in OUTCOMES)
+    stmt = upsert_insert(db, ArenaStanding).values(
+        user_id=user_id,
+        wins=win,
+        losses=loss,
+        draws=draw,
+        total=1,
+        streak=win - loss,
+        updated_at=datetime.utcnow(),
+    )
+    row, new = ArenaStanding.__table__.c, stmt.excluded
+    if outcome == "win":
+        streak = case((row.streak > 0, row.streak + 1), else_=1)
+    elif outcome == "loss":
+        streak = case((row.streak < 0, row.streak - 1), else_=-1)
+    else:
+        streak = 0
+    return stmt.on_conflict_do_update(
+        index_elements=[row.user_id],
+        set_={
+            "wins":       row.wins + new.wins,
+            "losses":     row.losses + new.losses,
+            "draws":      row.draws + new.draws,
+            "total":      row.total + new.total,
+            "streak":     streak,
+            "updated_at": new.updated_at,
+        },
+    )
+
+
+def rebuild_arena_standings(db) -> int:
+    """Recompute every standing from finished challenges, oldest first. Returns rows written."""
+    records: dict[int, dict] = defaultdict(lambda: {"wins": 0, "losses": 0, "draws": 0, "total": 0, "streak": 0})
+
+    matches = db.execute(
+        select(Challenge.challenger_id, Challenge.opponent_id, MatchResult.winner_id)
+        .join(MatchResult, MatchResult.challenge_id == Challenge.id)
+        .where(Challenge.status == "finished")
+        .order_by(Challenge.end_time.asc(), Challenge.id.asc())
+    )
+    for challenger_id, opponent_id, winner_id in matches:
+        for user_id in (challenger_id, opponent_id):
+            rec = records[user_id]
+            outcome = outcome_for(user_id, winner_id)
+            rec["total"] += 1
+            if outcome == "win":
+                rec["wins"] += 1
+                rec["streak"] = rec["streak"] + 1 if rec["streak"] > 0 else 1
+            elif outcome == "loss":
+                rec["losses"] += 1
+                rec["streak"] = rec["streak"] - 1 if rec["streak"] < 0 else -1
+            else:
+                rec["draws"] += 1
+                rec["streak"] = 0
+
+    db.execute(delete(ArenaStanding))
+    rows = [{"user_id": user_id, **rec} for user_id, rec in records.items()]
+    if rows:
+        db.execute(insert(ArenaStanding), rows)
+    return len(rows)
@@ -6,12 +6,10 @@ achievements) and sends it to Groq LLM for deeply personalised analysis and
 actionable ideas — for both student and worker roles.
 """
 import os
-from datetime import datetime, timedelta, date
+from datetime import datetime
 from sqlalchemy.orm import Session as DBSession
-from models import (
-    User, Session as SessionModel, EnergyLog, XPLog,
-    UserTask, Project, Challenge, MatchResult,
-)
+from models import User
+from services.user_context import get_user_context
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL   = "llama-3.3-70b-versatile"
@@ -25,124 +23,55 @@ def _groq_client():
 # ── Context loader ─────────────────────────────────────────────────────────────
 
 def _load_full_context(db: DBSession, user: User) -> dict:
-    now        = datetime.utcnow()
-    today      = now.date()
-    week_start = today - timedelta(days=6)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    # Sessions
-    all_sessions = (
-        db.query(SessionModel)
-        .filter(SessionModel.user_id == user.id)
-        .all()
-    )
-    completed_sessions = [s for s in all_sessions if s.duration_minutes]
-    today_sessions     = [s for s in completed_sessions if s.end_time and s.end_time.date() == today]
-    week_sessions      = [s for s in completed_sessions if s.end_time and s.end_time.date() >= week_start]
-
-    today_focus   = round(sum(s.duration_minutes for s in today_sessions))
-    week_focus    = round(sum(s.duration_minutes for s in week_sessions))
-    avg_session   = round(sum(s.duration_minutes for s in completed_sessions) / len(completed_sessions)) if completed_sessions else 0
-    total_sessions = len(completed_sessions)
-
-    session_dates = {s.start_time.date() for s in completed_sessions}
-    last_7_dates  = {(now - timedelta(days=i)).date() for i in range(7)}
-    active_days   = len(session_dates & last_7_dates)
-    consistency   = round(active_days / 7 * 100)
-
-    last_session = max(completed_sessions, key=lambda s: s.end_time, default=None) if completed_sessions else None
-    idle_minutes = round((now - last_session.end_time).total_seconds() / 60) if last_session and last_session.end_time else None
-
-    # XP
-    xp_logs = db.query(XPLog).filter(XPLog.user_id == user.id).all()
-    xp_today = sum(x.xp_awarded for x in xp_logs if x.created_at >= today_start)
-    xp_week  = sum(x.xp_awarded for x in xp_logs if x.created_at >= datetime.combine(week_start, datetime.min.time()))
-
-    # Energy
-    energy_log = (
-        db.query(EnergyLog)
-        .filter(EnergyLog.user_id == user.id, EnergyLog.date == today)
-        .first()
-    )
-    energy_level = energy_log.level if energy_log else None
-
-    # Energy trend (last 7 days)
-    energy_trend = (
-        db.query(EnergyLog)
-        .filter(EnergyLog.user_id == user.id, EnergyLog.date >= week_start)
-        .order_by(EnergyLog.date.asc())
-        .all()
-    )
-    energy_trend_str = ", ".join(f"{e.date.strftime('%a')}:{e.level}" for e in energy_trend) or "No data"
+    now  = datetime.utcnow()
+    snap = get_user_context(db, user)
 
-    # Tasks
-    all_tasks      = db.query(UserTask).filter(UserTask.user_id == user.id).all()
-    pending_tasks  = [t for t in all_tasks if t.status == "pending"]
-    active_tasks   = [t for t in all_tasks if t.status == "active"]
-    completed_tasks = [t for t in all_tasks if t.status == "completed"]
+    idle_minutes = round((now - snap.last_end_time).total_seconds() / 60) if snap.last_end_time else None
 
-    high_priority   = [t for t in pending_tasks if t.priority == "high"]
-    total_est_mins  = sum(t.estimated_minutes for t in pending_tasks + active_tasks)
+    energy_trend_str = ", ".join(f"{d.strftime('%a')}:{level}" for d, level in snap.energy_levels) or "No data"
 
-    # Projects
-    projects = db.query(Project).filter(Project.user_id == user.id).all()
-    project_names = [p.name for p in projects]
+    # Tasks
+    pending_tasks  = [t for t in snap.open_tasks if t.status == "pending"]
+    active_tasks   = [t for t in snap.open_tasks if t.status == "active"]
+    high_priority  = [t for t in pending_tasks if t.priority == "high"]
+    total_est_mins = sum(t.estimated_minutes for t in snap.open_tasks)
 
     # Arena (worker only)
     arena_data = {}
     if user.role == "worker":
-        challenges_won = (
-            db.query(MatchResult)
-            .filter(MatchResult.winner_id == user.id)
-            .count()
-        )
-        total_challenges = (
-            db.query(Challenge)
-            .filter(
-                (Challenge.challenger_id == user.id) | (Challenge.opponent_id == user.id),
-                Challenge.status == "finished",
-            )
-            .count()
-        )
         arena_data = {
             "elo_rating": user.elo_rating,
             "rank_points": user.rank_points,
-            "challenges_won": challenges_won,
-            "total_challenges": total_challenges,
-            "win_rate": round((challenges_won / total_challenges) * 100) if total_challenges else 0,
+            "challenges_won": snap.challenges_won,
+            "total_challenges": snap.total_challenges,
+            "win_rate": round((snap.challenges_won / snap.total_challenges) * 100) if snap.total_challenges else 0,
         }
 
     # 7-day output trend
-    trend_dict = {(week_start + timedelta(days=i)).isoformat(): 0 for i in range(7)}
-    for s in week_sessions:
-        if s.end_time:
-            key = s.end_time.date().isoformat()
-            if key in trend_dict:
-                trend_dict[key] += round(s.duration_minutes or 0)
-    trend_str = ", ".join(f"{k[-5:]}:{v}m" for k, v in trend_dict.items())
+    trend_str = ", ".join(f"{d.date.strftime('%m-%d')}:{round(d.focus_minutes)}m" for d in snap.days)
 
     return {
         "name": user.name,
         "role": user.role,
         "xp_total": user.xp,
-        "xp_today": xp_today,
-        "xp_week": xp_week,
-        "today_focus_minutes": today_focus,
-        "week_focus_minutes": week_focus,
-        "avg_session_minutes": avg_session,
-        "total_sessions": total_sessions,
-        "sessions_today": len(today_sessions),
-        "active_days_this_week": active_days,
-        "consistency_pct": consistency,
+        "xp_today": snap.today.xp_earned,
+        "xp_week": snap.xp_week,
+        "today_focus_minutes": round(snap.today.focus_minutes),
+        "week_focus_minutes": round(snap.week_focus_minutes),
+        "avg_session_minutes": round(snap.avg_session_minutes),
+        "total_sessions": snap.total_sessions,
+        "sessions_today": snap.today.session_count,
+        "active_days_this_week": snap.active_days,
+        "consistency_pct": snap.consistency_pct,
         "idle_minutes": idle_minutes,
-        "energy_today": energy_level,
+        "energy_today": snap.energy_today,
         "energy_trend_7d": energy_trend_str,
         "pending_tasks": [(t.title, t.priority, t.estimated_minutes) for t in pending_tasks[:8]],
         "active_task": active_tasks[0].title if active_tasks else None,
-        "completed_tasks_count": len(completed_tasks),
+        "completed_tasks_count": snap.completed_tasks_count,
         "high_priority_count": len(high_priority),
         "total_pending_minutes": total_est_mins,
-        "projects": project_names,
+        "projects": list(snap.project_names),
         "7day_focus_trend": trend_str,
         **arena_data,
     }
@@ -13,7 +13,9 @@ import json
 import httpx
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session as DBSession
-from models import User, Session as SessionModel, Reflection, XPLog
+from models import User
+from services.local_time import day_bounds_utc
+from services.user_context import get_user_context
 
 OLLAMA_URL   = "http://localhost:11434/api/generate"
 OLLAMA_MODEL = "mistral"
@@ -111,36 +113,10 @@ def _resolve_intent(message: str) -> str:
 
 def _load_context(db: DBSession, user: User) -> dict:
     now = datetime.utcnow()
-    today_start     = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    yesterday_start = today_start - timedelta(days=1)
-
-    all_sessions = (
-        db.query(SessionModel)
-        .filter(SessionModel.user_id == user.id, SessionModel.end_time.isnot(None))
-        .order_by(SessionModel.end_time.desc())
-        .all()
-    )
-
-    last              = all_sessions[0] if all_sessions else None
-    yesterday_sessions = [s for s in all_sessions if yesterday_start <= s.start_time < today_start]
-    today_sessions     = [s for s in all_sessions if s.start_time >= today_start]
-
-    last_focus = None
-    if last and last.reflection:
-        text = (last.reflection.text or "").strip()
-        last_focus = text.split(".")[0][:60] if text else None
-
-    session_dates   = {s.start_time.date() for s in all_sessions}
-    last_7          = {(now - timedelta(days=i)).date() for i in range(7)}
-    active_days     = len(session_dates & last_7)
-    consistency_pct = round(active_days / 7 * 100)
-
-    xp_today = sum(
-        x.xp_awarded
-        for x in db.query(XPLog)
-        .filter(XPLog.user_id == user.id, XPLog.created_at >= today_start)
-        .all()
-    )
+    snap = get_user_context(db, user)
+    yesterday_start, today_start = day_bounds_utc(user, snap.day - timedelta(days=1))
+    last = snap.last_session
+    yesterday_sessions = [s for s in snap.recent_sessions if yesterday_start <= s.start_time < today_start]
 
     gap_hours = round((now - last.end_time).total_seconds() / 3600, 1) if last else None
 
@@ -148,29 +124,24 @@ def _load_context(db: DBSession, user: User) -> dict:
         "name":               user.name.split()[0],
         "role":               user.role,
         "xp":                 user.xp,
-        "xp_today":           xp_today,
-        "total_sessions":     len(all_sessions),
-        "sessions_today":     len(today_sessions),
+        "xp_today":           snap.today.xp_earned,
+        "total_sessions":     snap.total_sessions,
+        "sessions_today":     snap.today.session_count,
         "sessions_yesterday": len(yesterday_sessions),
         "yesterday_focus":    _session_focus(yesterday_sessions[0] if yesterday_sessions else None),
         "yesterday_duration": yesterday_sessions[0].duration_minutes if yesterday_sessions else None,
         "last_session":       last,
-        "last_focus":         last_focus,
+        "last_focus":         last.focus if last else None,
         "last_duration":      last.duration_minutes if last else None,
         "gap_hours":          gap_hours,
-        "active_days":        active_days,
-        "consistency_pct":    consistency_pct,
-        "total_focus_today":  round(sum(s.duration_minutes or 0 for s in today_sessions)),
+        "active_days":        snap.active_days,
+        "consistency_pct":    snap.consistency_pct,
+        "total_focus_today":  round(snap.today.focus_minutes),
     }
 
 
 def _session_focus(session) -> str | None:
-    if session is None:
-        return None
-    if session.reflection:
-        text = (session.reflection.text or "").strip()
-        return text.split(".")[0][:60] if text else None
-    return None
+    return session.focus if session is not None else None
 
 
 # ── Reply builders ────────────────────────────────────────────────────────────
@@ -0,0 +1,160 @@
+"""
+services/daily_stats.py — Incrementally maintained per-user daily rollups
+
+Write paths add their deltas with daily_stats_upsert() inside their own
+transaction; read paths fetch a handful of user_daily_stats rows instead of
+every session/XP log the user ever produced. rebuild_daily_stats() recomputes
+rows from the source tables (migration backfill and `python jobs.py`).
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from database import dialect_name, sql_date, upsert_insert
+from models import EnergyLog, Session as SessionModel, UserDailyStats, UserTask, XPCheckpoint, XPLog
+from services.xp_ledger import compacted_days
+
+
+def daily_stats_upsert(
+    db,
+    user_id: int,
+    day: date,
+    *,
+    focus_minutes: float = 0.0,
+    session_count: int = 0,
+    xp_earned: int = 0,
+    tasks_completed: int = 0,
+    energy_level: Optional[int] = None,
+):
+    """
+    INSERT … ON CONFLICT (user_id, date) DO UPDATE statement adding the given
+    deltas to the day's row. energy_level replaces the stored value when given.
+    The caller executes it in the transaction of the write it accounts for.
+    """
+    stmt = upsert_insert(db, UserDailyStats).values(
+        user_id=user_id,
+        date=day,
+        focus_minutes=focus_minutes,
+        session_count=session_count,
+        xp_earned=xp_earned,
+        tasks_completed=tasks_completed,
+        energy_level=energy_level,
+    )
+    row, new = UserDailyStats.__table__.c, stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[row.user_id, row.date],
+        set_={
+            "focus_minutes":   row.focus_minutes + new.focus_minutes,
+            "session_count":   row.session_count + new.session_count,
+            "xp_earned":       row.xp_earned + new.xp_earned,
+            "tasks_completed": row.tasks_completed + new.tasks_completed,
+            "energy_level":    func.coalesce(new.energy_level, row.energy_level),
+        },
+    )
+
+
+def load_daily_stats(db, user_id: int, start: date, end: Optional[date] = None) -> dict[date, UserDailyStats]:
+    """Rollup rows for start..end (inclusive), keyed by date. Days without activity are absent."""
+    q = db.query(UserDailyStats).filter(
+        UserDailyStats.user_id == user_id,
+        UserDailyStats.date >= start,
+    )
+    if end is not None:
+        q = q.filter(UserDailyStats.date <= end)
+    return {row.date: row for row in q.all()}
+
+
+def focus_trend(rows: dict[date, UserDailyStats], start: date, days: int = 7) -> list[dict]:
+    """Focus minutes per day from start, zero-filled."""
+    trend = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        row = rows.get(day)
+        trend.append({"date": day.isoformat(), "minutes": round(row.focus_minutes) if row else 0})
+    return trend
+
+
+# ── Backfill ─────────────────────────────────────────────────────────────────
+
+def _day(local_date, timestamp, dialect: str):
+    # Rows written before local dates existed fall back to the UTC date
+    return func.coalesce(local_date, sql_date(timestamp, dialect))
+
+
+def _has_checkpoints(db) -> bool:
+    # Migrations older than the xp_checkpoints table rebuild rollups too
+    bind = db.connection() if isinstance(db, Session) else db
+    return inspect(bind).has_table(XPCheckpoint.__tablename__)
+
+
+def _as_date(value) -> date:
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def rebuild_daily_stats(db, user_id: Optional[int] = None, batch_size: int = 1000) -> int:
+    """
+    Recompute user_daily_stats from sessions, xp_logs (plus compacted XP
+    checkpoints), user_tasks and energy_logs (for one user, or everyone). Idempotent; returns rows written.
+    Runs in the caller's transaction.
+    """
+    dialect = dialect_name(db)
+    days: dict[tuple[int, date], dict] = defaultdict(dict)
+
+    def scoped(stmt, column):
+        return stmt.where(column == user_id) if user_id is not None else stmt
+
+    end_day = _day(SessionModel.local_date, SessionModel.end_time, dialect)
+    for uid, day, minutes, count in db.execute(scoped(
+        select(SessionModel.user_id, end_day, func.sum(func.coalesce(SessionModel.duration_minutes, 0)), func.count())
+        .where(SessionModel.end_time.isnot(None))
+        .group_by(SessionModel.user_id, end_day),
+        SessionModel.user_id,
+    )):
+        days[(uid, _as_date(day))].update(focus_minutes=minutes or 0.0, session_count=count)
+
+    xp_day = _day(XPLog.local_date, XPLog.created_at, dialect)
+    for uid, day, xp in db.execute(scoped(
+        select(XPLog.user_id, xp_day, func.sum(XPLog.xp_awarded)).group_by(XPLog.user_id, xp_day),
+        XPLog.user_id,
+    )):
+        days[(uid, _as_date(day))]["xp_earned"] = xp or 0
+    if _has_checkpoints(db):
+        for (uid, day), xp in compacted_days(db, user_id).items():
+            values = days[(uid, _as_date(day))]
+            values["xp_earned"] = values.get("xp_earned", 0) + xp
+
+    done_day = _day(UserTask.completed_local_date, UserTask.completed_at, dialect)
+    for uid, day, count in db.execute(scoped(
+        select(UserTask.user_id, done_day, func.count())
+        .where(UserTask.status == "completed", UserTask.completed_at.isnot(None))
+        .group_by(UserTask.user_id, done_day),
+        UserTask.user_id,
+    )):
+        days[(uid, _as_date(day))]["tasks_completed"] = count
+
+    for uid, day, level in db.execute(scoped(
+        select(EnergyLog.user_id, EnergyLog.date, EnergyLog.level),
+        EnergyLog.user_id,
+    )):
+        days[(uid, _as_date(day))]["energy_level"] = level
+
+    db.execute(scoped(delete(UserDailyStats), UserDailyStats.user_id))
+
+    rows = [
+        {
+            "user_id": uid,
+            "date": day,
+            "focus_minutes": values.get("focus_minutes", 0.0),
+            "session_count": values.get("session_count", 0),
+            "xp_earned": values.get("xp_earned", 0),
+            "tasks_completed": values.get("tasks_completed", 0),
+            "energy_level": values.get("energy_level"),
+        }
+        for (uid, day), values in days.items()
+    ]
+    for i in range(0, len(rows), batch_size):
+        db.execute(insert(UserDailyStats), rows[i:i + batch_size])
+    return len(rows)
@@ -0,0 +1,173 @@
+"""
+services/export.py — Streaming bulk export of a user's history
+
+Each dataset is read in (cursor column, id) order through a server-side
+cursor (yield_per → stream_results), serialized one partition at a time and
+handed to the response as it is produced, so memory stays flat however long
+the history is. An export covers the rows after the `since` cursor up to the
+newest row stamped at least EXPORT_SETTLE_SECONDS ago; that upper bound is
+returned as the next cursor. The lag lets transactions that stamped a row
+just before the bound commit before it is read, so incremental pulls don't
+skip them.
+
+Sessions are cursored on end_time and XP on created_at (written once).
+Tasks and energy logs change in place, so they are cursored on updated_at
+and an edited row is exported again by the next pull. Deleted tasks are not
+reported; a full export is the only way to notice them.
+"""
+import csv
+import io
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional
+
+from sqlalchemy import and_, or_, select
+
+from models import EnergyLog, Session as SessionModel, UserTask, XPLog
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_BATCH_SIZE = 1000
+# Rows stamped more recently than this are left for the next pull
+EXPORT_SETTLE_SECONDS = float(os.getenv("EXPORT_SETTLE_SECONDS", "5"))
+
+
+@dataclass(frozen=True)
+class Dataset:
+    model: type
+    columns: tuple      # exported column names, in order
+    cursor: str         # timestamp column rows are exported by (ties broken by id)
+    ended_only: bool = False
+
+    def column(self, name: str):
+        return getattr(self.model, name)
+
+
+DATASETS = {
+    "sessions": Dataset(
+        SessionModel,
+        ("id", "task_id", "start_time", "end_time", "duration_minutes", "energy_level", "status", "local_date"),
+        cursor="end_time", ended_only=True,  # a session is exported once it has ended
+    ),
+    "xp": Dataset(
+        XPLog, ("id", "xp_awarded", "reason", "source_type", "source_id", "created_at", "local_date"),
+        cursor="created_at",
+    ),
+    "tasks": Dataset(
+        UserTask,
+        ("id", "title", "project", "project_id", "priority", "estimated_minutes", "status",
+         "order_index", "created_at", "completed_at", "completed_local_date", "updated_at"),
+        cursor="updated_at",
+    ),
+    "energy": Dataset(EnergyLog, ("id", "date", "level", "updated_at"), cursor="updated_at"),
+}
+
+
+# ── Cursors ───────────────────────────────────────────────────────────────────
+# "<cursor value>:<id>", e.g. "2026-03-01T09:30:00:1234"; the value is the
+# ISO timestamp of the dataset's cursor column.
+
+def _cursor_value(value) -> str:
+    return value.isoformat() if isinstance(value, (date, datetime)) else str(value)
+
+
+def format_cursor(value, row_id: int) -> str:
+    return f"{_cursor_value(value)}:{row_id}"
+
+
+def parse_cursor(dataset: Dataset, cursor: str) -> tuple:
+    """(cursor value, id) from a cursor string; raises ValueError when malformed."""
+    raw, _, row_id = cursor.rpartition(":")
+    python_type = dataset.column(dataset.cursor).type.python_type
+    if python_type is datetime:
+        value = datetime.fromisoformat(raw)
+    elif python_type is date:
+        value = date.fromisoformat(raw)
+    else:
+        value = python_type(raw)
+    return value, int(row_id)
+
+
+# ── Queries ───────────────────────────────────────────────────────────────────
+
+def _key(dataset: Dataset):
+    return dataset.column(dataset.cursor), dataset.model.id
+
+
+def _user_filter(dataset: Dataset, user_id: int) -> list:
+    """The user's exportable rows."""
+    filters = [dataset.model.user_id == user_id]
+    if dataset.ended_only:
+        filters.append(dataset.column(dataset.cursor).isnot(None))
+    return filters
+
+
+def _after(dataset: Dataset, position: tuple):
+    key, row_id = _key(dataset)
+    value, last_id = position
+    return or_(key > value, and_(key == value, row_id > last_id))
+
+
+def _up_to(dataset: Dataset, position: tuple):
+    key, row_id = _key(dataset)
+    value, last_id = position
+    return or_(key < value, and_(key == value, row_id <= last_id))
+
+
+def export_bound(db, dataset: Dataset, user_id: int, now: Optional[datetime] = None) -> Optional[tuple]:
+    """
+    (cursor value, id) of the user's newest row stamped at least
+    EXPORT_SETTLE_SECONDS before `now`, or None when there are none.
+    """
+    key, row_id = _key(dataset)
+    settled = (now or datetime.utcnow()) - timedelta(seconds=EXPORT_SETTLE_SECONDS)
+    return db.execute(
+        select(key, row_id)
+        .where(*_user_filter(dataset, user_id), key <= settled)
+        .order_by(key.desc(), row_id.desc())
+        .limit(1)
+    ).first()
+
+
+def stream_rows(db, dataset: Dataset, user_id: int, since: Optional[tuple], until: tuple) -> Iterator[list]:
+    """Batches of row tuples after `since` up to and including `until`, in cursor order."""
+    key, row_id = _key(dataset)
+    stmt = select(*(dataset.column(name) for name in dataset.columns)) \
+        .where(*_user_filter(dataset, user_id), _up_to(dataset, until)) \
+        .order_by(key, row_id)
+    if since is not None:
+        stmt = stmt.where(_after(dataset, since))
+    result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for batch in result.partitions():
+        yield batch
+
+
+# ── Serialization ─────────────────────────────────────────────────────────────
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def ndjson_chunks(columns: tuple, batches: Iterator[list]) -> Iterator[str]:
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, map(_json_value, row))), separators=(",", ":")) + "\n"
+            for row in batch
+        )
+
+
+def csv_chunks(columns: tuple, batches: Iterator[list]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows([_json_value(v) for v in row] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # header only: the export was empty
+        yield buffer.getvalue()
+
+
+SERIALIZERS = {"ndjson": ndjson_chunks, "csv": csv_chunks}
@@ -4,9 +4,10 @@ services/guidance_engine.py — Deterministic recommendation engine.
 Reads database state and applies rule-based decision trees to tell the
 user exactly what to do next. No LLM, no randomness — pure logic.
 """
-from datetime import datetime, timedelta, date
+from datetime import datetime
 from sqlalchemy.orm import Session as DBSession
-from models import User, Session as SessionModel, EnergyLog
+from models import User
+from services.user_context import get_user_context
 
 
 # ── Action constants ──────────────────────────────────────────────────────────
@@ -36,39 +37,18 @@ def get_recommendation(db: DBSession, user: User) -> dict:
 
 def _student_guidance(db: DBSession, user: User) -> dict:
     now = datetime.utcnow()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    # Sessions today (completed)
-    today_sessions = (
-        db.query(SessionModel)
-        .filter(
-            SessionModel.user_id == user.id,
-            SessionModel.start_time >= today_start,
-            SessionModel.end_time.isnot(None),
-        )
-        .order_by(SessionModel.end_time.desc())
-        .all()
-    )
+    snap = get_user_context(db, user)
 
     # Consistency: active days in last 7
-    all_completed = (
-        db.query(SessionModel)
-        .filter(
-            SessionModel.user_id == user.id,
-            SessionModel.end_time.isnot(None),
-        )
-        .all()
-    )
-    session_dates = {s.start_time.date() for s in all_completed}
-    last_7 = {(now - timedelta(days=i)).date() for i in range(7)}
-    active_days = len(session_dates & last_7)
-    consistency_pct = round(active_days / 7 * 100)
+    active_days = snap.active_days
+    consistency_pct = snap.consistency_pct
 
-    sessions_today = len(today_sessions)
-    last_session = today_sessions[0] if today_sessions else None
+    # Sessions today (completed)
+    sessions_today = snap.today.session_count
+    last_end = snap.last_end_time if sessions_today else None
     minutes_since_last = (
-        (now - last_session.end_time).total_seconds() / 60
-        if last_session
+        (now - last_end).total_seconds() / 60
+        if last_end
         else None
     )
 
@@ -122,36 +102,19 @@ def _student_guidance(db: DBSession, user: User) -> dict:
 # ── WORKER GUIDANCE ───────────────────────────────────────────────────────────
 
 def _worker_guidance(db: DBSession, user: User) -> dict:
-    now = datetime.utcnow()
-    today = date.today()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    snap = get_user_context(db, user)
 
     # Latest energy log for today
-    energy_log = (
-        db.query(EnergyLog)
-        .filter(EnergyLog.user_id == user.id, EnergyLog.date == today)
-        .first()
-    )
+    level = snap.energy_today
 
-    # Sessions in last 7 days — check for long work streaks
-    recent_sessions = (
-        db.query(SessionModel)
-        .filter(
-            SessionModel.user_id == user.id,
-            SessionModel.end_time.isnot(None),
-            SessionModel.start_time >= now - timedelta(days=7),
-        )
-        .all()
-    )
-    session_dates = {s.start_time.date() for s in recent_sessions}
-    consecutive_days = _count_consecutive_days(session_dates, today)
+    # Consecutive active days, maintained on the user row
+    consecutive_days = snap.current_streak
 
     # Sessions today
-    today_sessions = [s for s in recent_sessions if s.start_time >= today_start]
-    total_focus_today = sum(s.duration_minutes or 0 for s in today_sessions)
+    total_focus_today = snap.today.focus_minutes
 
     # ── No energy logged — first action is always to log it ──────────────────
-    if not energy_log:
+    if level is None:
         return {
             "action": Action.LOG_ENERGY,
             "message": "Start by logging your energy level. Your workload plan and focus blocks depend on your current capacity.",
@@ -159,8 +122,6 @@ def _worker_guidance(db: DBSession, user: User) -> dict:
             "context": {"energy_logged": False},
         }
 
-    level = energy_log.level
-
     # Long work streak — burnout prevention
     if consecutive_days >= 6:
         return {
@@ -204,15 +165,3 @@ def _worker_guidance(db: DBSession, user: User) -> dict:
         "priority": "high",
         "context": {"energy_level": level, "tier": "high"},
     }
-
-
-# ── Helpers ───────────────────────────────────────────────────────────────────
-
-def _count_consecutive_days(session_dates: set, reference: date) -> int:
-    """Count how many consecutive days up to and including reference have a session."""
-    count = 0
-    current = reference
-    while current in session_dates:
-        count += 1
-        current -= timedelta(days=1)
-    return count
@@ -0,0 +1,54 @@
+"""
+services/leaderboard_cache.py — Versioned leaderboard snapshots
+
+The board only changes when a match finishes (ELO and standings) or a worker
+registers. Those writes execute version_bump() in their own transaction,
+which increments the "leaderboard" row of cache_versions. Readers fetch that
+one row, answer If-None-Match with 304 when the client already has the
+version, and otherwise serve pages from a per-process cache keyed by version,
+so each page is built once per process per change.
+"""
+import os
+from datetime import datetime
+
+from sqlalchemy import select
+
+from database import upsert_insert
+from models import CacheVersion
+from services.ttl_cache import TTLCache
+
+LEADERBOARD = "leaderboard"
+
+LEADERBOARD_CACHE_SIZE = int(os.getenv("LEADERBOARD_CACHE_SIZE", "512"))
+LEADERBOARD_CACHE_TTL_SECONDS = float(os.getenv("LEADERBOARD_CACHE_TTL_SECONDS", "3600"))
+
+# Keys are (version, page parameters); a new version simply stops hitting old keys
+leaderboard_cache = TTLCache(LEADERBOARD_CACHE_SIZE, LEADERBOARD_CACHE_TTL_SECONDS)
+
+
+def version_bump(db, name: str = LEADERBOARD):
+    """INSERT … ON CONFLICT (name) DO UPDATE statement incrementing a snapshot version."""
+    stmt = upsert_insert(db, CacheVersion).values(name=name, version=1, updated_at=datetime.utcnow())
+    row = CacheVersion.__table__.c
+    return stmt.on_conflict_do_update(
+        index_elements=[row.name],
+        set_={"version": row.version + 1, "updated_at": stmt.excluded.updated_at},
+    )
+
+
+def current_version(db, name: str = LEADERBOARD) -> int:
+    return db.execute(select(CacheVersion.version).where(CacheVersion.name == name)).scalar() or 0
+
+
+def etag(version: int, user_id: int) -> str:
+    # Rows carry is_me, so the tag is per viewer as well as per version
+    return f'W/"lb-{version}-{user_id}"'
+
+
+def cached_page(version: int, key: tuple, build):
+    """Page for `key` at `version`, calling build() on a miss."""
+    cache_key = (version, *key)
+    page = leaderboard_cache.get(cache_key)
+    if page is None:
+        page = leaderboard_cache.put(cache_key, build())
+    return page
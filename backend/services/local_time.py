@@ -0,0 +1,55 @@
+"""
+services/local_time.py — Calendar days in each user's own timezone
+
+Timestamps are stored as naive UTC. Each user has an IANA timezone
+(users.timezone, default UTC); write paths stamp sessions, XP logs and
+completed tasks with the user's local date, and the daily rollups, streaks
+and every "today" are keyed by that date. Day-bucketed reads then filter on
+the indexed local_date columns instead of converting timestamps row by row.
+"""
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_TIMEZONE = "UTC"
+
+
+@lru_cache(maxsize=1024)
+def _zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+def is_valid_timezone(name: Optional[str]) -> bool:
+    if not name:
+        return False
+    try:
+        _zone(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+    return True
+
+
+def user_zone(user) -> ZoneInfo:
+    name = getattr(user, "timezone", None) or DEFAULT_TIMEZONE
+    return _zone(name) if is_valid_timezone(name) else _zone(DEFAULT_TIMEZONE)
+
+
+def local_date(user, moment: datetime) -> date:
+    """The user's calendar date at a naive-UTC moment."""
+    return moment.replace(tzinfo=timezone.utc).astimezone(user_zone(user)).date()
+
+
+def local_today(user) -> date:
+    return local_date(user, datetime.utcnow())
+
+
+def day_start_utc(user, day: date) -> datetime:
+    """Naive-UTC moment at which the user's local `day` begins."""
+    local_midnight = datetime.combine(day, datetime.min.time(), tzinfo=user_zone(user))
+    return local_midnight.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def day_bounds_utc(user, day: date) -> tuple[datetime, datetime]:
+    """[start, end) of the user's local `day` as naive-UTC datetimes."""
+    return day_start_utc(user, day), day_start_utc(user, day + timedelta(days=1))
@@ -0,0 +1,148 @@
+"""
+services/pause_buffer.py — Focus Arena pause counters
+
+Every blur in a match bumps the caller's pause counter. pause_update() does
+that in one statement (UPDATE … SET x = x + 1 WHERE status = 'active'
+RETURNING both counters), so concurrent increments are never lost.
+
+When ARENA_PAUSE_FLUSH_MS is set, pauses are instead added to a per-process
+buffer and written every that many milliseconds, one UPDATE per challenge
+for all the pauses it collected, so a storm of blur events costs one write
+instead of one transaction each. complete_challenge() takes a challenge's
+buffered pauses once it has claimed the match and writes them in the
+scoring transaction, putting them back if that transaction fails. With
+several worker processes, pauses buffered by a process other than the one
+that scores the match within the last interval arrive after it has
+finished and are dropped, which is why buffering is off by default.
+"""
+import asyncio
+import os
+import threading
+
+from sqlalchemy import bindparam, case, or_, update
+
+from models import Challenge
+
+# 0 writes each pause immediately
+ARENA_PAUSE_FLUSH_MS = int(os.getenv("ARENA_PAUSE_FLUSH_MS", "0"))
+
+_challenges = Challenge.__table__
+
+# Adds buffered counts: {"challenge": id, "challenger": n, "opponent": n} per row (executemany)
+_add_stmt = (
+    update(_challenges)
+    .where(_challenges.c.id == bindparam("challenge"))
+    .values(
+        challenger_pauses=_challenges.c.challenger_pauses + bindparam("challenger"),
+        opponent_pauses=_challenges.c.opponent_pauses + bindparam("opponent"),
+    )
+)
+# The flusher only counts pauses while the match is still on
+_flush_stmt = _add_stmt.where(_challenges.c.status == "active")
+
+_pending: dict[int, list[int]] = {}  # challenge_id → [challenger pauses, opponent pauses]
+_lock = threading.Lock()             # complete_challenge takes from the threadpool
+_flusher = None
+
+
+def pause_update(challenge_id: int, user_id: int, count: int = 1):
+    """
+    UPDATE adding `count` to the caller's counter of an active challenge they
+    play in, RETURNING (challenger_pauses, opponent_pauses); no row otherwise.
+    """
+    c = Challenge
+    return (
+        update(c)
+        .where(c.id == challenge_id, c.status == "active", or_(c.challenger_id == user_id, c.opponent_id == user_id))
+        .values(
+            challenger_pauses=c.challenger_pauses + case((c.challenger_id == user_id, count), else_=0),
+            opponent_pauses=c.opponent_pauses + case((c.opponent_id == user_id, count), else_=0),
+        )
+        .returning(c.challenger_pauses, c.opponent_pauses)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# ── Buffer ────────────────────────────────────────────────────────────────────
+
+def buffer_pause(challenge_id: int, is_challenger: bool) -> tuple[int, int]:
+    """Queue one pause; returns the challenge's (challenger, opponent) pauses not yet written."""
+    with _lock:
+        counts = _pending.setdefault(challenge_id, [0, 0])
+        counts[0 if is_challenger else 1] += 1
+        pending = tuple(counts)
+    _ensure_flusher()
+    return pending
+
+
+def take_pauses(challenge_id: int) -> tuple[int, int]:
+    """Remove and return a challenge's buffered (challenger, opponent) pauses."""
+    with _lock:
+        return tuple(_pending.pop(challenge_id, (0, 0)))
+
+
+def apply_pauses(db, challenge_id: int, pauses: tuple[int, int]) -> None:
+    """
+    Write pauses taken with take_pauses() in the caller's (sync) transaction,
+    whatever the challenge's status: complete_challenge calls this after
+    claiming the match. On failure the caller hands them to requeue_pauses().
+    """
+    challenger, opponent = pauses
+    if challenger or opponent:
+        db.execute(_add_stmt, [{"challenge": challenge_id, "challenger": challenger, "opponent": opponent}])
+
+
+def requeue_pauses(pending: dict[int, tuple[int, int]]) -> None:
+    """Put taken pauses back in the buffer, e.g. when the transaction writing them failed."""
+    with _lock:
+        for challenge_id, (challenger, opponent) in pending.items():
+            counts = _pending.setdefault(challenge_id, [0, 0])
+            counts[0] += challenger
+            counts[1] += opponent
+
+
+async def flush_pauses() -> int:
+    """Write everything buffered in one transaction. Returns challenges updated."""
+    from database import AsyncSessionLocal
+
+    global _pending
+    with _lock:
+        pending, _pending = _pending, {}
+    if not pending:
+        return 0
+    rows = [
+        {"challenge": challenge_id, "challenger": challenger, "opponent": opponent}
+        for challenge_id, (challenger, opponent) in pending.items()
+    ]
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(_flush_stmt, rows)
+            await db.commit()
+    except Exception:
+        requeue_pauses(pending)  # retried on the next tick
+        raise
+    return len(rows)
+
+
+async def _flush_loop():
+    while True:
+        await asyncio.sleep(ARENA_PAUSE_FLUSH_MS / 1000)
+        try:
+            await flush_pauses()
+        except Exception as exc:
+            print(f"[arena] pause flush failed, will retry: {exc}")
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is None or _flusher.done():
+        _flusher = asyncio.get_running_loop().create_task(_flush_loop())
+
+
+async def stop_pause_flusher():
+    """Cancel the flush loop and write what is left (server shutdown)."""
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        _flusher = None
+    await flush_pauses()
@@ -8,7 +8,8 @@ No conversation required — the system infers intent from DB state.
 """
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session as DBSession
-from models import User, Session as SessionModel, Reflection
+from models import User
+from services.user_context import get_user_context
 
 
 # Focus topic fallbacks — used when no reflection text is available
@@ -19,14 +20,12 @@ TOPIC_FALLBACKS = [
 ]
 
 
-def _extract_focus(reflection) -> str:
+def _extract_focus(reflection_text: str | None) -> str:
     """
     Pull a short focus label from reflection text.
     If the text is short enough, use it directly; otherwise, summarise.
     """
-    if reflection is None:
-        return TOPIC_FALLBACKS[0]
-    text = (reflection.text or "").strip()
+    text = (reflection_text or "").strip()
     if not text:
         return TOPIC_FALLBACKS[0]
     # First sentence or first 60 chars is a good focus label
@@ -94,15 +93,7 @@ def generate_resume(db: DBSession, user: User) -> dict | None:
     Returns a resume recommendation dict, or None if there is nothing to resume.
     """
     # Get the most recently completed session for this user
-    last_session = (
-        db.query(SessionModel)
-        .filter(
-            SessionModel.user_id == user.id,
-            SessionModel.end_time.isnot(None),
-        )
-        .order_by(SessionModel.end_time.desc())
-        .first()
-    )
+    last_session = get_user_context(db, user).last_session
 
     if last_session is None:
         return None  # No history — nothing to resume
@@ -112,8 +103,7 @@ def generate_resume(db: DBSession, user: User) -> dict | None:
     duration = last_session.duration_minutes or 25
 
     # Reflection gives us the topic; fall back gracefully if absent
-    reflection = last_session.reflection  # via ORM relationship (uselist=False)
-    focus = _extract_focus(reflection)
+    focus = _extract_focus(last_session.reflection_text)
 
     recommendation = _gap_message(gap_hours, duration, focus)
     recommendation["last_session_time"] = last_session.end_time.isoformat()
@@ -0,0 +1,148 @@
+"""
+services/session_metrics.py — Vectorized session statistics
+
+load_session_columns() fetches a user's ended sessions as NumPy arrays in one
+query (no ORM objects); the functions below compute histograms with arbitrary
+bin edges, percentiles, rolling daily means and energy/output correlation
+over those arrays. The fixed dashboards keep their SQL aggregates; this backs
+GET /analytics/distribution, where the shape of the answer is chosen per
+request.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import chain
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlalchemy import Integer, cast, func, select
+
+from database import dialect_name
+from models import Session as SessionModel
+
+DEFAULT_BINS = (25, 60)  # same edges as the <25 / 25–60 / ≥60 dashboard buckets
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+
+
+@dataclass(frozen=True)
+class SessionColumns:
+    start_time: np.ndarray    # datetime64[s]
+    end_time: np.ndarray      # datetime64[s]
+    duration: np.ndarray      # float64 minutes, NULL → 0
+    energy_level: np.ndarray  # float64, NULL → nan
+    task_id: np.ndarray       # int64, NULL → -1
+    local_date: np.ndarray    # datetime64[D], the user's calendar day at end_time
+
+    def __len__(self) -> int:
+        return len(self.duration)
+
+    def ended_since(self, day: date) -> "SessionColumns":
+        keep = self.local_date >= np.datetime64(day, "D")
+        return SessionColumns(*(getattr(self, f)[keep] for f in self.__dataclass_fields__))
+
+
+def _epoch(column, dialect: str):
+    # Seconds since 1970 computed by the database, so rows arrive as plain numbers
+    if dialect == "sqlite":
+        return cast(func.strftime("%s", column), Integer)
+    return cast(func.extract("epoch", column), Integer)
+
+
+def load_session_columns(db, user_id: int, since: Optional[date] = None) -> SessionColumns:
+    """
+    Ended sessions for user_id (optionally from local day `since` on) as column
+    arrays. Every column is selected as a number and the rows go straight from
+    the cursor into one float64 matrix, skipping per-row datetime parsing and
+    ORM result processing.
+    """
+    dialect = dialect_name(db)
+    stmt = select(
+        _epoch(SessionModel.start_time, dialect),
+        _epoch(SessionModel.end_time, dialect),
+        func.coalesce(SessionModel.duration_minutes, 0.0),
+        func.coalesce(SessionModel.energy_level, -1),
+        func.coalesce(SessionModel.task_id, -1),
+        _epoch(SessionModel.local_date, dialect),
+    ).where(SessionModel.user_id == user_id, SessionModel.end_time.isnot(None))
+    if since is not None:
+        stmt = stmt.where(SessionModel.local_date >= since)
+
+    rows = db.connection().execute(stmt).fetchall()
+    matrix = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=len(rows) * 6).reshape(-1, 6)
+    energy = matrix[:, 3]
+    return SessionColumns(
+        start_time=matrix[:, 0].astype("datetime64[s]"),
+        end_time=matrix[:, 1].astype("datetime64[s]"),
+        duration=matrix[:, 2],
+        energy_level=np.where(energy < 0, np.nan, energy),
+        task_id=matrix[:, 4].astype(np.int64),
+        local_date=matrix[:, 5].astype("datetime64[s]").astype("datetime64[D]"),
+    )
+
+
+def duration_histogram(cols: SessionColumns, edges: Sequence[float] = DEFAULT_BINS) -> list[dict]:
+    """
+    Session counts per duration bin. `edges` are ascending minute thresholds;
+    n edges give n + 1 bins: [0, e1), [e1, e2), …, [en, ∞).
+    """
+    edges = np.asarray(edges, dtype=np.float64)
+    counts = np.bincount(np.searchsorted(edges, cols.duration, side="right"), minlength=len(edges) + 1)
+    lower = np.concatenate(([0.0], edges))
+    upper = np.concatenate((edges, [np.inf]))
+    return [
+        {"min_minutes": float(lo), "max_minutes": None if np.isinf(hi) else float(hi), "sessions": int(n)}
+        for lo, hi, n in zip(lower, upper, counts)
+    ]
+
+
+def duration_percentiles(cols: SessionColumns, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> dict:
+    if not len(cols):
+        return {f"p{p:g}": None for p in percentiles}
+    values = np.percentile(cols.duration, percentiles)
+    return {f"p{p:g}": round(float(v), 1) for p, v in zip(percentiles, values)}
+
+
+def rolling_focus(cols: SessionColumns, start: date, end: date, window: int = 7) -> list[dict]:
+    """
+    Focus minutes per local day for start..end, with the trailing
+    `window`-day mean. Days before `start` feed the first means when loaded.
+    """
+    days = (end - start).days + 1
+    origin = np.datetime64(start - timedelta(days=window - 1), "D")
+    offset = (cols.local_date - origin).astype(np.int64)
+    keep = (offset >= 0) & (offset < days + window - 1)
+    daily = np.bincount(offset[keep], weights=cols.duration[keep], minlength=days + window - 1)
+    means = np.convolve(daily, np.ones(window) / window, mode="valid")
+    return [
+        {
+            "date":         (start + timedelta(days=i)).isoformat(),
+            "minutes":      round(float(daily[i + window - 1]), 1),
+            "rolling_mean": round(float(means[i]), 1),
+        }
+        for i in range(days)
+    ]
+
+
+def energy_output(cols: SessionColumns) -> dict:
+    """Per-energy-level output and the Pearson correlation of energy with session length."""
+    rated = ~np.isnan(cols.energy_level)
+    energy = cols.energy_level[rated].astype(np.int64)
+    duration = cols.duration[rated]
+
+    levels = []
+    if len(energy):
+        order = np.argsort(-energy, kind="stable")
+        energy, duration, linked = energy[order], duration[order], cols.task_id[rated][order] >= 0
+        values, first = np.unique(-energy, return_index=True)
+        for level, chunk, tasks in zip(-values, np.split(duration, first[1:]), np.split(linked, first[1:])):
+            levels.append({
+                "energy_level":   int(level),
+                "session_count":  len(chunk),
+                "avg_minutes":    round(float(chunk.mean()), 1),
+                "median_minutes": round(float(np.median(chunk)), 1),
+                "task_share":     round(float(tasks.mean()), 2),
+            })
+
+    correlation = None
+    if len(energy) > 1 and energy.std() > 0 and duration.std() > 0:
+        correlation = round(float(np.corrcoef(energy, duration)[0, 1]), 3)
+    return {"levels": levels, "correlation": correlation}
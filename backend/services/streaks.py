@@ -0,0 +1,108 @@
+"""
+services/streaks.py — Day streaks and 7-day consistency stored on the user
+
+end_session calls record_active_day() on the user it already holds for
+update, so current_streak, longest_streak, last_active_date and the 7-bit
+activity bitmap (bit 0 = last_active_date, bit i = i days earlier) are always
+current. Readers shift the bitmap to today instead of scanning sessions;
+every read below is constant time on a User or UserSnapshot.
+rebuild_streaks() recomputes the columns from the daily rollups
+(migration backfill and `python jobs.py repair-streaks`).
+"""
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import bindparam, select, update
+
+from database import touch_user
+from models import User, UserDailyStats
+from services.user_cache import invalidate_user
+
+WINDOW_DAYS = 7
+_MASK = (1 << WINDOW_DAYS) - 1
+
+
+def _advance(streak: int, longest: int, last: Optional[date], bitmap: int, day: date) -> tuple:
+    """(current_streak, longest_streak, last_active_date, activity_bitmap) after activity on `day`."""
+    if last is None:
+        return 1, max(longest, 1), day, 1
+    gap = (day - last).days
+    if gap < 0:
+        # Activity dated before the latest active day: mark it, the streak can't be re-derived here
+        return streak, longest, last, bitmap | ((1 << -gap) & _MASK)
+    if gap == 0:
+        return streak, longest, last, bitmap | 1
+    streak = streak + 1 if gap == 1 else 1
+    return streak, max(longest, streak), day, ((bitmap << gap) | 1) & _MASK
+
+
+def record_active_day(user: User, day: date):
+    """Count `day` as active for an ORM User (loaded for update); flushed with the caller's commit."""
+    user.current_streak, user.longest_streak, user.last_active_date, user.activity_bitmap = _advance(
+        user.current_streak or 0, user.longest_streak or 0, user.last_active_date, user.activity_bitmap or 0, day,
+    )
+
+
+# ── Reads ────────────────────────────────────────────────────────────────────
+
+def activity_bits(user, today: date) -> int:
+    """The last WINDOW_DAYS days ending today as a bitmap, bit 0 = today."""
+    if user.last_active_date is None:
+        return 0
+    shift = max((today - user.last_active_date).days, 0)
+    return ((user.activity_bitmap or 0) << shift) & _MASK if shift < WINDOW_DAYS else 0
+
+
+def active_days(user, today: date) -> int:
+    return bin(activity_bits(user, today)).count("1")
+
+
+def consistency_pct(user, today: date) -> int:
+    return round(active_days(user, today) / WINDOW_DAYS * 100)
+
+
+def current_streak(user, today: date) -> int:
+    """Consecutive active days ending today, or yesterday while today is still open."""
+    if user.last_active_date is None or (today - user.last_active_date).days > 1:
+        return 0
+    return user.current_streak or 0
+
+
+# ── Repair ───────────────────────────────────────────────────────────────────
+
+def rebuild_streaks(db, user_id: Optional[int] = None) -> int:
+    """
+    Recompute the streak columns from user_daily_stats days with a session,
+    for one user or everyone (users without activity are reset). Runs in the
+    caller's transaction; returns users written.
+    """
+    stmt = select(UserDailyStats.user_id, UserDailyStats.date) \
+        .where(UserDailyStats.session_count > 0) \
+        .order_by(UserDailyStats.user_id, UserDailyStats.date)
+    users = select(User.id)
+    if user_id is not None:
+        stmt = stmt.where(UserDailyStats.user_id == user_id)
+        users = users.where(User.id == user_id)
+
+    state = {uid: (0, 0, None, 0) for uid in db.execute(users).scalars()}
+    for uid, day in db.execute(stmt):
+        if uid in state:
+            day = date.fromisoformat(day) if isinstance(day, str) else day
+            state[uid] = _advance(*state[uid], day)
+
+    users_table = User.__table__
+    stmt = update(users_table).where(users_table.c.id == bindparam("uid")).values(
+        current_streak=bindparam("streak"),
+        longest_streak=bindparam("longest"),
+        last_active_date=bindparam("last"),
+        activity_bitmap=bindparam("bits"),
+    )
+    rows = [
+        {"uid": uid, "streak": streak, "longest": longest, "last": last, "bits": bits}
+        for uid, (streak, longest, last, bits) in state.items()
+    ]
+    for i in range(0, len(rows), 1000):
+        db.execute(stmt, rows[i:i + 1000])
+    invalidate_user(db, *state)
+    touch_user(db, *state)
+    return len(rows)
@@ -0,0 +1,252 @@
+"""
+services/team_stats.py — Precomputed team dashboards
+
+compute_team_stats() aggregates a team's sessions, completed tasks and arena
+ratings over a trailing window in a few GROUP BY / window-function queries
+(per-member rank, share and quartile, session-length buckets, top projects,
+ELO quartiles). refresh_team_stats() stores the result in team_stats, one row
+per team and window; `python jobs.py refresh-team-stats` runs it on a
+schedule, so GET /teams/{id}/analytics reads one row instead of raw history.
+"""
+import json
+import math
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import case, func, literal, select
+
+from database import upsert_insert
+from models import Challenge, MatchResult, Project, Session as SessionModel, Team, TeamStats, User, UserTask
+
+WINDOWS = (7, 30)
+TOP_PROJECTS = 5
+DURATION_BUCKETS = ((0, 25, "under_25m"), (25, 60, "25_60m"), (60, None, "over_60m"))
+
+_duration = func.coalesce(SessionModel.duration_minutes, 0)
+
+
+def _team_sessions(team_id: int, since):
+    """Filters selecting the team's ended sessions on or after local day `since`."""
+    return (
+        SessionModel.user_id == User.id,
+        User.team_id == team_id,
+        SessionModel.local_date >= since,
+        SessionModel.end_time.isnot(None),
+    )
+
+
+def _members(db, team_id: int, since) -> list[dict]:
+    focus = (
+        select(
+            SessionModel.user_id,
+            func.sum(_duration).label("focus_minutes"),
+            func.count().label("sessions"),
+        )
+        .where(*_team_sessions(team_id, since))
+        .group_by(SessionModel.user_id)
+        .subquery()
+    )
+    done = (
+        select(UserTask.user_id, func.count().label("tasks_completed"))
+        .join(User, User.id == UserTask.user_id)
+        .where(User.team_id == team_id, UserTask.completed_local_date >= since)
+        .group_by(UserTask.user_id)
+        .subquery()
+    )
+    minutes = func.coalesce(focus.c.focus_minutes, 0)
+    rows = db.execute(
+        select(
+            User.id,
+            User.name,
+            User.role,
+            User.elo_rating,
+            minutes.label("focus_minutes"),
+            func.coalesce(focus.c.sessions, 0).label("sessions"),
+            func.coalesce(done.c.tasks_completed, 0).label("tasks_completed"),
+            func.rank().over(order_by=minutes.desc()).label("focus_rank"),
+            (minutes * 100.0 / func.nullif(func.sum(minutes).over(), 0)).label("focus_share_pct"),
+            func.ntile(4).over(order_by=minutes).label("focus_quartile"),
+        )
+        .outerjoin(focus, focus.c.user_id == User.id)
+        .outerjoin(done, done.c.user_id == User.id)
+        .where(User.team_id == team_id)
+        .order_by(minutes.desc(), User.id)
+    )
+    return [
+        {
+            "user_id":         row.id,
+            "name":            row.name,
+            "role":            row.role,
+            "elo_rating":      row.elo_rating,
+            "focus_minutes":   round(row.focus_minutes, 1),
+            "sessions":        row.sessions,
+            "tasks_completed": row.tasks_completed,
+            "focus_rank":      row.focus_rank,
+            "focus_share_pct": round(row.focus_share_pct or 0, 1),
+            "focus_quartile":  row.focus_quartile,
+        }
+        for row in rows
+    ]
+
+
+def _distribution(db, team_id: int, since) -> dict:
+    bucket = case(
+        *((_duration < upper, label) for _, upper, label in DURATION_BUCKETS if upper is not None),
+        else_=DURATION_BUCKETS[-1][2],
+    )
+    counts = dict(
+        db.execute(
+            select(bucket, func.count()).select_from(SessionModel)
+            .where(*_team_sessions(team_id, since)).group_by(bucket)
+        ).all()
+    )
+    return {label: counts.get(label, 0) for _, _, label in DURATION_BUCKETS}
+
+
+def _top_projects(db, team_id: int, since) -> list[dict]:
+    project = func.coalesce(Project.name, UserTask.project, literal("(unassigned)"))
+    minutes = func.sum(_duration)
+    rows = db.execute(
+        select(
+            project.label("project"),
+            minutes.label("focus_minutes"),
+            func.count().label("sessions"),
+            func.count(func.distinct(SessionModel.user_id)).label("members"),
+            func.rank().over(order_by=minutes.desc()).label("rank"),
+        )
+        .select_from(SessionModel)
+        .join(UserTask, UserTask.id == SessionModel.task_id)
+        .outerjoin(Project, Project.id == UserTask.project_id)
+        .where(*_team_sessions(team_id, since))
+        .group_by(project)
+        .order_by(minutes.desc(), project)
+        .limit(TOP_PROJECTS)
+    )
+    return [
+        {
+            "rank":          row.rank,
+            "project":       row.project,
+            "focus_minutes": round(row.focus_minutes, 1),
+            "sessions":      row.sessions,
+            "members":       row.members,
+        }
+        for row in rows
+    ]
+
+
+def _elo_spread(db, team_id: int, since_time: datetime) -> dict:
+    workers = (User.team_id == team_id, User.role == "worker")
+    count, low, high, mean, mean_sq = db.execute(
+        select(
+            func.count(), func.min(User.elo_rating), func.max(User.elo_rating),
+            func.avg(User.elo_rating), func.avg(User.elo_rating * User.elo_rating),
+        ).where(*workers)
+    ).one()
+    if not count:
+        return {"workers": 0}
+
+    ranked = select(
+        User.elo_rating, func.ntile(4).over(order_by=User.elo_rating).label("quartile"),
+    ).where(*workers).subquery()
+    quartiles = [
+        top for _, top in db.execute(
+            select(ranked.c.quartile, func.max(ranked.c.elo_rating))
+            .group_by(ranked.c.quartile).order_by(ranked.c.quartile)
+        )
+    ]
+
+    members = select(User.id).where(User.team_id == team_id)
+    matches, wins = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((MatchResult.winner_id.in_(members), 1), else_=0)), 0),
+        )
+        .select_from(MatchResult)
+        .join(Challenge, Challenge.id == MatchResult.challenge_id)
+        .where(
+            MatchResult.created_at >= since_time,
+            Challenge.challenger_id.in_(members) | Challenge.opponent_id.in_(members),
+        )
+    ).one()
+
+    return {
+        "workers":   count,
+        "min":       low,
+        "max":       high,
+        "range":     high - low,
+        "mean":      round(mean, 1),
+        "stddev":    round(math.sqrt(max(mean_sq - mean * mean, 0)), 1),
+        "quartiles": quartiles,  # highest rating in each quarter, low → high
+        "matches":   matches,
+        "wins":      wins,
+    }
+
+
+def compute_team_stats(db, team_id: int, window_days: int, now: Optional[datetime] = None) -> dict:
+    """Team dashboard over the last `window_days` days (local days for sessions and tasks)."""
+    now = now or datetime.utcnow()
+    since_time = now - timedelta(days=window_days)
+    since = (now - timedelta(days=window_days - 1)).date()
+
+    members = _members(db, team_id, since)
+    return {
+        "window_days":         window_days,
+        "since":               since.isoformat(),
+        "member_count":        len(members),
+        "total_focus_minutes": round(sum(m["focus_minutes"] for m in members), 1),
+        "session_count":       sum(m["sessions"] for m in members),
+        "tasks_completed":     sum(m["tasks_completed"] for m in members),
+        "members":             members,
+        "session_distribution": _distribution(db, team_id, since),
+        "top_projects":        _top_projects(db, team_id, since),
+        "elo":                 _elo_spread(db, team_id, since_time),
+    }
+
+
+def team_stats_upsert(db, team_id: int, stats: dict, computed_at: datetime):
+    """INSERT … ON CONFLICT (team_id, window_days) DO UPDATE statement storing one computed window."""
+    stmt = upsert_insert(db, TeamStats).values(
+        team_id=team_id,
+        window_days=stats["window_days"],
+        member_count=stats["member_count"],
+        total_focus_minutes=stats["total_focus_minutes"],
+        session_count=stats["session_count"],
+        payload=json.dumps(stats, separators=(",", ":")),
+        computed_at=computed_at,
+    )
+    row, new = TeamStats.__table__.c, stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[row.team_id, row.window_days],
+        set_={
+            "member_count":        new.member_count,
+            "total_focus_minutes": new.total_focus_minutes,
+            "session_count":       new.session_count,
+            "payload":             new.payload,
+            "computed_at":         new.computed_at,
+        },
+    )
+
+
+def refresh_team_stats(db, team_id: Optional[int] = None) -> int:
+    """Recompute every window for one team or all teams in the caller's transaction. Returns rows written."""
+    teams = select(Team.id)
+    if team_id is not None:
+        teams = teams.where(Team.id == team_id)
+    now = datetime.utcnow()
+    written = 0
+    for (tid,) in db.execute(teams).all():
+        for window_days in WINDOWS:
+            db.execute(team_stats_upsert(db, tid, compute_team_stats(db, tid, window_days, now), now))
+            written += 1
+    return written
+
+
+def load_team_stats(db, team_id: int, window_days: int) -> Optional[dict]:
+    """The stored dashboard for one window, with computed_at, or None before the first refresh."""
+    row = db.execute(
+        select(TeamStats.payload, TeamStats.computed_at)
+        .where(TeamStats.team_id == team_id, TeamStats.window_days == window_days)
+    ).first()
+    if row is None:
+        return None
+    return {**json.loads(row.payload), "computed_at": row.computed_at.isoformat()}
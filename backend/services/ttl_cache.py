@@ -0,0 +1,67 @@
+"""
+services/ttl_cache.py — Bounded per-process LRU cache with a TTL.
+
+Entries older than `ttl` seconds read as misses; past `maxsize` the least
+recently used entry is evicted. Safe to share between request threads.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        """Cache value under key. Returns value."""
+        with self._lock:
+            self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        # Caller holds the lock
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size":          len(self._entries),
+                "maxsize":       self.maxsize,
+                "ttl_s":         self.ttl,
+                "hits":          self.hits,
+                "misses":        self.misses,
+                "hit_rate":      round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
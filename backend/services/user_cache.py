@@ -0,0 +1,120 @@
+"""
+services/user_cache.py — Per-process cache of authenticated-user snapshots.
+
+get_current_user runs on every authenticated request; caching an immutable
+snapshot of the user row removes its SELECT from most of them. Entries expire
+after USER_CACHE_TTL_SECONDS (which also bounds staleness across worker
+processes) and are dropped as soon as a commit changes the users row.
+"""
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from itertools import chain
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from services.ttl_cache import TTLCache
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Read-only copy of a users row. Routes that modify the user load the ORM instance instead."""
+    id: int
+    name: str
+    email: str
+    role: str
+    xp: int
+    elo_rating: int
+    rank_points: int
+    created_at: Optional[datetime]
+    last_active_task_id: Optional[int]
+    current_streak: Optional[int]
+    longest_streak: Optional[int]
+    last_active_date: Optional[date]
+    activity_bitmap: Optional[int]
+    timezone: Optional[str]
+    team_id: Optional[int]
+
+    @classmethod
+    def from_orm(cls, user) -> "UserSnapshot":
+        return cls(**{f.name: getattr(user, f.name) for f in fields(cls)})
+
+
+class UserCache(TTLCache):
+    """
+    TTLCache keyed by user id. Every invalidation is stamped from a counter and
+    put() only stores a value whose load started after the user's last stamp,
+    so a slow reader can't re-cache a value invalidated while it was loading.
+    Stamps are kept for the `maxsize` most recently invalidated users; older
+    ones fold into a floor that any forgotten user is assumed to be stamped at.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize, ttl)
+        self._clock = 0
+        self._stamps: "OrderedDict[int, int]" = OrderedDict()  # user id → last invalidation, oldest first
+        self._floor = 0
+
+    def generation(self, user_id: int) -> int:
+        """Read before loading the user; pass to put()."""
+        with self._lock:
+            return self._clock
+
+    def put(self, user_id: int, value, generation: int):
+        """Cache value unless user_id was invalidated since `generation` was read. Returns value."""
+        with self._lock:
+            if self._stamps.get(user_id, self._floor) <= generation:
+                self._store(user_id, value)
+        return value
+
+    def invalidate(self, user_ids):
+        with self._lock:
+            for uid in user_ids:
+                self._entries.pop(uid, None)
+                self._clock += 1
+                self._stamps[uid] = self._clock
+                self._stamps.move_to_end(uid)
+                self.invalidations += 1
+            while len(self._stamps) > self.maxsize:
+                _, self._floor = self._stamps.popitem(last=False)
+
+
+user_cache = UserCache(USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(db, *user_ids: int):
+    """
+    Drop cached snapshots once db's next commit lands.
+    Needed only for bulk UPDATE statements on users; ORM changes are picked up automatically.
+    """
+    db.info.setdefault("user_rows_changed", set()).update(user_ids)
+
+
+# ── Invalidation on commit ────────────────────────────────────────────────────
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = {
+        obj.id for obj in chain(session.new, session.dirty, session.deleted)
+        if getattr(obj, "__tablename__", None) == "users" and obj.id is not None
+    }
+    if changed:
+        session.info.setdefault("user_rows_changed", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    changed = session.info.pop("user_rows_changed", None)
+    if changed:
+        user_cache.invalidate(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("user_rows_changed", None)
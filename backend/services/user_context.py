@@ -0,0 +1,233 @@
+"""
+services/user_context.py — Shared per-user activity snapshot
+
+Chat, coach, guidance and resume all reason over the same picture of a user's
+recent activity. get_user_context() builds it in a fixed number of queries
+(rollups, session totals, recent sessions, energy, tasks, projects, arena) and
+caches it per user for CONTEXT_CACHE_TTL_SECONDS. Any commit that writes one of
+the user's rows drops the cached copy.
+"""
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session as DBSession
+
+from database import on_user_write
+from models import (
+    Challenge, EnergyLog, MatchResult, Project, Reflection,
+    Session as SessionModel, UserTask,
+)
+from services import streaks
+from services.daily_stats import load_daily_stats
+from services.local_time import day_start_utc, local_today
+from services.user_cache import UserCache
+
+CONTEXT_CACHE_SIZE = int(os.getenv("CONTEXT_CACHE_SIZE", "5000"))
+CONTEXT_CACHE_TTL_SECONDS = float(os.getenv("CONTEXT_CACHE_TTL_SECONDS", "60"))
+
+# Keyed by user id and dropped with the users row, so it needs UserCache's generation check
+context_cache = UserCache(CONTEXT_CACHE_SIZE, CONTEXT_CACHE_TTL_SECONDS)
+on_user_write(context_cache.invalidate)
+
+
+@dataclass(frozen=True)
+class DayStats:
+    date: date
+    focus_minutes: float
+    session_count: int
+    xp_earned: int
+
+
+@dataclass(frozen=True)
+class SessionSummary:
+    id: int
+    start_time: datetime
+    end_time: datetime
+    duration_minutes: Optional[float]
+    reflection_text: Optional[str]
+
+    @property
+    def focus(self) -> Optional[str]:
+        """First sentence of the reflection, capped at 60 chars."""
+        text = (self.reflection_text or "").strip()
+        return text.split(".")[0][:60] if text else None
+
+
+@dataclass(frozen=True)
+class TaskSummary:
+    id: int
+    title: str
+    priority: str
+    estimated_minutes: int
+    status: str
+
+
+@dataclass(frozen=True)
+class UserContextSnapshot:
+    user_id: int
+    day: date                                   # user's local day the snapshot was built on
+    days: tuple[DayStats, ...]                  # last 7 local days, oldest first, zero-filled
+    total_sessions: int                         # all ended sessions
+    total_focus_minutes: float
+    last_end_time: Optional[datetime]
+    recent_sessions: tuple[SessionSummary, ...] # ended since yesterday (or the latest one), newest first
+    energy_levels: tuple[tuple[date, int], ...] # last 7 logged days, oldest first
+    open_tasks: tuple[TaskSummary, ...]         # pending + active, in board order
+    recent_tasks: tuple[TaskSummary, ...]       # 10 newest by creation
+    completed_tasks_count: int
+    project_names: tuple[str, ...]
+    active_days: int = 0                        # of the last 7, from the user's activity bitmap
+    current_streak: int = 0
+    longest_streak: int = 0
+    challenges_won: int = 0                     # workers only
+    total_challenges: int = 0
+
+    @property
+    def today(self) -> DayStats:
+        return self.days[-1]
+
+    @property
+    def week_focus_minutes(self) -> float:
+        return sum(d.focus_minutes for d in self.days)
+
+    @property
+    def week_session_count(self) -> int:
+        return sum(d.session_count for d in self.days)
+
+    @property
+    def xp_week(self) -> int:
+        return sum(d.xp_earned for d in self.days)
+
+    @property
+    def consistency_pct(self) -> int:
+        return round(self.active_days / streaks.WINDOW_DAYS * 100)
+
+    @property
+    def avg_session_minutes(self) -> float:
+        return self.total_focus_minutes / self.total_sessions if self.total_sessions else 0
+
+    @property
+    def last_session(self) -> Optional[SessionSummary]:
+        return self.recent_sessions[0] if self.recent_sessions else None
+
+    @property
+    def energy_today(self) -> Optional[int]:
+        return dict(self.energy_levels).get(self.day)
+
+
+def get_user_context(db: DBSession, user) -> UserContextSnapshot:
+    """Cached snapshot for user (ORM User or UserSnapshot), rebuilt on a miss or a new local day."""
+    snapshot = context_cache.get(user.id)
+    if snapshot is not None and snapshot.day == local_today(user):
+        return snapshot
+
+    generation = context_cache.generation(user.id)
+    return context_cache.put(user.id, _load(db, user), generation)
+
+
+def _load(db: DBSession, user) -> UserContextSnapshot:
+    today = local_today(user)
+    week_start = today - timedelta(days=6)
+    yesterday_start = day_start_utc(user, today - timedelta(days=1))
+
+    rollups = load_daily_stats(db, user.id, week_start)
+    days = []
+    for i in range(7):
+        day = week_start + timedelta(days=i)
+        row = rollups.get(day)
+        if row:
+            days.append(DayStats(day, row.focus_minutes, row.session_count, row.xp_earned))
+        else:
+            days.append(DayStats(day, 0.0, 0, 0))
+
+    total_sessions, total_minutes, last_end = (
+        db.query(
+            func.count(SessionModel.id),
+            func.sum(SessionModel.duration_minutes),
+            func.max(SessionModel.end_time),
+        )
+        .filter(SessionModel.user_id == user.id, SessionModel.end_time.isnot(None))
+        .one()
+    )
+
+    recent_sessions = []
+    if last_end is not None:
+        # Everything since yesterday, or at least the latest session
+        recent_sessions = [
+            SessionSummary(*row)
+            for row in db.query(
+                SessionModel.id, SessionModel.start_time, SessionModel.end_time,
+                SessionModel.duration_minutes, Reflection.text,
+            )
+            .outerjoin(Reflection, Reflection.session_id == SessionModel.id)
+            .filter(SessionModel.user_id == user.id, SessionModel.end_time >= min(yesterday_start, last_end))
+            .order_by(SessionModel.end_time.desc())
+            .all()
+        ]
+
+    energy_levels = (
+        db.query(EnergyLog.date, EnergyLog.level)
+        .filter(EnergyLog.user_id == user.id, EnergyLog.date >= week_start)
+        .order_by(EnergyLog.date.asc())
+        .all()
+    )
+
+    task_columns = (UserTask.id, UserTask.title, UserTask.priority, UserTask.estimated_minutes, UserTask.status)
+    open_tasks = (
+        db.query(*task_columns)
+        .filter(UserTask.user_id == user.id, UserTask.status.in_(["pending", "active"]))
+        .order_by(UserTask.order_index.asc(), UserTask.created_at.asc())
+        .all()
+    )
+    recent_tasks = (
+        db.query(*task_columns)
+        .filter(UserTask.user_id == user.id)
+        .order_by(UserTask.created_at.desc())
+        .limit(10)
+        .all()
+    )
+    completed_tasks_count = (
+        db.query(func.count(UserTask.id))
+        .filter(UserTask.user_id == user.id, UserTask.status == "completed")
+        .scalar()
+    )
+
+    project_names = [name for (name,) in db.query(Project.name).filter(Project.user_id == user.id).all()]
+
+    arena = {}
+    if user.role == "worker":
+        total, won = (
+            db.query(
+                func.count(Challenge.id),
+                func.sum(case((MatchResult.winner_id == user.id, 1), else_=0)),
+            )
+            .outerjoin(MatchResult, MatchResult.challenge_id == Challenge.id)
+            .filter(
+                Challenge.status == "finished",
+                or_(Challenge.challenger_id == user.id, Challenge.opponent_id == user.id),
+            )
+            .one()
+        )
+        arena = {"challenges_won": won or 0, "total_challenges": total}
+
+    return UserContextSnapshot(
+        user_id=user.id,
+        day=today,
+        days=tuple(days),
+        total_sessions=total_sessions,
+        total_focus_minutes=total_minutes or 0.0,
+        last_end_time=last_end,
+        recent_sessions=tuple(recent_sessions),
+        energy_levels=tuple((d, level) for d, level in energy_levels),
+        open_tasks=tuple(TaskSummary(*t) for t in open_tasks),
+        recent_tasks=tuple(TaskSummary(*t) for t in recent_tasks),
+        completed_tasks_count=completed_tasks_count,
+        project_names=tuple(project_names),
+        active_days=streaks.active_days(user, today),
+        current_streak=streaks.current_streak(user, today),
+        longest_streak=user.longest_streak or 0,
+        **arena,
+    )
@@ -1,9 +1,26 @@
 """
-services/xp_engine.py — XP calculation logic (pure, no side effects)
+services/xp_engine.py — XP calculation and crediting
+
+credit_xp() is the only way XP reaches users.xp: session awards and arena
+matches both go through it, keyed by their source so retries are no-ops.
 """
 from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session as DBSession
-from models import Session as SessionModel, XPLog
+from database import touch_user, upsert_insert
+from models import Reflection, Session as SessionModel, User, XPLog
+from services.daily_stats import daily_stats_upsert
+from services.local_time import local_date, local_today
+from services.user_cache import invalidate_user
+from services.xp_ledger import retention_cutoff
+
+REFLECTION_BONUS = 20
+CONSISTENCY_BONUS = 10
+
+# XPLog.source_type values
+SESSION_SOURCE = "session"
+CHALLENGE_SOURCE = "challenge"
 
 
 def calculate_xp(duration_minutes: float, has_reflection: bool) -> int:
@@ -13,52 +30,130 @@ def calculate_xp(duration_minutes: float, has_reflection: bool) -> int:
       bonus  = +20 if reflection exists
     """
     base_xp = int(duration_minutes * 2)
-    reflection_bonus = 20 if has_reflection else 0
+    reflection_bonus = REFLECTION_BONUS if has_reflection else 0
     return base_xp + reflection_bonus
 
 
-def get_weekly_session_count(db: DBSession, user_id: int) -> int:
-    """Count sessions this calendar week (Mon–Sun)."""
-    now = datetime.utcnow()
-    week_start = now - timedelta(days=now.weekday())
-    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
+def get_weekly_session_count(db: DBSession, user) -> int:
+    """Count sessions ended this calendar week (Mon–Sun) in the user's timezone."""
+    today = local_today(user)
+    week_start = today - timedelta(days=today.weekday())
 
     return (
         db.query(SessionModel)
         .filter(
-            SessionModel.user_id == user_id,
-            SessionModel.start_time >= week_start,
-            SessionModel.end_time.isnot(None),
+            SessionModel.user_id == user.id,
+            SessionModel.local_date >= week_start,
         )
         .count()
     )
 
 
-def award_xp(db: DBSession, user_id: int, session_id: int) -> dict:
+class XPAward(NamedTuple):
+    source_id: int
+    amount: int             # total, bonuses included
+    reason: str
+    reflection_bonus: int = 0
+    consistency_bonus: int = 0
+
+
+class XPCredit(NamedTuple):
+    log_id: int
+    xp_awarded: int
+    reason: str
+    new_total: int
+    credited: bool  # False → this source was already credited; the fields describe that award
+    reflection_bonus: int = 0
+    consistency_bonus: int = 0
+
+
+def _existing_credits(db: DBSession, user_id: int, source_type: str, source_ids) -> dict[int, XPCredit]:
+    rows = db.execute(
+        select(
+            XPLog.source_id, XPLog.id, XPLog.xp_awarded, XPLog.reason, User.xp,
+            XPLog.reflection_bonus, XPLog.consistency_bonus,
+        )
+        .join(User, User.id == XPLog.user_id)
+        .where(XPLog.user_id == user_id, XPLog.source_type == source_type, XPLog.source_id.in_(list(source_ids)))
+    )
+    return {
+        row.source_id: XPCredit(
+            row.id, row.xp_awarded, row.reason, row.xp, False, row.reflection_bonus or 0, row.consistency_bonus or 0,
+        )
+        for row in rows
+    }
+
+
+def credit_xp_many(db: DBSession, user, source_type: str, awards: list[XPAward],
+                   now: Optional[datetime] = None) -> dict[int, XPCredit]:
     """
-    Calculate and award XP for a completed session.
-    Returns breakdown of awarded XP.
+    Credit several awards to `user` in the caller's transaction, each at most
+    once per (source_type, source_id).
+
+    All XP log rows go in as one INSERT … ON CONFLICT DO NOTHING on
+    ux_xp_logs_source. Only the rows that insert are added to the user, with a
+    single `UPDATE users SET xp = xp + :n` and one daily-rollup upsert.
+    Sources that were already credited, by an earlier call or a concurrent
+    one, come back with credited=False and their original award. Nothing is
+    read and written back, so concurrent credits never lose an update.
     """
-    from models import User, Reflection
+    if not awards:
+        return {}
+    now = now or datetime.utcnow()
+    day = local_date(user, now)
+    inserted = dict(db.execute(
+        upsert_insert(db, XPLog).values([
+            {
+                "user_id": user.id, "xp_awarded": award.amount, "reason": award.reason, "created_at": now,
+                "local_date": day, "source_type": source_type, "source_id": award.source_id,
+                "reflection_bonus": award.reflection_bonus, "consistency_bonus": award.consistency_bonus,
+            }
+            for award in awards
+        ])
+        .on_conflict_do_nothing(index_elements=["user_id", "source_type", "source_id"])
+        .returning(XPLog.source_id, XPLog.id)
+    ).all())
 
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
-    if not session or session.user_id != user_id:
-        return {"error": "Session not found"}
-    if not session.end_time:
-        return {"error": "Session not ended yet"}
+    credited = sum(award.amount for award in awards if award.source_id in inserted)
+    users = User.__table__
+    new_total = db.execute(
+        update(users).where(users.c.id == user.id).values(xp=users.c.xp + credited).returning(users.c.xp)
+    ).scalar_one() if inserted else None
+    if inserted:
+        db.execute(daily_stats_upsert(db, user.id, day, xp_earned=credited))
+        invalidate_user(db, user.id)
+        touch_user(db, user.id)
 
-    reflection = db.query(Reflection).filter(Reflection.session_id == session_id).first()
-    has_reflection = reflection is not None
-    duration = session.duration_minutes or 0
+    existing = _existing_credits(db, user.id, source_type, (a.source_id for a in awards if a.source_id not in inserted)) \
+        if len(inserted) < len(awards) else {}
+    if new_total is None and existing:
+        new_total = next(iter(existing.values())).new_total
+    return {
+        award.source_id: XPCredit(
+            inserted[award.source_id], award.amount, award.reason, new_total, True,
+            award.reflection_bonus, award.consistency_bonus,
+        )
+        if award.source_id in inserted else existing[award.source_id]._replace(new_total=new_total)
+        for award in awards
+    }
+
+
+def credit_xp(db: DBSession, user, amount: int, reason: str, source_type: str, source_id: int,
+              now: Optional[datetime] = None) -> XPCredit:
+    """Credit one award; see credit_xp_many()."""
+    return credit_xp_many(db, user, source_type, [XPAward(source_id, amount, reason)], now)[source_id]
 
-    base = int(duration * 2)
-    ref_bonus = 20 if has_reflection else 0
 
-    # Consistency bonus: +10 if 3+ sessions this week
-    weekly_count = get_weekly_session_count(db, user_id)
-    consistency_bonus = 10 if weekly_count >= 3 else 0
+# ── Session awards ───────────────────────────────────────────────────────────
 
-    total_xp = base + ref_bonus + consistency_bonus
+MAX_BATCH_SESSIONS = 100
+
+
+def _score_session(session: SessionModel, has_reflection: bool, consistency_bonus: int) -> XPAward:
+    """The award for one ended session, with its bonuses kept apart for the breakdown."""
+    duration = session.duration_minutes or 0
+    base = int(duration * 2)
+    ref_bonus = REFLECTION_BONUS if has_reflection else 0
 
     reasons = []
     if base > 0:
@@ -67,24 +162,104 @@ def award_xp(db: DBSession, user_id: int, session_id: int) -> dict:
         reasons.append("reflection bonus")
     if consistency_bonus:
         reasons.append("consistency bonus")
+    return XPAward(
+        session.id, base + ref_bonus + consistency_bonus, " + ".join(reasons) if reasons else "session completed",
+        ref_bonus, consistency_bonus,
+    )
+
+
+def _last_unsourced_award(db: DBSession, user_id: int) -> Optional[datetime]:
+    """
+    When the user's newest XP log without a source was written. Awards from
+    before sources were recorded (migration 13) don't name their session, so
+    any session that had ended by then may already have been awarded.
+    """
+    return db.execute(
+        select(func.max(XPLog.created_at)).where(XPLog.user_id == user_id, XPLog.source_type.is_(None))
+    ).scalar()
+
+
+def _session_error(session: Optional[SessionModel], user_id: int, cutoff, unsourced_until) -> Optional[str]:
+    if not session or session.user_id != user_id:
+        return "Session not found"
+    if not session.end_time:
+        return "Session not ended yet"
+    if session.local_date is not None and session.local_date < cutoff:
+        # Its award, if any, may already be compacted into a checkpoint
+        return "Session is too old to award XP"
+    if unsourced_until is not None and session.end_time <= unsourced_until:
+        return "Session ended before XP awards were tracked per session"
+    return None
+
+
+def _award_response(credit: XPCredit) -> dict:
+    return {
+        "total_xp": credit.xp_awarded,
+        "base": credit.xp_awarded - credit.reflection_bonus - credit.consistency_bonus,
+        "reflection_bonus": credit.reflection_bonus,
+        "consistency_bonus": credit.consistency_bonus,
+        "reason": credit.reason,
+        "new_total": credit.new_total,
+        "already_awarded": not credit.credited,
+    }
+
 
-    reason_str = " + ".join(reasons) if reasons else "session completed"
+def award_xp_batch(db: DBSession, user, session_ids: list[int]) -> dict:
+    """
+    Score and award several ended sessions in one transaction: one query each
+    for prior awards, sessions and reflections, one weekly count (so every
+    session in the batch gets the same consistency bonus) and one credit.
+    Returns a result per session id, in request order; sessions that can't be
+    awarded carry an "error" and don't affect the others.
+    """
+    session_ids = list(dict.fromkeys(session_ids))
+    existing = _existing_credits(db, user.id, SESSION_SOURCE, session_ids)
+    pending = [sid for sid in session_ids if sid not in existing]
 
-    # Persist XP log
-    xp_log = XPLog(user_id=user_id, xp_awarded=total_xp, reason=reason_str)
-    db.add(xp_log)
+    sessions = {
+        s.id: s for s in db.query(SessionModel).filter(SessionModel.id.in_(pending), SessionModel.user_id == user.id)
+    } if pending else {}
+    reflected = {
+        sid for (sid,) in db.query(Reflection.session_id).filter(Reflection.session_id.in_(list(sessions))).distinct()
+    } if sessions else set()
 
-    # Update user total XP
-    user = db.query(User).filter(User.id == user_id).first()
-    user.xp += total_xp
+    cutoff = retention_cutoff()
+    unsourced_until = _last_unsourced_award(db, user.id) if sessions else None
+    errors = {sid: _session_error(sessions.get(sid), user.id, cutoff, unsourced_until) for sid in pending}
+    awardable = [sid for sid in pending if errors[sid] is None]
 
-    db.commit()
+    credits = dict(existing)
+    new_total = next(iter(existing.values())).new_total if existing else None
+    if awardable:
+        # Consistency bonus: +10 if 3+ sessions this week
+        consistency_bonus = CONSISTENCY_BONUS if get_weekly_session_count(db, user) >= 3 else 0
+        awards = [_score_session(sessions[sid], sid in reflected, consistency_bonus) for sid in awardable]
+        credited = credit_xp_many(db, user, SESSION_SOURCE, awards)
+        db.commit()
+        credits.update(credited)
+        new_total = next(iter(credited.values())).new_total
+    if new_total is None:
+        # Nothing credited or on record: read the balance, not the cached snapshot's
+        new_total = db.execute(select(User.xp).where(User.id == user.id)).scalar_one()
 
+    results = []
+    for sid in session_ids:
+        if sid in credits:
+            results.append({"session_id": sid, **_award_response(credits[sid]), "new_total": new_total})
+        else:
+            results.append({"session_id": sid, "error": errors[sid]})
     return {
-        "total_xp": total_xp,
-        "base": base,
-        "reflection_bonus": ref_bonus,
-        "consistency_bonus": consistency_bonus,
-        "reason": reason_str,
-        "new_total": user.xp,
+        "results": results,
+        "total_xp": sum(credits[sid].xp_awarded for sid in awardable if credits[sid].credited),
+        "new_total": new_total,
     }
+
+
+def award_xp(db: DBSession, user, session_id: int) -> dict:
+    """
+    Calculate and award XP for a completed session, at most once per session.
+    Repeated calls return the original award (already_awarded=True).
+    """
+    result = award_xp_batch(db, user, [session_id])["results"][0]
+    result.pop("session_id")
+    return result
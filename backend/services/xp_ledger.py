@@ -0,0 +1,170 @@
+"""
+services/xp_ledger.py — XP balance checkpoints and xp_logs compaction
+
+checkpoint_xp() writes one xp_checkpoints row per user per closed local day:
+the day's total and the running balance. A sum over any window is then two
+balance lookups (latest checkpoint plus the few xp_logs rows after it)
+instead of a scan of the user's whole history. compact_xp_logs() deletes
+detail rows older than XP_LOG_RETENTION_DAYS once their day is checkpointed;
+the checkpoint marks itself compacted and stands in for them in /xp/log and
+in the daily-rollup rebuild. Both run from `python jobs.py`.
+"""
+import os
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+
+from models import XPCheckpoint, XPLog
+
+# Detail rows older than this are folded into their checkpoints. award_xp
+# refuses sessions this old, since their award may no longer be on record.
+XP_LOG_RETENTION_DAYS = int(os.getenv("XP_LOG_RETENTION_DAYS", "180"))
+
+
+def closed_through(now: Optional[datetime] = None) -> date:
+    """Latest local date that has ended in every timezone (UTC−12 … UTC+14)."""
+    return ((now or datetime.utcnow()) - timedelta(days=2)).date()
+
+
+def retention_cutoff(now: Optional[datetime] = None) -> date:
+    """Detail rows dated before this are compacted."""
+    return ((now or datetime.utcnow()) - timedelta(days=XP_LOG_RETENTION_DAYS)).date()
+
+
+# ── Checkpoints ──────────────────────────────────────────────────────────────
+
+def _latest_checkpoints(user_id: Optional[int] = None):
+    """Subquery: (user_id, date) of each user's newest checkpoint."""
+    stmt = select(XPCheckpoint.user_id, func.max(XPCheckpoint.date).label("date")).group_by(XPCheckpoint.user_id)
+    if user_id is not None:
+        stmt = stmt.where(XPCheckpoint.user_id == user_id)
+    return stmt.subquery()
+
+
+def checkpoint_xp(db, user_id: Optional[int] = None, through: Optional[date] = None, batch_size: int = 1000) -> int:
+    """
+    Checkpoint every closed day after each user's newest checkpoint, for one
+    user or everyone. Runs in the caller's transaction; returns rows written.
+    """
+    through = through or closed_through()
+    latest = _latest_checkpoints(user_id)
+
+    balances = {
+        uid: balance for uid, balance in db.execute(
+            select(XPCheckpoint.user_id, XPCheckpoint.balance)
+            .join(latest, and_(latest.c.user_id == XPCheckpoint.user_id, latest.c.date == XPCheckpoint.date))
+        )
+    }
+    days = (
+        select(XPLog.user_id, XPLog.local_date, func.sum(XPLog.xp_awarded), func.count())
+        .outerjoin(latest, latest.c.user_id == XPLog.user_id)
+        .where(
+            XPLog.local_date.isnot(None),
+            XPLog.local_date <= through,
+            or_(latest.c.date.is_(None), XPLog.local_date > latest.c.date),
+        )
+        .group_by(XPLog.user_id, XPLog.local_date)
+        .order_by(XPLog.user_id, XPLog.local_date)
+    )
+    if user_id is not None:
+        days = days.where(XPLog.user_id == user_id)
+
+    now = datetime.utcnow()
+    rows = []
+    for uid, day, total, count in db.execute(days):
+        balances[uid] = balances.get(uid, 0) + (total or 0)
+        rows.append({
+            "user_id": uid, "date": day, "xp_total": total or 0, "entry_count": count,
+            "balance": balances[uid], "compacted": False, "created_at": now,
+        })
+    for i in range(0, len(rows), batch_size):
+        db.execute(insert(XPCheckpoint), rows[i:i + batch_size])
+    return len(rows)
+
+
+def compact_xp_logs(db, user_id: Optional[int] = None, before: Optional[date] = None) -> int:
+    """
+    Checkpoint, then delete xp_logs rows dated before `before` (default: the
+    retention cutoff) whose day is checkpointed. Returns detail rows deleted.
+    """
+    before = min(before or retention_cutoff(), closed_through() + timedelta(days=1))
+    checkpoint_xp(db, user_id=user_id)
+
+    covered = select(XPCheckpoint.id).where(
+        XPCheckpoint.user_id == XPLog.user_id,
+        XPCheckpoint.date == XPLog.local_date,
+    ).exists()
+    stmt = delete(XPLog).where(XPLog.local_date < before, covered)
+    mark = update(XPCheckpoint).where(XPCheckpoint.date < before, XPCheckpoint.compacted.is_(False))
+    if user_id is not None:
+        stmt = stmt.where(XPLog.user_id == user_id)
+        mark = mark.where(XPCheckpoint.user_id == user_id)
+
+    deleted = db.execute(stmt.execution_options(synchronize_session=False)).rowcount
+    db.execute(mark.values(compacted=True).execution_options(synchronize_session=False))
+    return deleted
+
+
+# ── Reads ────────────────────────────────────────────────────────────────────
+
+def xp_balance(db, user_id: int, through: date) -> int:
+    """XP awarded to the user up to and including local day `through`."""
+    checkpoint = db.execute(
+        select(XPCheckpoint.date, XPCheckpoint.balance)
+        .where(XPCheckpoint.user_id == user_id, XPCheckpoint.date <= through)
+        .order_by(XPCheckpoint.date.desc())
+        .limit(1)
+    ).first()
+    tail = select(func.coalesce(func.sum(XPLog.xp_awarded), 0)).where(
+        XPLog.user_id == user_id, XPLog.local_date <= through,
+    )
+    if checkpoint is not None:
+        tail = tail.where(XPLog.local_date > checkpoint.date)
+    return (checkpoint.balance if checkpoint else 0) + db.execute(tail).scalar_one()
+
+
+def xp_between(db, user_id: int, start: date, end: date) -> int:
+    """XP awarded on local days start..end (inclusive)."""
+    return xp_balance(db, user_id, end) - xp_balance(db, user_id, start - timedelta(days=1))
+
+
+def compacted_days(db, user_id: Optional[int] = None) -> dict[tuple[int, date], int]:
+    """{(user_id, date): xp_total} for days whose detail rows were compacted away."""
+    stmt = select(XPCheckpoint.user_id, XPCheckpoint.date, XPCheckpoint.xp_total) \
+        .where(XPCheckpoint.compacted.is_(True))
+    if user_id is not None:
+        stmt = stmt.where(XPCheckpoint.user_id == user_id)
+    return {(uid, day): total for uid, day, total in db.execute(stmt)}
+
+
+def xp_history(db, user_id: int, limit: int) -> list[dict]:
+    """Newest awards first; once the detail rows run out, compacted days follow as one entry each."""
+    logs = db.execute(
+        select(XPLog.id, XPLog.xp_awarded, XPLog.reason, XPLog.created_at)
+        .where(XPLog.user_id == user_id)
+        .order_by(XPLog.created_at.desc())
+        .limit(limit)
+    ).all()
+    history = [
+        {"id": log.id, "xp_awarded": log.xp_awarded, "reason": log.reason, "created_at": log.created_at.isoformat()}
+        for log in logs
+    ]
+    if len(history) < limit:
+        days = db.execute(
+            select(XPCheckpoint.date, XPCheckpoint.xp_total, XPCheckpoint.entry_count)
+            .where(XPCheckpoint.user_id == user_id, XPCheckpoint.compacted.is_(True))
+            .order_by(XPCheckpoint.date.desc())
+            .limit(limit - len(history))
+        )
+        history.extend(
+            {
+                "id": None,
+                "xp_awarded": day.xp_total,
+                "reason": f"{day.entry_count} award{'s' if day.entry_count != 1 else ''} (compacted)",
+                "created_at": day.date.isoformat(),
+                "compacted": True,
+            }
+            for day in days
+        )
+    return history
@@ -6,6 +6,14 @@ import { useNavigate } from 'react-router-dom';
 import { Zap, LogIn, UserPlus, GraduationCap, Briefcase } from 'lucide-react';
 import client from '../api/client';
 
+function browserTimezone() {
+    try {
+        return Intl.DateTimeFormat().resolvedOptions().timeZone;
+    } catch {
+        return undefined;
+    }
+}
+
 export default function Login() {
     const [mode, setMode] = useState('login'); // login | register
     const [form, setForm] = useState({ name: '', email: '', password: '', role: 'student' });
@@ -23,7 +31,7 @@ export default function Login() {
         setLoading(true);
         try {
             if (mode === 'register') {
-                await client.post('/auth/register', form);
+                await client.post('/auth/register', { ...form, timezone: browserTimezone() });
                 setMode('login');
                 setError('');
                 return;
@@ -33,6 +41,11 @@ export default function Login() {
                 password: form.password,
             });
             localStorage.setItem('xpilot_token', res.data.access_token);
+            const timezone = browserTimezone();
+            if (timezone && timezone !== res.data.timezone) {
+                // Keep "today" in the user's current zone (e.g. after travelling)
+                client.put('/auth/timezone', { timezone }).catch(() => {});
+            }
             localStorage.setItem('xpilot_user', JSON.stringify({
                 id: res.data.user_id,
                 name: res.data.name,
@@ -18,6 +18,7 @@ function getTier(elo) {
 
 export default function FocusArena() {
     const [board, setBoard] = useState([]);
+    const [myRow, setMyRow] = useState(null);
     const [myChallenges, setMyChallenges] = useState([]);
     const [loading, setLoading] = useState(true);
     const [form, setForm] = useState({ opponent_id: '', task_description: '', duration_minutes: 45 });
@@ -33,11 +34,13 @@ export default function FocusArena() {
     const fetchAll = async () => {
         setLoading(true);
         try {
-            const [lb, ch] = await Promise.all([
-                client.get('/leaderboard/'),
+            const [lb, mine, ch] = await Promise.all([
+                client.get('/leaderboard/', { params: { limit: 50 } }),
+                client.get('/leaderboard/', { params: { around: 'me', radius: 0 } }).catch(() => ({ data: [] })),
                 client.get('/challenge/my'),
             ]);
             setBoard(lb.data);
+            setMyRow(mine.data[0] || null);
             setMyChallenges(ch.data);
         } catch (e) {
             console.error(e);
@@ -46,7 +49,7 @@ export default function FocusArena() {
         }
     };
 
-    const myStats = board.find(w => w.is_me);
+    const myStats = board.find(w => w.is_me) || myRow;
     const tier = myStats ? getTier(myStats.elo_rating) : getTier(1200);
 
     const handleChallenge = async (e) => {
@@ -248,15 +251,15 @@ export default function FocusArena() {
                         <div style={{ textAlign: 'center', padding: '40px 20px', color: 'var(--text-muted)', fontSize: 13 }}>
                             No workers ranked yet.
                         </div>
-                    ) : board.map((w, i) => {
+                    ) : board.map((w) => {
                         const t = getTier(w.elo_rating);
                         return (
                             <div
                                 key={w.id}
                                 style={{ display: 'flex', alignItems: 'center', gap: 12, padding: '12px 20px', borderBottom: '1px solid var(--border-subtle)', background: w.is_me ? `${t.color}08` : 'transparent', opacity: w.is_me ? 1 : 0.88 }}
                             >
-                                <div style={{ width: 24, fontSize: 12, fontWeight: 900, color: i === 0 ? '#f59e0b' : i === 1 ? '#94a3b8' : i === 2 ? '#b45309' : 'var(--text-muted)', textAlign: 'center' }}>
-                                    {i + 1}
+                                <div style={{ width: 24, fontSize: 12, fontWeight: 900, color: w.rank === 1 ? '#f59e0b' : w.rank === 2 ? '#94a3b8' : w.rank === 3 ? '#b45309' : 'var(--text-muted)', textAlign: 'center' }}>
+                                    {w.rank}
                                 </div>
                                 <div style={{ flex: 1, minWidth: 0 }}>
                                     <div style={{ fontSize: 13, fontWeight: w.is_me ? 800 : 600, display: 'flex', alignItems: 'center', gap: 6 }}>